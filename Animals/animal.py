@@ -1,21 +1,34 @@
 from World.tile import Tile
 from settings import *
 import pygame as pg
-import random as rnd
 import numpy as np
 import astar as ast
+from .store import column, point_column
 
 
 class Animal(Tile):
+    # per-tick state, stored in the columns of the world's animal store
+    age = column("age")
+    max_age = column("max_age")
+    hunger = column("hunger")
+    hunger_rate = column("hunger_rate")
+    thirst = column("thirst")
+    thirst_rate = column("thirst_rate")
+    set_timer = column("set_timer")
+    cooldown = column("cooldown")  # mating cooldown, 0 if none is active
+    food_point = point_column("food")
+    water_point = point_column("water")
+
     def __init__(
         self,
         pos: tuple,
         genomes: dict,
         population: dict,
-        map: list,
+        map: np.ndarray,
         key: int,
         sprite: str,
         group,
+        world,
     ) -> None:
         """Initializes an Animal object with specific characteristics.
 
@@ -23,69 +36,84 @@ class Animal(Tile):
             pos (tuple): The position of the Animal.
             genomes (dict): Dictionary of genetic information.
             population (dict): Dictionary of population data.
-            map (list): The map configuration.
+            map (numpy.ndarray): The map configuration.
             key (int): Key value for the Animal.
             sprite (str): The sprite representing the Animal.
             group: The group the Animal belongs to.
+            world (World): The world the Animal lives in.
 
         """
         super().__init__(pos, sprite, group)
 
-        self.pos = pos
-        self.genomes = genomes
         self.map = map
+        self.world = world
         self.population = population
+        self.__spawn__(pos, genomes, key)
+
+    def __spawn__(self, pos: tuple, genomes: dict, key: int) -> None:
+        """Sets up everything which belongs to a single life of the animal, for new animals as well as for recycled ones.
+
+        Args:
+            pos (tuple): The position of the Animal.
+            genomes (dict): Dictionary of genetic information.
+            key (int): Key value for the Animal.
+        """
+        self.pos = pos
+        self.genomes = genomes
         self.key = key
 
-        self.age = 0
+        # age, hunger, thirst, their rates and the timers start out in the store
+        self.slot = self.world.store.add(self, self.__convert_pos__(pos), genomes)
         self.type = self.genomes["animal_type"]
-        self.max_age = self.genomes["max_age_d"]
-        self.hunger = 0
-        self.hunger_rate = self.genomes["hunger_rate_d"]
-        self.thirst = 0
-        self.thirst_rate = self.genomes["thirst_rate_d"]
-        self.set_timer = 0
 
         # movement related variables
         self.queued_movements = []
         self.path_length = None
+        self.planner = None  # keeps its search between replans while pursuing prey or a mate
 
-        # nutrient related variables
+        # nutrient related variables, food and water point are kept in the store
         self.food_found = False
         self.water_found = False
-        self.food_point = None
-        self.water_point = None
 
         # mating related variables
         self.mate = None  # gets set to the corresponding animal
         self.mate_pos = None  # only gets set for the searching animal
-        self.cooldown = None  # mating cooldown
+
+    def respawn(self, pos: tuple, genomes: dict, key: int, groups) -> None:
+        """Brings a dead animal back to life as a new one, so births don't have to create new objects. The image stays the
+        same, since it is shared by all animals of a type anyway.
+
+        Args:
+            pos (tuple): The position of the Animal.
+            genomes (dict): Dictionary of genetic information.
+            key (int): Key value for the Animal.
+            groups: The groups the Animal belongs to.
+        """
+        self.add(groups)
+        self.rect.topleft = pos
+        self.__spawn__(pos, genomes, key)
 
     def __cleanup_on_death__(self) -> None:
         """Cleanup function if the animal dies."""
+        self.world.scheduler.cancel(self)
         if self.mate:
+            self.world.scheduler.cancel(self.mate)
             self.mate.mate = None
             self.mate.mate_pos = None
             self.mate.queued_movements = []
+            self.mate.planner = None
 
     def alive(self) -> bool or list:  # type: ignore
-        """This is the main function for every animal. It handles the movement, food and water search as well as mating and eating/drinking.
+        """This is the main function for every animal. It handles the movement and mating. Aging, eating/drinking, hunger, thirst
+        and deaths are handled for all animals at once by the animal store of the world, food, water and mate searches are
+        triggered by the world afterwards through __resolve_needs__.
 
         Returns:
             bool or list: returns a list if mating has occurred or a bool based on if the animal is considered alive or dead
         """
-        self.age += 1
-
-        if self.set_timer:
-            self.set_timer -= 1
-            return self.hunger < 1000 and self.thirst < 1000 and self.age < self.max_age
-
-        # mating cooldown
-        if self.cooldown:
-            if self.cooldown >= 100:
-                self.cooldown = None
-            else:
-                self.cooldown += 1
+        if self.world.store.frozen[self.slot]:
+            # eating, drinking or mating
+            return True
 
         if not self.queued_movements:
             self.__normal_movement__()
@@ -95,62 +123,47 @@ class Animal(Tile):
                 and len(self.queued_movements) <= self.path_length / 2
                 and self.path_length > 4
             ):
-                # searches for a more optimal path to a moving target after half the path has been traversed
-                self.queued_movements = ast.find_path(
-                    self.map,
-                    self.__convert_pos__(self.pos),
-                    self.queued_movements[len(self.queued_movements) - 1],
-                )
+                # searches for a more optimal path to a moving target after half the path has been traversed,
+                # the planner repairs its previous search instead of starting over
+                if self.world.chunked:
+                    # chunked maps have no flat grid for the planner to keep its search on
+                    self.queued_movements = ast.find_path(
+                        self.map,
+                        self.__convert_pos__(self.pos),
+                        self.queued_movements[len(self.queued_movements) - 1],
+                    )
+                else:
+                    if self.planner is None:
+                        self.planner = ast.PursuitPlanner(self.map)
+                    self.queued_movements = self.planner.plan(
+                        self.__convert_pos__(self.pos),
+                        self.queued_movements[len(self.queued_movements) - 1],
+                    )
                 self.path_length = len(self.queued_movements)
-            self.__direct_movement__()
-
-        # checks if either the food or water point has been reached
-        if self.__convert_pos__(self.pos) == self.food_point:
-            self.food_found = False
-            self.food_point = None
-            self.hunger -= 350 * (20 - self.hunger_rate)
-            self.set_timer = 10
-        elif self.__convert_pos__(self.pos) == self.water_point:
-            self.water_found = False
-            self.water_point = None
-            self.thirst -= 350 * (20 - self.thirst_rate)
-            self.set_timer = 10
+                self.__log_path__(self.queued_movements)
+            if self.queued_movements:  # the search on a chunked map may give up
+                self.__direct_movement__()
 
         if self.mate:
             if not self.mate_pos:
                 # this triggers only if a animal wants to mate with this animal
-                self.mate.queued_movements.append(self.__convert_pos__(self.pos))
+                if self.world.scheduler.pending(self.mate):
+                    # the mate is still waiting for its path, which should lead here instead
+                    self.world.scheduler.submit(self.mate, self.__convert_pos__(self.pos))
+                else:
+                    self.mate.queued_movements.append(self.__convert_pos__(self.pos))
                 self.mate.mate_pos = self.__convert_pos__(self.pos)
             elif self.mate_pos == self.__convert_pos__(self.pos):
                 self.set_timer = 10
                 return self.__mating_process__(self.genomes, self.mate.genomes)
 
-        # increasing hunger and thirst
-        self.hunger += self.hunger_rate
-        self.thirst += self.thirst_rate
-
-        if not self.queued_movements:
-            self.__resolve_needs__()
-
-        return self.hunger < 1000 and self.thirst < 1000 and self.age < self.max_age
+        return True
 
-    def __inside_range__(self, start: tuple, end: tuple, point: tuple) -> bool:
-        """Checks if a point is inside the rectangle made by two points
-
-        Args:
-            start (tuple): top left corner of the rectangle
-            end (tuple): bottom right corner of the rectangle
-            point (tuple): point to check for
-
-        Returns:
-            bool: if point is inside true, else false
-        """
-        return (
-            (point[0] >= start[0])
-            and (point[0] <= end[1])
-            and (point[1] >= start[1])
-            and (point[1] <= end[1])
-        )
+    def __moved__(self) -> None:
+        """Passes a changed position on to the spatial hash and the animal store of the world."""
+        tile = self.__convert_pos__(self.pos)
+        self.world.spatial[self.type].move(self, tile)
+        self.world.store.x[self.slot], self.world.store.y[self.slot] = tile
 
     def __water_tile__(self, pos: tuple) -> bool:
         """Checks if a given point is a water tile.
@@ -162,7 +175,7 @@ class Animal(Tile):
             bool: if point is water true, else false
         """
         coords = self.__convert_pos__(pos)
-        return self.map[coords[1]][[coords[0]]] == 5.0
+        return self.map[coords[1], coords[0]] == WATER
 
     def __check_bounds__(self, direction: int) -> bool:
         """Checks if movement in a given direction would lead out of bounds
@@ -175,9 +188,9 @@ class Animal(Tile):
         """
         if direction == 1 and self.pos[1] != 0:
             return True
-        elif direction == 2 and self.pos[0] != (MAPSIZE - 1) * TILESIZE:
+        elif direction == 2 and self.pos[0] != (len(self.map) - 1) * TILESIZE:
             return True
-        elif direction == 3 and self.pos[1] != (MAPSIZE - 1) * TILESIZE:
+        elif direction == 3 and self.pos[1] != (len(self.map) - 1) * TILESIZE:
             return True
         elif direction == 4 and self.pos[0] != 0:
             return True
@@ -199,7 +212,7 @@ class Animal(Tile):
 
     def __normal_movement__(self) -> None:
         """Normal/random movement function. Chooses a random direction and, if the move is valid, moves one space in that direction."""
-        direction = rnd.randint(1, 4)
+        direction = self.world.random["movement"].randint(1, 4)
 
         if direction == 1 and self.__check_bounds__(direction):  # Move Up
             if not self.__water_tile__(
@@ -220,6 +233,8 @@ class Animal(Tile):
                 self.rect.center -= pg.math.Vector2(TILESIZE, 0)
                 self.pos = tuple(np.subtract(self.pos, (TILESIZE, 0)))
 
+        self.__moved__()
+
     def __direct_movement__(self) -> None:
         """Takes the first entry of the list of queued movements and places the animal on that position."""
         new_pos = self.queued_movements.pop(0)
@@ -227,6 +242,7 @@ class Animal(Tile):
         direction = tuple(np.subtract(self.pos, new_pos))
         self.rect.center -= pg.math.Vector2(direction[0], direction[1])
         self.pos = new_pos
+        self.__moved__()
 
     def __resolve_needs__(self) -> None:
         """Checks if the animal is hungry, thirsty or is able to mate and if so, triggers the corresponding functions."""
@@ -237,176 +253,86 @@ class Animal(Tile):
         elif not self.mate and self.age > 100 and not self.cooldown:
             self.__find_mate__()
 
+    def __log_path__(self, path: list) -> None:
+        """Records a newly assigned path in the event log of the world, if it keeps one.
+
+        Args:
+            path (list): the queued movements
+        """
+        if self.world.events is not None:
+            self.world.events.path(self.world.ticks, self, self.__convert_pos__(self.pos), path)
+
+    def __receive_path__(self, path: list) -> None:
+        """Receives the path the world's scheduler found for the last request of this animal. Positions a moving target passed
+        on in the meantime are kept behind it.
+
+        Args:
+            path (list): the found path
+        """
+        self.queued_movements = path + self.queued_movements
+        self.path_length = len(path)
+        self.__log_path__(self.queued_movements)
+        self.planner = None  # the next replan starts a new search tree from here
+
     def __find_prey__(self) -> None:
         """Checks if a huntable animal is in range, searches a path to it and changes the corresponding variables."""
-        start_point = self.__convert_pos__(self.pos)
-        end_point = self.__convert_pos__(self.pos)
-
-        for _ in range(41):
-            # checking if the points are still in range and then
-            # increasing the range of the search radius every iteration
-            if start_point[0] > 0:
-                start_point = (start_point[0] - 1, start_point[1])
-            if start_point[1] > 0:
-                start_point = (start_point[0], start_point[1] - 1)
-            if end_point[0] < (MAPSIZE - 1):
-                end_point = (end_point[0] + 1, end_point[1])
-            if end_point[1] < (MAPSIZE - 1):
-                end_point = (end_point[0], end_point[1] + 1)
-
-            # iterating through all huntable animals
-            for entry in self.huntable:
-                prey_pos_conv = self.__convert_pos__(self.huntable[entry].pos)
-                if (
-                    self.__inside_range__(start_point, end_point, prey_pos_conv)
-                    and not self.huntable[entry].hunted
-                ):
-                    self.huntable[entry].hunted = True
-                    self.huntable[entry].hunter = self
-                    self.food_point = prey_pos_conv
-                    self.food_found = True
-                    self.prey = self.huntable[entry]
-                    break
-
-            if self.food_found:
-                break
-
-        if self.food_found:
-            self.queued_movements = ast.find_path(
-                self.map, self.__convert_pos__(self.pos), self.food_point
-            )
-            self.path_length = len(self.queued_movements)
+        tile = self.__convert_pos__(self.pos)
+        prey = self.huntable_index.nearest(
+            tile,
+            41,
+            lambda entry: not entry.hunted
+            and self.world.reachable(tile, entry.__convert_pos__(entry.pos)),
+        )
+
+        if prey is not None:
+            prey.hunted = True
+            prey.hunter = self
+            self.food_point = self.__convert_pos__(prey.pos)
+            self.food_found = True
+            self.prey = prey
+            self.world.scheduler.submit(self, self.food_point)
 
     def __find_berry__(self) -> None:
-        """Checks if a berry is in range, searches a path to it and changes the corresponding variables."""
-        start_point = self.__convert_pos__(self.pos)
-        end_point = self.__convert_pos__(self.pos)
-        for _ in range(31):
-            # checking if the points are still in range and then
-            # increasing the range of the search radius every iteration
-            if start_point[0] > 0:
-                start_point = (start_point[0] - 1, start_point[1])
-            if start_point[1] > 0:
-                start_point = (start_point[0], start_point[1] - 1)
-            if end_point[0] < (MAPSIZE - 1):
-                end_point = (end_point[0] + 1, end_point[1])
-            if end_point[1] < (MAPSIZE - 1):
-                end_point = (end_point[0], end_point[1] + 1)
-
-            for y in range(start_point[1], end_point[1]):
-                for x in range(start_point[0], end_point[0]):
-                    if self.map[y][x] == 0:  # checks for berry entry
-                        self.food_found = True
-                        self.food_point = (x, y)
-                        break
-                if self.food_found:
-                    break
-
-            if self.food_found:
-                break
-
-        if self.food_found:
-            self.queued_movements = ast.find_path(
-                self.map, self.__convert_pos__(self.pos), self.food_point
-            )
+        """Looks up the path to the nearest reachable berry in the berry distance field of the world and changes the corresponding variables."""
+        path = self.world.berry_field.path(self.__convert_pos__(self.pos))
+        if path:
+            self.food_found = True
+            self.food_point = path[-1]
+            self.queued_movements = path
+            self.__log_path__(path)
 
     def __find_water__(self) -> None:
-        """Checks if a water tile is in range, searches a path to it and changes the corresponding variables."""
-        start_point = self.__convert_pos__(self.pos)
-        end_point = self.__convert_pos__(self.pos)
-        for _ in range(31):
-            # checking if the points are still in range and then
-            # increasing the range of the search radius every iteration
-            if start_point[0] > 0:
-                start_point = (start_point[0] - 1, start_point[1])
-            if start_point[1] > 0:
-                start_point = (start_point[0], start_point[1] - 1)
-            if end_point[0] < (MAPSIZE - 1):
-                end_point = (end_point[0] + 1, end_point[1])
-            if end_point[1] < (MAPSIZE - 1):
-                end_point = (end_point[0], end_point[1] + 1)
-
-            for y in range(start_point[1], end_point[1]):
-                for x in range(start_point[0], end_point[0]):
-                    if self.map[y][x] == 5 and self.__valid_tile__(
-                        x, y
-                    ):  # checks for water entry
-                        self.water_found = True
-                        self.water_point = (x, y)
-                        break
-                if self.water_found:
-                    break
-
-            if self.water_found:
-                break
-
-        if self.water_found:
-            self.queued_movements = ast.find_path(
-                self.map, self.__convert_pos__(self.pos), self.water_point
-            )
-
-    def __valid_tile__(self, x: int, y: int) -> bool:
-        """Checks if the tile at the given coordinates is valid for movement.
-
-        Args:
-            x (int): The x-coordinate of the tile.
-            y (int): The y-coordinate of the tile.
-
-        Returns:
-            bool: True if the tile is valid for movement, False otherwise.
-        """
-        c = 0
-        if y == 0 or self.map[y - 1][x] == 5.0:  # Checking up
-            c += 1
-        if y == (MAPSIZE - 1) or self.map[y + 1][x] == 5.0:  # Checking down
-            c += 1
-        if x == 0 or self.map[y][x - 1] == 5.0:  # Checking left
-            c += 1
-        if x == (MAPSIZE - 1) or self.map[y][x + 1] == 5.0:  # checking right
-            c += 1
-
-        return c != 4
+        """Looks up the path to the nearest reachable drinkable water tile in the water distance field of the world and changes the corresponding variables."""
+        path = self.world.water_field.path(self.__convert_pos__(self.pos))
+        if path:
+            self.water_found = True
+            self.water_point = path[-1]
+            self.queued_movements = path
+            self.__log_path__(path)
 
     def __find_mate__(self) -> None:
         """Checks if an appropriate animal is in range, searches a path to it and changes the corresponding variables."""
-        start_point = self.__convert_pos__(self.pos)
-        end_point = self.__convert_pos__(self.pos)
-        for _ in range(31):
-            if start_point[0] > 0:
-                start_point = (start_point[0] - 1, start_point[1])
-            if start_point[1] > 0:
-                start_point = (start_point[0], start_point[1] - 1)
-            if end_point[0] < (MAPSIZE - 1):
-                end_point = (end_point[0] + 1, end_point[1])
-            if end_point[1] < (MAPSIZE - 1):
-                end_point = (end_point[0], end_point[1] + 1)
-
-            for entry in self.population:
-                mate_pos_conv = self.__convert_pos__(self.population[entry].pos)
-                # checks if the entry:
-                # 1. is in range
-                # 2. doesn't have a mate
-                # 3. is not itself
-                # 4. has reached mating age
-                if (
-                    self.__inside_range__(start_point, end_point, mate_pos_conv)
-                    and not self.population[entry].mate
-                    and self.population[entry].key != self.key
-                    and self.population[entry].age > 100
-                ):
-                    self.mate_pos = mate_pos_conv
-                    self.population[entry].mate = self
-                    self.mate = self.population[entry]
-                    break
-
-            if self.mate_pos:
-                break
-
-        if self.mate_pos:
-            self.queued_movements = ast.find_path(
-                self.map, self.__convert_pos__(self.pos), self.mate_pos
-            )
-            self.path_length = len(self.queued_movements)
+        # the found animal:
+        # 1. is in range
+        # 2. doesn't have a mate
+        # 3. is not itself
+        # 4. has reached mating age
+        # 5. can be reached
+        tile = self.__convert_pos__(self.pos)
+        mate = self.world.spatial[self.type].nearest(
+            tile,
+            31,
+            lambda entry: not entry.mate
+            and entry.key != self.key
+            and entry.age > 100
+            and self.world.reachable(tile, entry.__convert_pos__(entry.pos)),
+        )
+
+        if mate is not None:
+            self.mate_pos = self.__convert_pos__(mate.pos)
+            mate.mate = self
+            self.mate = mate
+            self.world.scheduler.submit(self, self.mate_pos)
 
     def __mating_process__(self, genomes1: dict, genomes2: dict) -> list:
         """Handles the mating process. Sets the corresponding variables and passes the genomes.
@@ -416,15 +342,18 @@ class Animal(Tile):
             genomes2 (dict): genomes from animal 2
 
         Returns:
-            list: contains the animal type, the position and the new genomes
+            list: contains the animal type, the position, the new genomes and the keys of both parents
         """
         new_genomes = self.__generate_genoms__(genomes1, genomes2)
+        parents = (self.key, self.mate.key)
         self.cooldown = 1
         self.mate.cooldown = 1
         self.mate_pos = None
+        self.planner = None
+        self.mate.planner = None
         self.mate.mate = None
         self.mate = None
-        return [self.type, self.pos, new_genomes]
+        return [self.type, self.pos, new_genomes, parents]
 
     def __generate_genoms__(self, genomes1: dict, genomes2: dict) -> dict:
         """Generates a new set of genomes based on the ones passed into the function.
@@ -440,10 +369,11 @@ class Animal(Tile):
         genomes_m = genomes2
 
         inheritance_values = [0 for _ in range(6)]
+        random = self.world.random["mating"]
 
         for i in range(0, 5, 2):
-            t = rnd.randint(0, 1)
-            r = rnd.randint(0, 3)
+            t = random.randint(0, 1)
+            r = random.randint(0, 3)
             if i == 0:  # age values
                 if t == 0 and r >= 1:  # male dominant stays dominant
                     inheritance_values[i] = genomes_m["max_age_d"]
@@ -481,7 +411,7 @@ class Animal(Tile):
                 inheritance_values[i + 1] = genomes_f["thirst_rate_d"]
                 inheritance_values[i] = genomes_m["thirst_rate_r"]
 
-        if rnd.randint(1, 20) == 1:
+        if random.randint(1, 20) == 1:
             inheritance_values = self.__mutate_genes__(inheritance_values)
 
         return {
@@ -504,10 +434,11 @@ class Animal(Tile):
             list: the changed inheritable values
         """
         new_values = inh_val
+        random = self.world.random["mating"]
 
         for i in range(0, 5, 2):
-            mut = round((rnd.uniform(new_values[i], new_values[i + 1]) / 4), 2)
-            x = rnd.randint(0, 1)
+            mut = round((random.uniform(new_values[i], new_values[i + 1]) / 4), 2)
+            x = random.randint(0, 1)
             new_values[i] += mut if x == 0 else (-1) * mut
             new_values[i + 1] += mut if x == 0 else (-1) * mut
 
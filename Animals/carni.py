@@ -12,6 +12,7 @@ class Carnivore(Animal):
         key: int,
         sprite: str,
         group,
+        world,
     ) -> None:
         """Initializes a Carnivore object with specific characteristics.
 
@@ -24,25 +25,32 @@ class Carnivore(Animal):
             key (int): Key value for the Carnivore.
             sprite (str): The sprite representing the Carnivore.
             group: The group the Carnivore belongs to.
+            world (World): The world the Carnivore lives in.
 
         """
-        super().__init__(pos, genoms, population, map, key, sprite, group)
-
         self.huntable = preys
-        self.prey = None
-        self.prey_pos = None
+        self.huntable_index = world.spatial["herbi"]
+        super().__init__(pos, genoms, population, map, key, sprite, group, world)
 
-    def alive(self) -> bool or list:  # type: ignore
-        """Checks if the Carnivore is alive and handles cleanup on death.
-
-        Returns:
-            bool or list: True if alive, False if dead.
+    def __spawn__(self, pos: tuple, genomes: dict, key: int) -> None:
+        """Sets up everything which belongs to a single life of the Carnivore, it starts out without prey.
 
+        Args:
+            pos (tuple): The position of the Carnivore.
+            genomes (dict): Dictionary of genetic information.
+            key (int): Key value for the Carnivore.
         """
-        if value := super().alive():
-            return value
-        self.__cleanup_on_death__()
-        return False
+        super().__spawn__(pos, genomes, key)
+        self.prey = None
+        self.prey_pos = None
+
+    def __cleanup_on_death__(self) -> None:
+        """Cleans up on death, the prey of the Carnivore can be hunted again."""
+        super().__cleanup_on_death__()
+        if self.prey is not None and self.prey.hunter is self:
+            # the prey must not keep a reference to this animal once it is recycled
+            self.prey.hunted = False
+            self.prey.hunter = None
 
     def __find_food__(self) -> None:
         """Finds food for the Carnivore."""
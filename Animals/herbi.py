@@ -11,6 +11,7 @@ class Herbivore(Animal):
         key: int,
         sprite: str,
         group,
+        world,
     ) -> None:
         """Initializes a Herbivore object with specific characteristics.
 
@@ -22,9 +23,19 @@ class Herbivore(Animal):
             key (int): Key value for the Herbivore.
             sprite (str): The sprite representing the Herbivore.
             group: The group the Herbivore belongs to.
+            world (World): The world the Herbivore lives in.
         """
-        super().__init__(pos, genoms, population, map, key, sprite, group)
+        super().__init__(pos, genoms, population, map, key, sprite, group, world)
 
+    def __spawn__(self, pos: tuple, genomes: dict, key: int) -> None:
+        """Sets up everything which belongs to a single life of the Herbivore, it starts out not being hunted.
+
+        Args:
+            pos (tuple): The position of the Herbivore.
+            genomes (dict): Dictionary of genetic information.
+            key (int): Key value for the Herbivore.
+        """
+        super().__spawn__(pos, genomes, key)
         self.hunted = False
         self.hunter = None
 
@@ -32,30 +43,32 @@ class Herbivore(Animal):
         """Cleans up on death by resetting variables for the Herbivore and its hunter."""
         super().__cleanup_on_death__()
         if self.hunted:
+            self.world.scheduler.cancel(self.hunter)
             self.hunter.food_found = False
             self.hunter.food_point = None
             self.hunter.prey = None
             self.hunter.queued_movements = []
             self.hunter.path_length = None
+            self.hunter.planner = None
 
     def alive(self) -> bool or list:  # type: ignore
-        """Checks if the Herbivore is alive, handles interactions with its hunter, and cleans up on death.
+        """Handles interactions with its hunter and checks if the Herbivore got eaten.
 
         Returns:
-            bool or list: True if alive, False if dead.
+            bool or list: False if eaten, otherwise the result of the Animal alive function.
         """
         if self.hunted:
-            self.hunter.queued_movements.append(self.__convert_pos__(self.pos))
+            if self.world.scheduler.pending(self.hunter):
+                # the hunter is still waiting for its path, which should lead here instead
+                self.world.scheduler.submit(self.hunter, self.__convert_pos__(self.pos))
+            else:
+                self.hunter.queued_movements.append(self.__convert_pos__(self.pos))
             self.hunter.food_point = self.__convert_pos__(self.pos)
             if self.hunter.pos == self.pos:
                 self.hunter.hunger -= 350 * (20 - self.hunter.hunger_rate)
-                self.__cleanup_on_death__()
                 return False
 
-        if value := super().alive():
-            return value
-        self.__cleanup_on_death__()
-        return False
+        return super().alive()
 
     def __find_food__(self) -> None:
         """Finds food (berries) for the Herbivore."""
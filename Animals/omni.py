@@ -12,6 +12,7 @@ class Omnivore(Animal):
         key: int,
         sprite: str,
         group,
+        world,
     ) -> None:
         """Initializes an Omnivore object with specific characteristics.
 
@@ -24,23 +25,31 @@ class Omnivore(Animal):
             key (int): Key value for the Omnivore.
             sprite (str): The sprite representing the Omnivore.
             group: The group the Omnivore belongs to.
+            world (World): The world the Omnivore lives in.
         """
-        super().__init__(pos, genoms, population, map, key, sprite, group)
-
         self.huntable = preys
-        self.prey = None
-        self.prey_pos = None
+        self.huntable_index = world.spatial["herbi"]
+        super().__init__(pos, genoms, population, map, key, sprite, group, world)
 
-    def alive(self) -> bool or list:  # type: ignore
-        """Checks if the Omnivore is alive and handles cleanup on death.
+    def __spawn__(self, pos: tuple, genomes: dict, key: int) -> None:
+        """Sets up everything which belongs to a single life of the Omnivore, it starts out without prey.
 
-        Returns:
-            bool or list: True if alive, False if dead.
+        Args:
+            pos (tuple): The position of the Omnivore.
+            genomes (dict): Dictionary of genetic information.
+            key (int): Key value for the Omnivore.
         """
-        if value := super().alive():
-            return value
-        self.__cleanup_on_death__()
-        return value
+        super().__spawn__(pos, genomes, key)
+        self.prey = None
+        self.prey_pos = None
+
+    def __cleanup_on_death__(self) -> None:
+        """Cleans up on death, the prey of the Omnivore can be hunted again."""
+        super().__cleanup_on_death__()
+        if self.prey is not None and self.prey.hunter is self:
+            # the prey must not keep a reference to this animal once it is recycled
+            self.prey.hunted = False
+            self.prey.hunter = None
 
     def __find_food__(self) -> None:
         """Finds food based on hunger level, either prey or berries, for the Omnivore."""
@@ -0,0 +1,240 @@
+import numpy as np
+
+TYPES = ("herbi", "carni", "omni")  # animal types, their index is stored in the type column
+CAUSES = ("predation", "hunger", "thirst", "age")  # causes of death, see AnimalStore.deaths
+# genomes of an animal, the dominant and the recessive value of every trait
+GENOMES = (
+    "max_age_d",
+    "max_age_r",
+    "hunger_rate_d",
+    "hunger_rate_r",
+    "thirst_rate_d",
+    "thirst_rate_r",
+)
+
+# columns of the store and their data types
+COLUMNS = {
+    "x": np.int32,
+    "y": np.int32,
+    "type": np.uint8,
+    "age": np.int32,
+    "max_age": np.float64,
+    "max_age_r": np.float64,  # recessive genome, only kept for statistics
+    "hunger": np.float64,
+    "hunger_rate": np.float64,
+    "hunger_rate_r": np.float64,
+    "thirst": np.float64,
+    "thirst_rate": np.float64,
+    "thirst_rate_r": np.float64,
+    "set_timer": np.int32,
+    "cooldown": np.int32,  # 0 if no mating cooldown is active
+    "food": np.int64,  # tile index of the food point, -1 if there is none
+    "water": np.int64,  # tile index of the water point, -1 if there is none
+    "active": np.bool_,  # slot is used by an alive animal
+    "frozen": np.bool_,  # animal is eating, drinking or mating in the current tick
+    "acting": np.bool_,  # animal takes its turn in the current tick
+    "mated": np.bool_,  # animal mated in the current tick
+}
+
+
+def column(name: str) -> property:
+    """Creates a property which maps an attribute of an animal to its entry in a column of the world's animal store.
+
+    Args:
+        name (str): name of the column
+
+    Returns:
+        property: the property
+    """
+
+    def getter(self):
+        return getattr(self.world.store, name)[self.slot]
+
+    def setter(self, value):
+        getattr(self.world.store, name)[self.slot] = value
+
+    return property(getter, setter)
+
+
+def point_column(name: str) -> property:
+    """Creates a property which maps a point (tuple or None) of an animal to a tile index in a column of the world's animal store.
+
+    Args:
+        name (str): name of the column
+
+    Returns:
+        property: the property
+    """
+
+    def getter(self):
+        index = getattr(self.world.store, name)[self.slot]
+        if index < 0:
+            return None
+        return int(index % self.world.store.width), int(index // self.world.store.width)
+
+    def setter(self, value):
+        getattr(self.world.store, name)[self.slot] = (
+            -1 if value is None else value[1] * self.world.store.width + value[0]
+        )
+
+    return property(getter, setter)
+
+
+class AnimalStore:
+    """Structure of arrays holding the per-tick state of all animals of a world.
+
+    Every animal owns a slot, its values are stored at that index in parallel NumPy columns. Slots of dead animals are reused
+    through a free-list. The bookkeeping of a tick (aging, timers, hunger and thirst, eating and drinking, deaths) runs as array
+    operations over the whole population, only the decisions of the animals are made one by one.
+    """
+
+    def __init__(self, width: int, capacity: int = 64) -> None:
+        """Initializes an empty store.
+
+        Args:
+            width (int): width of the map in tiles, used to store points as tile indices
+            capacity (int, optional): initial number of slots. Defaults to 64.
+        """
+        self.width = width
+        self.capacity = capacity
+        self.size = 0  # slots in use or on the free-list
+        self.free = []
+        self.animals = [None] * capacity  # slot -> animal
+        for name, dtype in COLUMNS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def __grow__(self) -> None:
+        """Doubles the number of slots."""
+        capacity = self.capacity * 2
+        for name, dtype in COLUMNS.items():
+            grown = np.zeros(capacity, dtype=dtype)
+            grown[: self.capacity] = getattr(self, name)
+            setattr(self, name, grown)
+        self.animals += [None] * (capacity - self.capacity)
+        self.capacity = capacity
+
+    def add(self, animal, tile: tuple, genomes: dict) -> int:
+        """Assigns a slot to a new animal and initializes its values.
+
+        Args:
+            animal: the new animal
+            tile (tuple): coordinates of the tile the animal stands on
+            genomes (dict): genomes of the animal
+
+        Returns:
+            int: the slot of the animal
+        """
+        if self.free:
+            slot = self.free.pop()
+        else:
+            if self.size == self.capacity:
+                self.__grow__()
+            slot = self.size
+            self.size += 1
+
+        self.animals[slot] = animal
+        for name in COLUMNS:
+            getattr(self, name)[slot] = 0
+        self.x[slot], self.y[slot] = tile
+        self.type[slot] = TYPES.index(genomes["animal_type"])
+        self.max_age[slot] = genomes["max_age_d"]
+        self.hunger_rate[slot] = genomes["hunger_rate_d"]
+        self.thirst_rate[slot] = genomes["thirst_rate_d"]
+        self.max_age_r[slot] = genomes["max_age_r"]
+        self.hunger_rate_r[slot] = genomes["hunger_rate_r"]
+        self.thirst_rate_r[slot] = genomes["thirst_rate_r"]
+        self.food[slot] = -1
+        self.water[slot] = -1
+        self.active[slot] = True
+        return slot
+
+    def remove(self, slots: list) -> None:
+        """Frees the slots of dead animals.
+
+        Args:
+            slots (list): the slots
+        """
+        for slot in slots:
+            self.animals[slot] = None
+        self.active[slots] = False
+        self.acting[slots] = False
+        self.free.extend(slots)
+
+    def begin_tick(self) -> None:
+        """First half of the bookkeeping of a tick: aging, timers of eating/drinking/mating animals and mating cooldowns. Animals
+        whose timer was running are frozen for this tick, all others are acting."""
+        n = self.size
+        active = self.active[:n]
+        self.age[:n][active] += 1
+
+        frozen = active & (self.set_timer[:n] > 0)
+        self.frozen[:n] = frozen
+        self.set_timer[:n][frozen] -= 1
+
+        acting = active & ~frozen
+        self.acting[:n] = acting
+        self.mated[:n] = False
+
+        cooldown = self.cooldown[:n]
+        cooling = acting & (cooldown > 0)
+        cooldown[cooling] = np.where(cooldown[cooling] >= 100, 0, cooldown[cooling] + 1)
+
+    def end_tick(self) -> tuple:
+        """Second half of the bookkeeping of a tick: acting animals which reached their food or water point eat or drink, the
+        hunger and thirst of all acting animals which didn't mate increases.
+
+        Returns:
+            tuple: the animals which ate and the animals which drank
+        """
+        n = self.size
+        acting = self.acting[:n]
+        tiles = self.y[:n].astype(np.int64) * self.width + self.x[:n]
+
+        ate = acting & (self.food[:n] >= 0) & (tiles == self.food[:n])
+        drank = acting & ~ate & (self.water[:n] >= 0) & (tiles == self.water[:n])
+
+        self.hunger[:n][ate] -= 350 * (20 - self.hunger_rate[:n][ate])
+        self.food[:n][ate] = -1
+        self.thirst[:n][drank] -= 350 * (20 - self.thirst_rate[:n][drank])
+        self.water[:n][drank] = -1
+        self.set_timer[:n][ate | drank] = 10
+
+        growing = acting & ~self.mated[:n]
+        self.hunger[:n][growing] += self.hunger_rate[:n][growing]
+        self.thirst[:n][growing] += self.thirst_rate[:n][growing]
+
+        return (
+            [self.animals[slot] for slot in np.flatnonzero(ate)],
+            [self.animals[slot] for slot in np.flatnonzero(drank)],
+        )
+
+    def deciding(self) -> list:
+        """Returns the animals which acted in this tick without mating, they get to decide what they need next.
+
+        Returns:
+            list: the animals
+        """
+        n = self.size
+        return [
+            self.animals[slot]
+            for slot in np.flatnonzero(self.acting[:n] & ~self.mated[:n])
+        ]
+
+    def deaths(self) -> tuple:
+        """Returns all animals which died of hunger, thirst or age. An animal which died of several causes at once counts as
+        starved before dying of thirst before dying of age.
+
+        Returns:
+            tuple: the dead animals and the index of their cause of death in CAUSES
+        """
+        n = self.size
+        hungry = self.hunger[:n] >= 1000
+        thirsty = self.thirst[:n] >= 1000
+        old = self.age[:n] >= self.max_age[:n]
+        slots = np.flatnonzero(self.active[:n] & (hungry | thirsty | old))
+        causes = np.where(
+            hungry[slots],
+            CAUSES.index("hunger"),
+            np.where(thirsty[slots], CAUSES.index("thirst"), CAUSES.index("age")),
+        )
+        return [self.animals[slot] for slot in slots], causes.tolist()
@@ -0,0 +1,111 @@
+from settings import *
+
+
+class Camera:
+    """Part of the map shown in the window, which can be scrolled and zoomed.
+
+    The zoom is given in pixels per tile. Zoomed in, a tile covers several pixels and every tile is drawn. Zoomed out below one
+    pixel per tile, only every step-th tile of every step-th row is sampled, so the number of cells drawn never exceeds the
+    pixels of the view no matter how large the map is. Below DENSITY_ZOOM the animals are too small to be told apart, they are
+    counted in blocks of DENSITY_BLOCK pixels instead.
+    """
+
+    def __init__(self, map_size: int, view: int = VIEWSIZE, zoom: float = TILESIZE) -> None:
+        """Initializes a camera in the top left corner of the map.
+
+        Args:
+            map_size (int): length/height of the map in tiles
+            view (int, optional): length/height of the view in pixels. Defaults to VIEWSIZE.
+            zoom (float, optional): initial zoom, one of ZOOM_LEVELS. Defaults to TILESIZE.
+        """
+        self.map_size = map_size
+        self.view = view
+        self.level = ZOOM_LEVELS.index(zoom)
+        self.x = 0.0  # tile in the top left corner
+        self.y = 0.0
+
+    @property
+    def zoom(self) -> float:
+        """Returns the pixels per tile."""
+        return ZOOM_LEVELS[self.level]
+
+    def step(self) -> int:
+        """Returns the number of tiles per cell, 1 unless zoomed out below one pixel per tile.
+
+        Returns:
+            int: the tiles per cell
+        """
+        return max(round(1 / self.zoom), 1)
+
+    def scale(self) -> int:
+        """Returns the length/height of a cell in pixels.
+
+        Returns:
+            int: the pixels per cell
+        """
+        return max(round(self.zoom), 1)
+
+    def block(self) -> int:
+        """Returns the length/height of a density block in tiles.
+
+        Returns:
+            int: the tiles per block, 0 if the animals are drawn one by one
+        """
+        if self.zoom >= DENSITY_ZOOM:
+            return 0
+        return max(round(DENSITY_BLOCK / self.zoom), 1)
+
+    def __clamp__(self) -> None:
+        """Keeps the view inside the map."""
+        limit = max(self.map_size - self.view / self.zoom, 0)
+        self.x = min(max(self.x, 0), limit)
+        self.y = min(max(self.y, 0), limit)
+
+    def scroll(self, dx: float, dy: float) -> None:
+        """Moves the view.
+
+        Args:
+            dx (float): distance in pixels along the x-axis
+            dy (float): distance in pixels along the y-axis
+        """
+        self.x += dx / self.zoom
+        self.y += dy / self.zoom
+        self.__clamp__()
+
+    def zoom_at(self, steps: int, anchor: tuple) -> None:
+        """Zooms in (positive steps) or out (negative steps) by some levels, keeping the tile under the anchor in place.
+
+        Args:
+            steps (int): the number of zoom levels
+            anchor (tuple): position of the anchor in pixels, relative to the view
+        """
+        x = self.x + anchor[0] / self.zoom
+        y = self.y + anchor[1] / self.zoom
+        self.level = min(max(self.level - steps, 0), len(ZOOM_LEVELS) - 1)
+        self.x = x - anchor[0] / self.zoom
+        self.y = y - anchor[1] / self.zoom
+        self.__clamp__()
+
+    def request(self) -> tuple:
+        """Returns the view the simulation has to publish snapshots of. Its corner is aligned to whole cells and blocks, so
+        scrolling doesn't change which tiles get sampled.
+
+        Returns:
+            tuple: x0, y0, x1, y1 (the area in tiles), the tiles per cell, the tiles per density block and the pixels per cell
+        """
+        step, block = self.step(), self.block()
+        align = max(step, block)
+        x0 = int(self.x) // align * align
+        y0 = int(self.y) // align * align
+        span = int(self.view / self.zoom) + align
+        # the view may end in a partial cell, but never holds more cells than pixels
+        span = min(span, self.view // self.scale() * step)
+        return (
+            x0,
+            y0,
+            min(x0 + span, self.map_size),
+            min(y0 + span, self.map_size),
+            step,
+            block,
+            self.scale(),
+        )
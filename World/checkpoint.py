@@ -0,0 +1,312 @@
+import json
+import os
+import threading
+import numpy as np
+from settings import *
+from World.world import World
+from World.tile import Tile
+from Animals.store import COLUMNS, TYPES, GENOMES
+from Animals.herbi import Herbivore
+from Animals.carni import Carnivore
+from Animals.omni import Omnivore
+
+# a checkpoint starts with the magic bytes, the format version and the length of its JSON header, followed by the header and
+# the raw arrays it describes
+MAGIC = b"PYCOSYS\x00"
+VERSION = 3
+ALIGNMENT = 64  # every array starts at a multiple of this, so it can be memory-mapped
+CLASSES = {"herbi": Herbivore, "carni": Carnivore, "omni": Omnivore}
+
+
+def capture(world: World) -> tuple:
+    """Copies the complete state of a world between two ticks into flat arrays.
+
+    The columns of the animal store are copied as they are. Everything else an animal holds becomes one column per attribute,
+    one record per animal in the order the animals act in. References to other animals (mate, hunter, prey) are stored as the
+    index of their record, -1 if there is none, and points as tile indices. The queued movements of all animals are
+    concatenated into one array with an offset per animal.
+
+    Args:
+        world (World): the world
+
+    Returns:
+        tuple: the header values and the arrays, by name
+    """
+    if world.chunked:
+        raise ValueError("Chunked worlds can't be checkpointed")
+
+    store = world.store
+    width = store.width
+    animals = list(world.alive_sprites)
+    index = {animal: i for i, animal in enumerate(animals)}
+
+    def ref(animal) -> int:
+        return -1 if animal is None else index.get(animal, -1)
+
+    def point(pos: tuple) -> int:
+        return -1 if pos is None else pos[1] * width + pos[0]
+
+    arrays = {"terrain": np.array(world.map, dtype=np.uint8)}
+    for name in COLUMNS:
+        arrays["store." + name] = getattr(store, name)[: store.size].copy()
+    arrays["store.free"] = np.array(store.free, dtype=np.int64)
+
+    # every random stream of the world continues where it stopped
+    random = {}
+    for name, stream in world.random.items():
+        state_version, state, gauss_next = stream.getstate()
+        arrays["random." + name] = np.array(state, dtype=np.uint32)
+        random[name] = [state_version, gauss_next]
+
+    arrays["slot"] = np.array([animal.slot for animal in animals], dtype=np.int64)
+    arrays["key"] = np.array([animal.key for animal in animals], dtype=np.int64)
+    arrays["genomes"] = np.array(
+        [[animal.genomes[name] for name in GENOMES] for animal in animals],
+        dtype=np.float64,
+    ).reshape(len(animals), len(GENOMES))
+    arrays["path_length"] = np.array(
+        [-1 if animal.path_length is None else animal.path_length for animal in animals],
+        dtype=np.int64,
+    )
+    arrays["food_found"] = np.array([animal.food_found for animal in animals], dtype=np.bool_)
+    arrays["water_found"] = np.array([animal.water_found for animal in animals], dtype=np.bool_)
+    arrays["mate"] = np.array([ref(animal.mate) for animal in animals], dtype=np.int64)
+    arrays["mate_pos"] = np.array([point(animal.mate_pos) for animal in animals], dtype=np.int64)
+    arrays["hunted"] = np.array(
+        [getattr(animal, "hunted", False) for animal in animals], dtype=np.bool_
+    )
+    arrays["hunter"] = np.array(
+        [ref(getattr(animal, "hunter", None)) for animal in animals], dtype=np.int64
+    )
+    arrays["prey"] = np.array(
+        [ref(getattr(animal, "prey", None)) for animal in animals], dtype=np.int64
+    )
+    arrays["prey_pos"] = np.array(
+        [point(getattr(animal, "prey_pos", None)) for animal in animals], dtype=np.int64
+    )
+
+    lengths = [len(animal.queued_movements) for animal in animals]
+    arrays["moves_offset"] = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+    arrays["moves"] = np.array(
+        [tile for animal in animals for tile in animal.queued_movements], dtype=np.int32
+    ).reshape(-1, 2)
+
+    # the order within a bucket decides between equally near animals, so it has to survive
+    for type in TYPES:
+        arrays["spatial." + type] = np.array(
+            [index[animal] for bucket in world.spatial[type].buckets.values() for animal in bucket],
+            dtype=np.int64,
+        )
+
+    requests = world.scheduler.requests
+    arrays["requests"] = np.array([index[animal] for animal in requests], dtype=np.int64)
+    arrays["request_goals"] = np.array(list(requests.values()), dtype=np.int32).reshape(-1, 2)
+
+    header = {
+        "ticks": world.ticks,
+        "keys": [world.herb_key, world.carn_key, world.omnis_key],
+        "seed": world.seed,
+        "seeded": world.seeded,
+        "random": random,
+        "capacity": store.capacity,
+    }
+    return header, arrays
+
+
+def write(path: str, header: dict, arrays: dict) -> None:
+    """Writes captured state to a checkpoint file. The file is written next to its destination first and only replaces it
+    once complete, so a crash while saving keeps the previous checkpoint intact.
+
+    Args:
+        path (str): path of the checkpoint
+        header (dict): header values, see capture
+        arrays (dict): arrays by name, see capture
+    """
+    header = dict(header, arrays={})
+    offset = 0
+    for name, array in arrays.items():
+        header["arrays"][name] = {
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += array.nbytes + -array.nbytes % ALIGNMENT
+    encoded = json.dumps(header).encode()
+
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as file:
+        file.write(MAGIC)
+        file.write(np.array([VERSION, len(encoded)], dtype="<u4").tobytes())
+        file.write(encoded)
+        file.write(bytes(-file.tell() % ALIGNMENT))
+        for array in arrays.values():
+            file.write(np.ascontiguousarray(array).tobytes())
+            file.write(bytes(-array.nbytes % ALIGNMENT))
+    os.replace(temporary, path)
+
+
+def save(world: World, path: str, background: bool = True) -> threading.Thread:
+    """Saves a checkpoint of a world. Only copying the state holds up the simulation, the file gets written in the background.
+
+    Args:
+        world (World): the world, between two ticks
+        path (str): path of the checkpoint
+        background (bool, optional): writes the file in a separate thread. Defaults to True.
+
+    Returns:
+        threading.Thread: the thread writing the file, None if it was written right away
+    """
+    header, arrays = capture(world)
+    if not background:
+        write(path, header, arrays)
+        return None
+    thread = threading.Thread(target=write, args=(path, header, arrays))
+    thread.start()
+    return thread
+
+
+def __read__(path: str) -> tuple:
+    """Reads the header of a checkpoint and maps its arrays into memory without reading them.
+
+    Args:
+        path (str): path of the checkpoint
+
+    Returns:
+        tuple: the header values and the arrays, by name
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is no checkpoint")
+        version, length = np.frombuffer(file.read(8), dtype="<u4").tolist()
+        if version != VERSION:
+            raise ValueError(f"Checkpoint version {version} isn't supported, expected {VERSION}")
+        header = json.loads(file.read(length))
+    start = len(MAGIC) + 8 + length
+    start += -start % ALIGNMENT
+
+    arrays = {}
+    for name, spec in header.pop("arrays").items():
+        shape = tuple(spec["shape"])
+        if 0 in shape:  # empty arrays can't be mapped
+            arrays[name] = np.zeros(shape, dtype=spec["dtype"])
+        else:
+            # copy-on-write, changes of the world never reach the file
+            arrays[name] = np.memmap(
+                path, dtype=spec["dtype"], mode="c", offset=start + spec["offset"], shape=shape
+            )
+    return header, arrays
+
+
+def load(path: str, headless: bool = True, telemetry: str = TELEMETRY_DIRECTORY) -> World:
+    """Restores a world from a checkpoint, including the state of its random streams. The terrain stays mapped to the file,
+    the animals are set up directly from their records instead of being born again.
+
+    Args:
+        path (str): path of the checkpoint
+        headless (bool, optional): restores a headless world, see World. Defaults to True.
+        telemetry (str, optional): directory the statistics of the resumed run get recorded to, see World. Defaults to TELEMETRY_DIRECTORY.
+
+    Returns:
+        World: the world, ready for its next tick
+    """
+    header, arrays = __read__(path)
+    world = World(
+        arrays["terrain"],
+        headless=headless,
+        populate=False,
+        telemetry=telemetry,
+        seed=header["seed"] if header["seeded"] else None,
+    )
+    world.seed = header["seed"]
+    world.ticks = header["ticks"]
+    world.herb_key, world.carn_key, world.omnis_key = header["keys"]
+    for name, (state_version, gauss_next) in header["random"].items():
+        state = tuple(arrays["random." + name].tolist())
+        world.random[name].setstate((state_version, state, gauss_next))
+
+    # the store gets its columns back as they were, including the free slots
+    store = world.store
+    store.capacity = header["capacity"]
+    store.size = len(arrays["store.active"])
+    for name, dtype in COLUMNS.items():
+        column = np.zeros(store.capacity, dtype=dtype)
+        column[: store.size] = arrays["store." + name]
+        setattr(store, name, column)
+    store.free = arrays["store.free"].tolist()
+    store.animals = [None] * store.capacity
+
+    populations = {"herbi": world.herbis, "carni": world.carnis, "omni": world.omnis}
+    slots = arrays["slot"].tolist()
+    keys = arrays["key"].tolist()
+    types = [TYPES[type] for type in store.type[arrays["slot"]].tolist()]
+    tiles = list(zip(store.x[arrays["slot"]].tolist(), store.y[arrays["slot"]].tolist()))
+    genomes = arrays["genomes"].tolist()
+    path_lengths = arrays["path_length"].tolist()
+    food_found = arrays["food_found"].tolist()
+    water_found = arrays["water_found"].tolist()
+    offsets = arrays["moves_offset"].tolist()
+    moves = list(map(tuple, arrays["moves"].tolist()))
+
+    def point(index: int) -> tuple:
+        return None if index < 0 else (index % store.width, index // store.width)
+
+    animals = []
+    for i, type in enumerate(types):
+        cls = CLASSES[type]
+        animal = cls.__new__(cls)  # nothing gets initialized twice
+        tile = tiles[i]
+        pos = (tile[0] * TILESIZE, tile[1] * TILESIZE)
+        Tile.__init__(animal, pos, world.images[type], ())
+        if type != "herbi":
+            animal.huntable = world.herbis
+            animal.huntable_index = world.spatial["herbi"]
+        animal.map = world.map
+        animal.world = world
+        animal.population = populations[type]
+        animal.pos = pos
+        animal.genomes = dict(zip(GENOMES, genomes[i]), animal_type=type)
+        animal.key = keys[i]
+        animal.slot = slots[i]
+        animal.type = type
+        animal.queued_movements = moves[offsets[i] : offsets[i + 1]]
+        animal.path_length = None if path_lengths[i] < 0 else path_lengths[i]
+        animal.planner = None  # only a cache of the last search, the next replan starts a new one
+        animal.food_found = food_found[i]
+        animal.water_found = water_found[i]
+        store.animals[animal.slot] = animal
+        animals.append(animal)
+
+    # the links can only be set once every animal exists
+    def link(index: int):
+        return None if index < 0 else animals[index]
+
+    mates = arrays["mate"].tolist()
+    mate_positions = arrays["mate_pos"].tolist()
+    hunted = arrays["hunted"].tolist()
+    hunters = arrays["hunter"].tolist()
+    preys = arrays["prey"].tolist()
+    prey_positions = arrays["prey_pos"].tolist()
+    for i, animal in enumerate(animals):
+        animal.mate = link(mates[i])
+        animal.mate_pos = point(mate_positions[i])
+        if animal.type == "herbi":
+            animal.hunted = hunted[i]
+            animal.hunter = link(hunters[i])
+        else:
+            animal.prey = link(preys[i])
+            animal.prey_pos = point(prey_positions[i])
+
+    # keys only ever grow, so the dictionaries were in key order
+    for i in sorted(range(len(animals)), key=keys.__getitem__):
+        animal = animals[i]
+        populations[animal.type][animal.key] = animal
+    for type in TYPES:
+        spatial = world.spatial[type]
+        for i in arrays["spatial." + type].tolist():
+            spatial.insert(animals[i], tiles[i])
+    world.alive_sprites.add(animals)
+
+    goals = arrays["request_goals"].tolist()
+    for i, goal in zip(arrays["requests"].tolist(), goals):
+        world.scheduler.submit(animals[i], tuple(goal))
+    return world
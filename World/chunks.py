@@ -0,0 +1,229 @@
+import os
+import random as rnd
+import shutil
+import tempfile
+from collections import OrderedDict
+import numpy as np
+import astar as ast
+from settings import *
+from generator import generate_chunk
+
+
+class ChunkedMap:
+    """Map of a chunked world, which is generated chunk by chunk the first time a tile of it gets read.
+
+    It can be indexed like the array of a normal map (map[y, x]), the chunks behind it are kept in memory in least recently
+    used order. Once more than capacity chunks are loaded, the least recently used ones without animals on or next to them get
+    written to disk and dropped, they are read back in as soon as they are needed again.
+    """
+
+    def __init__(
+        self,
+        size: int = CHUNKED_MAPSIZE,
+        gseed: int = None,
+        chunk_size: int = CHUNKSIZE,
+        capacity: int = MAX_LOADED_CHUNKS,
+        directory: str = None,
+        random=None,
+    ) -> None:
+        """Initializes an empty chunked map.
+
+        Args:
+            size (int, optional): length/height of the map. Defaults to CHUNKED_MAPSIZE.
+            gseed (int, optional): the random seed in case a map needs to be recreated. Defaults to none.
+            chunk_size (int, optional): length/height of a chunk. Defaults to CHUNKSIZE.
+            capacity (int, optional): number of chunks kept in memory. Defaults to MAX_LOADED_CHUNKS.
+            directory (str, optional): directory evicted chunks get written to, a temporary one if none is given. Defaults to none.
+            random (random.Random, optional): draws the seeds if no gseed is given. Defaults to the global generator.
+        """
+        self.size = size
+        self.shape = (size, size)
+        self.chunk_size = chunk_size
+        self.capacity = capacity
+        self.temporary = directory is None  # a directory of its own gets deleted on close
+        self.directory = directory or tempfile.mkdtemp(prefix="pycosystem-chunks-")
+        self.seeds = [
+            (random or rnd).randint(0, 999999999) if gseed is None else gseed
+            for _ in range(4)
+        ]
+
+        self.chunks = OrderedDict()  # (cx, cy) -> chunk, least recently used first
+        self.saved = set()  # chunks whose copy on disk is up to date
+        self.generated = 0
+        self.evicted = 0
+
+        self.path_grid = ast.LazyPathGrid(self)
+
+    def __len__(self) -> int:
+        """Returns the length/height of the map."""
+        return self.size
+
+    def close(self) -> None:
+        """Deletes the evicted chunks if the map created their directory itself, a directory passed in is left as it is."""
+        if self.temporary:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self.temporary = False
+
+    def __chunk_file__(self, key: tuple) -> str:
+        """Returns the file an evicted chunk is stored in.
+
+        Args:
+            key (tuple): coordinates of the chunk
+
+        Returns:
+            str: the file name
+        """
+        return os.path.join(self.directory, f"{key[0]}_{key[1]}.npy")
+
+    def chunk(self, cx: int, cy: int) -> np.ndarray:
+        """Returns a chunk, reading it from disk or generating it if it isn't loaded.
+
+        Args:
+            cx (int): x-coordinate of the chunk
+            cy (int): y-coordinate of the chunk
+
+        Returns:
+            numpy.ndarray: the chunk
+        """
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        if key in self.saved:
+            chunk = np.load(self.__chunk_file__(key))
+        else:
+            chunk = generate_chunk(
+                self.seeds,
+                cx * self.chunk_size,
+                cy * self.chunk_size,
+                self.chunk_size,
+                CHUNK_SCALE,
+            )
+            self.generated += 1
+        self.chunks[key] = chunk
+        return chunk
+
+    def __getitem__(self, pos: tuple):
+        """Returns the terrain code of a tile, or a copy of a rectangular area if both coordinates are slices.
+
+        Args:
+            pos (tuple): y- and x-coordinate of the tile, or slices of the area
+
+        Returns:
+            the terrain code or a numpy.ndarray holding the area
+        """
+        y, x = pos
+        if isinstance(y, slice):
+            return self.__region__(y, x)
+        size = self.chunk_size
+        return self.chunk(x // size, y // size)[y % size, x % size]
+
+    def __region__(self, rows: slice, columns: slice) -> np.ndarray:
+        """Copies a rectangular area out of the chunks overlapping it.
+
+        Args:
+            rows (slice): the rows of the area
+            columns (slice): the columns of the area
+
+        Returns:
+            numpy.ndarray: the area
+        """
+        y0, y1, _ = rows.indices(self.size)
+        x0, x1, _ = columns.indices(self.size)
+        size = self.chunk_size
+        region = np.empty((max(y1 - y0, 0), max(x1 - x0, 0)), dtype=np.uint8)
+        for cy in range(y0 // size, (y1 - 1) // size + 1):
+            for cx in range(x0 // size, (x1 - 1) // size + 1):
+                chunk = self.chunk(cx, cy)
+                top, left = max(y0, cy * size), max(x0, cx * size)
+                bottom, right = min(y1, (cy + 1) * size), min(x1, (cx + 1) * size)
+                region[top - y0 : bottom - y0, left - x0 : right - x0] = chunk[
+                    top - cy * size : bottom - cy * size,
+                    left - cx * size : right - cx * size,
+                ]
+        return region
+
+    def peek(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> np.ndarray:
+        """Samples every step-th tile of every step-th row of an area without generating or loading anything. Only the loaded
+        chunks are visited, tiles outside of them are UNKNOWN, so the cost doesn't depend on the size of the area.
+
+        Args:
+            x0 (int): x-coordinate of the top left tile
+            y0 (int): y-coordinate of the top left tile
+            x1 (int): x-coordinate after the right edge
+            y1 (int): y-coordinate after the bottom edge
+            step (int, optional): distance between two samples in tiles. Defaults to 1.
+
+        Returns:
+            numpy.ndarray: the sampled terrain codes
+        """
+        size = self.chunk_size
+        samples = np.full(
+            (-(-(y1 - y0) // step), -(-(x1 - x0) // step)), UNKNOWN, dtype=np.uint8
+        )
+        for (cx, cy), chunk in self.chunks.items():
+            # first sampled tile inside the chunk and the end of the overlap, per axis
+            left = x0 + -(-(max(cx * size, x0) - x0) // step) * step
+            top = y0 + -(-(max(cy * size, y0) - y0) // step) * step
+            right, bottom = min((cx + 1) * size, x1), min((cy + 1) * size, y1)
+            if left >= right or top >= bottom:
+                continue
+            part = chunk[
+                top - cy * size : bottom - cy * size : step,
+                left - cx * size : right - cx * size : step,
+            ]
+            row, column = (top - y0) // step, (left - x0) // step
+            samples[row : row + part.shape[0], column : column + part.shape[1]] = part
+        return samples
+
+    def __setitem__(self, pos: tuple, value: int) -> None:
+        """Changes the terrain code of a tile.
+
+        Args:
+            pos (tuple): y- and x-coordinate of the tile
+            value (int): the new terrain code
+        """
+        y, x = pos
+        size = self.chunk_size
+        self.chunk(x // size, y // size)[y % size, x % size] = value
+        self.saved.discard((x // size, y // size))
+
+    def load_around(self, keys, radius: int = 1) -> set:
+        """Makes sure all chunks within a radius around the given ones are loaded, so animals never walk into missing terrain.
+
+        Args:
+            keys: coordinates of the chunks
+            radius (int, optional): radius in chunks. Defaults to 1.
+
+        Returns:
+            set: coordinates of all chunks within the radius, the ones to pin when evicting
+        """
+        last = (self.size - 1) // self.chunk_size
+        around = set()
+        for cx, cy in keys:
+            for y in range(max(cy - radius, 0), min(cy + radius, last) + 1):
+                for x in range(max(cx - radius, 0), min(cx + radius, last) + 1):
+                    around.add((x, y))
+        for x, y in around:
+            self.chunk(x, y)
+        return around
+
+    def evict(self, pinned: set) -> None:
+        """Writes the least recently used chunks to disk and drops them until at most capacity chunks are loaded. Pinned chunks,
+        i.e. the ones with animals on or next to them, are never evicted.
+
+        Args:
+            pinned (set): coordinates of the chunks which have to stay loaded
+        """
+        if len(self.chunks) <= self.capacity:
+            return
+        for key in [key for key in self.chunks if key not in pinned]:
+            if len(self.chunks) <= self.capacity:
+                break
+            chunk = self.chunks.pop(key)
+            if key not in self.saved:
+                np.save(self.__chunk_file__(key), chunk)
+                self.saved.add(key)
+            self.evicted += 1
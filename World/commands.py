@@ -0,0 +1,53 @@
+class CommandBuffer:
+    """Births and deaths of the current tick.
+
+    While a tick runs, the animals only emit them, the world applies all of them at once afterwards. No population dictionary,
+    spatial hash, sprite group or store slot changes while the animals are being iterated, so the outcome of a tick doesn't
+    depend on which animal happened to act first.
+    """
+
+    def __init__(self) -> None:
+        """Initializes an empty buffer."""
+        self.spawns = []  # type, position, genomes and parents of every birth, in the order they were emitted
+        self.despawns = {}  # dead animal -> cause of death, the dictionary keeps their order and drops animals which died twice
+
+    def __len__(self) -> int:
+        """Returns the number of pending commands."""
+        return len(self.spawns) + len(self.despawns)
+
+    def spawn(self, type: str, pos: tuple, genomes: dict, parents: tuple = None) -> None:
+        """Emits the birth of an animal.
+
+        Args:
+            type (str): the animal type
+            pos (tuple): the position the animal will be spawned at, in pixels
+            genomes (dict): the genomes of the animal
+            parents (tuple, optional): the keys of its parents. Defaults to none.
+        """
+        self.spawns.append((type, pos, genomes, parents))
+
+    def despawn(self, animal, cause: int) -> bool:
+        """Emits the death of an animal.
+
+        Args:
+            animal: the dead animal
+            cause (int): index of the cause of death in Animals.store.CAUSES
+
+        Returns:
+            bool: false if the death of the animal was already emitted in this tick
+        """
+        if animal in self.despawns:
+            return False
+        self.despawns[animal] = cause
+        return True
+
+    def drain(self) -> tuple:
+        """Takes all pending commands out of the buffer.
+
+        Returns:
+            tuple: the births and the dead animals with their causes of death
+        """
+        spawns, despawns = self.spawns, self.despawns
+        self.spawns = []
+        self.despawns = {}
+        return spawns, despawns
@@ -0,0 +1,175 @@
+import os
+import struct
+import numpy as np
+from settings import *
+from Animals.store import TYPES, GENOMES
+
+# an event log starts with the magic bytes and the format version, followed by the records. Every record starts with the
+# tick, its kind, the type and key of the animal and the length of its payload, so a reader can skip records it doesn't need.
+MAGIC = b"PYCOLOG\x00"
+VERSION = 1
+RECORD = struct.Struct("<IBBII")
+SPAWN, DEATH, PATH = range(3)  # kinds of records
+
+# payloads
+SPAWN_DATA = struct.Struct("<iiII" + "d" * len(GENOMES))  # tile, keys of the parents (0 if none), genomes
+DEATH_DATA = struct.Struct("<B")  # cause of death, see Animals.store.CAUSES
+PATH_DATA = struct.Struct("<iiIB")  # start tile, number of tiles, encoding, followed by the tiles
+PACKED, RAW = range(2)  # tiles as 2 bits per step to a neighboring tile or as x/y pairs
+STEPS = ((0, -1), (1, 0), (0, 1), (-1, 0))  # up, right, down, left
+
+
+def encode_path(start: tuple, path: list) -> bytes:
+    """Encodes a path compactly. Paths only ever step to a neighboring tile, so every step takes 2 bits. Paths which don't
+    (the search on a chunked map may start on the current tile) keep their coordinates instead.
+
+    Args:
+        start (tuple): the tile the path starts from
+        path (list): the tiles of the path
+
+    Returns:
+        bytes: the payload of a path record
+    """
+    tiles = np.array([start] + list(path), dtype=np.int64).reshape(-1, 2)
+    dx, dy = np.diff(tiles, axis=0).T
+    codes = np.select(
+        [(dx == 0) & (dy == -1), (dx == 1) & (dy == 0), (dx == 0) & (dy == 1), (dx == -1) & (dy == 0)],
+        [0, 1, 2, 3],
+        -1,
+    )
+    if (codes < 0).any():
+        data = tiles[1:].astype("<i4").tobytes()
+        return PATH_DATA.pack(start[0], start[1], len(path), RAW) + data
+    codes = np.concatenate((codes, np.zeros(-len(codes) % 4, np.int64))).reshape(-1, 4)
+    packed = codes[:, 0] | codes[:, 1] << 2 | codes[:, 2] << 4 | codes[:, 3] << 6
+    return PATH_DATA.pack(start[0], start[1], len(path), PACKED) + packed.astype(np.uint8).tobytes()
+
+
+def decode_path(payload: bytes) -> tuple:
+    """Decodes the payload of a path record.
+
+    Args:
+        payload (bytes): the payload
+
+    Returns:
+        tuple: the start tile and the tiles of the path
+    """
+    x, y, length, encoding = PATH_DATA.unpack_from(payload)
+    data = np.frombuffer(payload, np.uint8, offset=PATH_DATA.size)
+    if encoding == RAW:
+        tiles = data.view("<i4").reshape(-1, 2)
+    else:
+        codes = np.stack([data & 3, data >> 2 & 3, data >> 4 & 3, data >> 6 & 3], axis=1)
+        steps = np.array(STEPS)[codes.reshape(-1)[:length]]
+        tiles = np.cumsum(steps, axis=0) + (x, y)
+    return (x, y), list(map(tuple, tiles.tolist()))
+
+
+class EventLog:
+    """Append-only log of everything that happens to the animals of a world: spawns (with the parents of newborns, which
+    covers the matings), deaths with their causes and every path an animal gets assigned. Every KEYFRAME_INTERVAL ticks a
+    checkpoint of the world is written next to the log, a replay starts from the nearest one and applies the events after it.
+    Events are buffered and appended to the log in large pieces.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        keyframe=None,
+        keyframe_interval: int = KEYFRAME_INTERVAL,
+        buffer: int = EVENT_BUFFER,
+    ) -> None:
+        """Opens the log of a run.
+
+        Args:
+            directory (str): directory of the run, the log and the keyframes are written into it
+            keyframe (optional): function (world, path) -> thread writing a checkpoint, see checkpoint.save. Defaults to none,
+                no keyframes.
+            keyframe_interval (int, optional): ticks between two keyframes. Defaults to KEYFRAME_INTERVAL.
+            buffer (int, optional): bytes of events kept in memory before they are appended. Defaults to EVENT_BUFFER.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.keyframe = keyframe
+        self.keyframe_interval = keyframe_interval
+        self.limit = buffer
+        self.saving = None  # thread writing the last keyframe
+
+        self.file = open(os.path.join(directory, "events.log"), "ab")
+        self.buffer = bytearray()
+        if self.file.tell() == 0:
+            self.buffer += MAGIC + struct.pack("<I", VERSION)
+        self.type_index = {type: i for i, type in enumerate(TYPES)}
+
+    def __append__(self, tick: int, kind: int, animal, payload: bytes) -> None:
+        """Adds a record to the buffer.
+
+        Args:
+            tick (int): the tick
+            kind (int): SPAWN, DEATH or PATH
+            animal: the animal
+            payload (bytes): the payload
+        """
+        self.buffer += RECORD.pack(tick, kind, self.type_index[animal.type], animal.key, len(payload))
+        self.buffer += payload
+
+    def spawn(self, tick: int, animal, parents: tuple = None) -> None:
+        """Records a spawned animal.
+
+        Args:
+            tick (int): the tick
+            animal: the new animal
+            parents (tuple, optional): keys of the parents of a newborn. Defaults to none.
+        """
+        x, y = animal.__convert_pos__(animal.pos)
+        genomes = [animal.genomes[name] for name in GENOMES]
+        self.__append__(tick, SPAWN, animal, SPAWN_DATA.pack(x, y, *(parents or (0, 0)), *genomes))
+
+    def death(self, tick: int, animal, cause: int) -> None:
+        """Records a dead animal.
+
+        Args:
+            tick (int): the tick
+            animal: the dead animal
+            cause (int): index of the cause of death in Animals.store.CAUSES
+        """
+        self.__append__(tick, DEATH, animal, DEATH_DATA.pack(cause))
+
+    def path(self, tick: int, animal, start: tuple, path: list) -> None:
+        """Records a path assigned to an animal.
+
+        Args:
+            tick (int): the tick
+            animal: the animal
+            start (tuple): the tile the animal stands on
+            path (list): the tiles it will walk along
+        """
+        self.__append__(tick, PATH, animal, encode_path(start, path))
+
+    def end_tick(self, world) -> None:
+        """Called after every tick, appends the buffered events once enough came together and writes the keyframes.
+
+        Args:
+            world (World): the world
+        """
+        due = self.keyframe is not None and world.ticks % self.keyframe_interval == 0
+        if due or len(self.buffer) >= self.limit:
+            self.flush()
+        if due:
+            if self.saving is not None:
+                self.saving.join()
+            path = os.path.join(self.directory, f"keyframe-{world.ticks:010d}.ckpt")
+            self.saving = self.keyframe(world, path)
+
+    def flush(self) -> None:
+        """Appends the buffered events to the log."""
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer = bytearray()
+
+    def close(self) -> None:
+        """Appends the remaining events and waits for the last keyframe."""
+        self.flush()
+        self.file.close()
+        if self.saving is not None:
+            self.saving.join()
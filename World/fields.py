@@ -0,0 +1,350 @@
+from array import array
+from collections import deque
+import numpy as np
+from settings import *
+
+UNREACHED = 2**31 - 1  # distance of tiles from which no source can be reached, the largest value of an int
+
+
+def is_berry(map: np.ndarray, x: int, y: int) -> bool:
+    """Checks if the tile at the given coordinates is a berry bush.
+
+    Args:
+        map (numpy.ndarray): the map
+        x (int): The x-coordinate of the tile.
+        y (int): The y-coordinate of the tile.
+
+    Returns:
+        bool: True if the tile is a berry bush, False otherwise.
+    """
+    return map[y, x] == BERRY
+
+
+def is_drinkable(map: np.ndarray, x: int, y: int) -> bool:
+    """Checks if the tile at the given coordinates is water which borders at least one land tile, so an animal can drink from it.
+
+    Args:
+        map (numpy.ndarray): the map
+        x (int): The x-coordinate of the tile.
+        y (int): The y-coordinate of the tile.
+
+    Returns:
+        bool: True if the tile is drinkable water, False otherwise.
+    """
+    if map[y, x] != WATER:
+        return False
+
+    height, width = map.shape
+    c = 0
+    if y == 0 or map[y - 1, x] == WATER:  # Checking up
+        c += 1
+    if y == (height - 1) or map[y + 1, x] == WATER:  # Checking down
+        c += 1
+    if x == 0 or map[y, x - 1] == WATER:  # Checking left
+        c += 1
+    if x == (width - 1) or map[y, x + 1] == WATER:  # checking right
+        c += 1
+
+    return c != 4
+
+
+def berry_mask(map: np.ndarray) -> np.ndarray:
+    """Finds all berry bushes of a map at once, see is_berry.
+
+    Args:
+        map (numpy.ndarray): the map
+
+    Returns:
+        numpy.ndarray: True for every berry bush
+    """
+    return np.asarray(map) == BERRY
+
+
+def drinkable_mask(map: np.ndarray) -> np.ndarray:
+    """Finds all drinkable water tiles of a map at once, see is_drinkable.
+
+    Args:
+        map (numpy.ndarray): the map
+
+    Returns:
+        numpy.ndarray: True for every water tile bordering at least one land tile
+    """
+    water = np.asarray(map) == WATER
+    padded = np.pad(water, 1, constant_values=True)  # outside of the map counts as water
+    enclosed = padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+    return water & ~enclosed
+
+
+# whole-map versions of the source functions, a field over other sources checks its tiles one by one
+SOURCE_MASKS = {is_berry: berry_mask, is_drinkable: drinkable_mask}
+
+
+class DistanceField:
+    """Multi-source BFS distance field over a map.
+
+    For every tile the field stores the walking distance to the nearest source tile and the index of the next tile on the way
+    there, so the path to the nearest source is found by following the next-step entries (gradient descent) instead of a search.
+    """
+
+    def __init__(self, map: np.ndarray, is_source) -> None:
+        """Initializes the field and computes it for the whole map.
+
+        Args:
+            map (numpy.ndarray): the map
+            is_source: function (map, x, y) -> bool deciding whether a tile is a source of this field
+        """
+        self.map = map
+        self.is_source = is_source
+        self.height = len(map)
+        self.width = len(map[0]) if self.height else 0
+
+        self.dirty = True
+        self.__rebuild__()
+
+    def __neighbors__(self, i: int) -> list:
+        """Returns the indices of all in-bounds neighbors of a tile.
+
+        Args:
+            i (int): index of the tile
+
+        Returns:
+            list: indices of the neighbors in the order up, right, down, left
+        """
+        width = self.width
+        x = i % width
+        neighbors = []
+        if i >= width:
+            neighbors.append(i - width)
+        if x != width - 1:
+            neighbors.append(i + 1)
+        if i < (self.height - 1) * width:
+            neighbors.append(i + width)
+        if x != 0:
+            neighbors.append(i - 1)
+        return neighbors
+
+    def __rebuild__(self) -> None:
+        """Recomputes the whole field from scratch. The BFS runs one distance at a time over arrays of tile indices, every level
+        is expanded in the order its tiles were found and neighbors in the order up, right, down, left, so the result is the
+        same a queue would give."""
+        width, height = self.width, self.height
+        size = width * height
+        map = np.asarray(self.map)
+
+        if self.is_source in SOURCE_MASKS:
+            source = SOURCE_MASKS[self.is_source](map)
+        else:
+            source = np.array(
+                [[self.is_source(map, x, y) for x in range(width)] for y in range(height)],
+                dtype=bool,
+            )
+        self.walkable = bytearray((map != WATER).tobytes())
+        self.source = bytearray(source.astype(np.uint8).tobytes())
+        # the incremental updates and the paths read single tiles, which is much faster from arrays than from numpy arrays
+        self.dist = array("i", [UNREACHED]) * size
+        self.next = array("i", [-1]) * size
+
+        # numpy views of the same memory for the BFS
+        dist = np.frombuffer(self.dist, dtype=np.intc)
+        next = np.frombuffer(self.next, dtype=np.intc)
+        walkable = np.frombuffer(self.walkable, dtype=bool)
+        frontier = np.flatnonzero(source.reshape(-1))
+        dist[frontier] = 0
+
+        d = 0
+        while len(frontier):
+            d += 1
+            x = frontier % width
+            candidates = np.stack(
+                [
+                    np.where(frontier >= width, frontier - width, -1),  # up
+                    np.where(x != width - 1, frontier + 1, -1),  # right
+                    np.where(frontier < size - width, frontier + width, -1),  # down
+                    np.where(x != 0, frontier - 1, -1),  # left
+                ],
+                axis=1,
+            ).reshape(-1)
+            parents = np.repeat(frontier, 4)
+            valid = candidates >= 0
+            candidates, parents = candidates[valid], parents[valid]
+            unvisited = walkable[candidates] & (dist[candidates] == UNREACHED)
+            candidates, parents = candidates[unvisited], parents[unvisited]
+
+            # a tile found from several parents belongs to the one expanded first
+            _, first = np.unique(candidates, return_index=True)
+            first.sort()
+            frontier = candidates[first]
+            dist[frontier] = d
+            next[frontier] = parents[first]
+
+        self.dirty = False
+
+    def __relax__(self, queue: deque) -> None:
+        """Propagates the distances of the queued tiles to their walkable neighbors wherever this shortens the distance.
+
+        Args:
+            queue (deque): indices of the tiles whose distance just decreased
+        """
+        dist, next, walkable = self.dist, self.next, self.walkable
+        while queue:
+            i = queue.popleft()
+            d = dist[i] + 1
+            for n in self.__neighbors__(i):
+                if walkable[n] and d < dist[n]:
+                    dist[n] = d
+                    next[n] = i
+                    queue.append(n)
+
+    def update_tile(self, x: int, y: int) -> None:
+        """Patches the field after a tile of the map changed. Added sources or newly walkable tiles only shorten distances and get
+        propagated right away, every other change marks the field for a rebuild on its next use.
+
+        Args:
+            x (int): The x-coordinate of the changed tile.
+            y (int): The y-coordinate of the changed tile.
+        """
+        if self.dirty:
+            return
+
+        i = y * self.width + x
+        walkable = 0 if self.map[y, x] == WATER else 1
+        if walkable < self.walkable[i]:
+            self.dirty = True
+            return
+
+        queue = deque()
+        # sourcehood of the neighbors may depend on the tile as well (i.e. shoreline water)
+        for n in [i] + self.__neighbors__(i):
+            source = 1 if self.is_source(self.map, n % self.width, n // self.width) else 0
+            if source < self.source[n]:
+                self.dirty = True
+                return
+            if source > self.source[n]:
+                self.source[n] = 1
+                self.dist[n] = 0
+                self.next[n] = -1
+                queue.append(n)
+
+        if walkable > self.walkable[i]:
+            self.walkable[i] = 1
+            for n in self.__neighbors__(i):
+                if self.dist[n] + 1 < self.dist[i]:
+                    self.dist[i] = self.dist[n] + 1
+                    self.next[i] = n
+            if self.dist[i] != UNREACHED:
+                queue.append(i)
+
+        self.__relax__(queue)
+
+    def distance(self, pos: tuple) -> int:
+        """Returns the walking distance from a tile to the nearest source.
+
+        Args:
+            pos (tuple): coordinates of the tile
+
+        Returns:
+            int: the distance, UNREACHED if no source can be reached
+        """
+        if self.dirty:
+            self.__rebuild__()
+        return self.dist[pos[1] * self.width + pos[0]]
+
+    def path(self, pos: tuple) -> list:
+        """Follows the next-step entries from a tile to the nearest source.
+
+        Args:
+            pos (tuple): coordinates of the start tile
+
+        Returns:
+            list: the path, excluding the start and including the source tile. If no source can be reached an empty one is returned
+        """
+        if self.dirty:
+            self.__rebuild__()
+
+        width = self.width
+        i = pos[1] * width + pos[0]
+        if self.dist[i] == 0:
+            return [pos]
+
+        retlist = []
+        if not self.walkable[i]:
+            # animals can stand on the water tile they drank from, so the path starts at the best neighboring land tile
+            n = min(self.__neighbors__(i), key=lambda n: self.dist[n], default=i)
+            if self.dist[n] == UNREACHED or not self.walkable[n]:
+                return []
+            i = n
+            retlist.append((i % width, i // width))
+        elif self.dist[i] == UNREACHED:
+            return []
+
+        while self.dist[i]:
+            i = self.next[i]
+            retlist.append((i % width, i // width))
+        return retlist
+
+
+class SearchField:
+    """Stand-in for a distance field on maps which are too large to be precomputed, i.e. the maps of chunked worlds.
+
+    The nearest source is searched with a breadth-first search from the tile of the animal, which gives up after max_nodes tiles.
+    """
+
+    def __init__(self, map, is_source, max_nodes: int = LAZY_SEARCH_NODES) -> None:
+        """Initializes the field.
+
+        Args:
+            map: the map, has to support len() and map[y, x]
+            is_source: function (map, x, y) -> bool deciding whether a tile is a source of this field
+            max_nodes (int, optional): number of tiles a search may visit. Defaults to LAZY_SEARCH_NODES.
+        """
+        self.map = map
+        self.is_source = is_source
+        self.max_nodes = max_nodes
+        self.size = len(map)
+
+    def update_tile(self, x: int, y: int) -> None:
+        """Nothing is precomputed, so changed tiles need no handling.
+
+        Args:
+            x (int): The x-coordinate of the changed tile.
+            y (int): The y-coordinate of the changed tile.
+        """
+
+    def path(self, pos: tuple) -> list:
+        """Searches the path from a tile to the nearest source.
+
+        Args:
+            pos (tuple): coordinates of the start tile
+
+        Returns:
+            list: the path, excluding the start and including the source tile. If no source was found an empty one is returned
+        """
+        map, size = self.map, self.size
+        if self.is_source(map, *pos):
+            return [pos]
+
+        came_from = {pos: None}
+        queue = deque([pos])
+        while queue and len(came_from) < self.max_nodes:
+            current = queue.popleft()
+            # animals can stand on the water tile they drank from, from there only land tiles can be entered
+            from_land = map[current[1], current[0]] != WATER
+            x, y = current
+            for n in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y)):
+                if n in came_from or not (0 <= n[0] < size and 0 <= n[1] < size):
+                    continue
+                walkable = map[n[1], n[0]] != WATER
+                if not (walkable or from_land):
+                    continue
+                came_from[n] = current
+                if from_land and self.is_source(map, *n):
+                    retlist = []
+                    while n != pos:
+                        retlist.append(n)
+                        n = came_from[n]
+                    retlist.reverse()
+                    return retlist
+                if walkable:
+                    queue.append(n)
+
+        return []
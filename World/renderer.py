@@ -0,0 +1,328 @@
+import numpy as np
+import pygame as pg
+from settings import *
+from World.tile import load_image
+from Animals.store import TYPES
+
+# images drawn on top of each other for every terrain code, animals stand on grass
+TERRAIN_IMAGES = {
+    BERRY: ("grass", "berry"),
+    CARNI_SPAWN: ("grass",),
+    GRASS: ("grass",),
+    HERBI_SPAWN: ("grass",),
+    OMNI_SPAWN: ("grass",),
+    WATER: ("water",),
+}
+
+
+class Renderer:
+    """Draws a world onto the display surface.
+
+    The terrain never moves, so instead of one sprite per tile it is baked into a single background surface once. Every frame
+    only that surface and the animal sprites get blitted. Cells whose terrain changes are rebaked one by one.
+
+    In incremental mode not even that is needed: the renderer remembers where every sprite was drawn, only the areas of sprites
+    which moved, appeared or vanished are restored from the background and drawn again, and the changed rectangles are
+    returned so only they have to be pushed to the display. Lines of text are only re-rendered when they change.
+
+    Snapshots of a world simulated elsewhere hold no sprites, only the tiles and types of the animals inside the view of the
+    camera. The background then only covers that view, sampled at the zoom of the camera. Since an animal covers exactly one
+    tile, the animals are drawn cell by cell: only cells whose animals changed are restored and drawn again. Zoomed out too far
+    for single animals, a snapshot holds their density instead, which is blended over the whole background.
+    """
+
+    def __init__(self, map, images: dict, size: int) -> None:
+        """Bakes the terrain of the visible part of the map.
+
+        Args:
+            map: the map, either an array or a chunked map
+            images (dict): paths to the images of the tileset
+            size (int): length/height of the visible part of the map in tiles
+        """
+        self.map = map  # terrain codes the background is baked from
+        self.images = images
+        self.display_surface = pg.display.get_surface()
+        self.area = pg.Rect(0, 0, VIEWSIZE, VIEWSIZE)  # part of the screen showing the map
+
+        self.scales = {}  # pixels per cell -> tiles and animals at that size
+        self.__scale__(TILESIZE)
+
+        # average color of every animal type, used for the density map
+        self.colors = np.zeros((len(TYPES), 3), dtype=np.float32)
+        for kind, image in enumerate(self.animals):
+            opaque = pg.surfarray.pixels_alpha(image) > 0
+            self.colors[kind] = pg.surfarray.array3d(image)[opaque].mean(axis=0)
+
+        self.origin = (0, 0)  # tile shown in the top left cell
+        self.step = 1  # tiles per cell
+        self.background = None
+        self.background_pixels = None
+        self.__bake__(np.asarray(map[:size, :size]))
+
+        self.drawn = {}  # sprite -> rect it was drawn at in the last frame
+        self.rebaked = []  # rects of the cells rebaked since the last frame
+        self.texts = {}  # position -> text and rect drawn there
+        self.cells = {}  # cell -> types of the animals drawn on it in the last frame, when drawing snapshots
+        self.moved = False  # the view changed since the last frame, when drawing snapshots
+
+    def __scale__(self, scale: int) -> None:
+        """Selects the tiles and animal images of the given size, they are only scaled the first time a size is used.
+
+        Args:
+            scale (int): length/height of a cell in pixels
+        """
+        if scale not in self.scales:
+            # one pre-composed tile per terrain code, codes without a tile (i.e. UNKNOWN) stay black
+            tiles = {}
+            pixels = np.zeros((256, scale, scale, 3), dtype=np.uint8)
+            for code, layers in TERRAIN_IMAGES.items():
+                tile = pg.Surface((TILESIZE, TILESIZE))
+                for layer in layers:
+                    tile.blit(load_image(self.images[layer]), (0, 0))
+                if scale != TILESIZE:
+                    tile = pg.transform.smoothscale(tile, (scale, scale))
+                tiles[code] = tile
+                pixels[code] = pg.surfarray.array3d(tile)
+            animals = [load_image(self.images[kind]) for kind in TYPES]  # by type index
+            if scale != TILESIZE:
+                animals = [pg.transform.smoothscale(image, (scale, scale)) for image in animals]
+            self.scales[scale] = (tiles, pixels, animals)
+        self.scale = scale
+        self.tiles, self.pixels, self.animals = self.scales[scale]
+
+    def __bake__(self, codes: np.ndarray) -> None:
+        """Bakes the given terrain into the background surface with one lookup into the pixels of the tiles.
+
+        Args:
+            codes (numpy.ndarray): the terrain code of every cell
+        """
+        self.shape = codes.shape
+        rows, columns = codes.shape
+        # surfarrays are indexed [x][y]
+        background = self.pixels[codes.T].transpose(0, 2, 1, 3, 4)
+        self.background_pixels = background.reshape(columns * self.scale, rows * self.scale, 3)
+        self.background = pg.surfarray.make_surface(self.background_pixels).convert()
+
+    def view(self, codes: np.ndarray, origin: tuple, step: int, scale: int) -> None:
+        """Bakes a new part of the map after the camera moved or zoomed.
+
+        Args:
+            codes (numpy.ndarray): terrain codes of the cells in view
+            origin (tuple): coordinates of the tile in the top left cell
+            step (int): tiles per cell
+            scale (int): length/height of a cell in pixels
+        """
+        self.map = codes
+        self.origin = origin
+        self.step = step
+        self.__scale__(scale)
+        self.__bake__(codes)
+        self.cells = {}
+        self.rebaked = []
+        self.moved = True
+
+    def rebake(self, x: int, y: int) -> None:
+        """Redraws a single cell of the background after its terrain changed.
+
+        Args:
+            x (int): The x-coordinate of the cell.
+            y (int): The y-coordinate of the cell.
+        """
+        rows, columns = self.shape
+        if x < columns and y < rows:
+            code = int(self.map[y, x])
+            scale = self.scale
+            pos = (x * scale, y * scale)
+            self.background_pixels[pos[0] : pos[0] + scale, pos[1] : pos[1] + scale] = self.pixels[code]
+            if code in self.tiles:
+                self.rebaked.append(self.background.blit(self.tiles[code], pos))
+            else:
+                self.rebaked.append(self.background.fill("black", (pos, (scale, scale))))
+
+    def clear(self) -> None:
+        """Clears the whole screen, so all text has to be drawn again."""
+        self.display_surface.fill("black")
+        self.texts = {}
+
+    def draw(self, sprites: pg.sprite.Group) -> list:
+        """Draws the terrain and the given sprites from scratch.
+
+        Args:
+            sprites (pygame.sprite.Group): the sprites drawn on top of the terrain
+
+        Returns:
+            list: the changed rectangles, the whole terrain
+        """
+        self.display_surface.blit(self.background, (0, 0))
+        sprites.draw(self.display_surface)
+        self.drawn = {sprite: sprite.rect.copy() for sprite in sprites}
+        self.rebaked = []
+        self.texts = {}  # the screen has been cleared, all text has to be drawn again
+        return [self.background.get_rect()]
+
+    def draw_dirty(self, sprites: pg.sprite.Group) -> list:
+        """Redraws only what changed since the last frame: the old and new areas of sprites which moved, the areas of sprites
+        which appeared or vanished and rebaked cells.
+
+        Args:
+            sprites (pygame.sprite.Group): the sprites drawn on top of the terrain
+
+        Returns:
+            list: the changed rectangles
+        """
+        area = self.background.get_rect()
+        dirty = []
+        drawn = {}
+        for sprite in sprites:
+            rect = sprite.rect
+            old = self.drawn.pop(sprite, None)
+            if old != rect:
+                if old is not None:
+                    dirty.append(old)
+                dirty.append(rect.copy())
+            drawn[sprite] = rect.copy()
+        dirty.extend(self.drawn.values())  # sprites which are gone
+        self.drawn = drawn
+        dirty.extend(self.rebaked)
+        self.rebaked = []
+
+        dirty = [rect.clip(area) for rect in dirty]
+        dirty = [rect for rect in dirty if rect]
+        if not dirty:
+            return []
+
+        surface = self.display_surface
+        for rect in dirty:
+            surface.blit(self.background, rect, rect)
+
+        # sprites overlapping a restored area are drawn again, in the order of the group so overlaps look the same
+        surface.set_clip(area)
+        for sprite in sprites:
+            if sprite.rect.collidelist(dirty) != -1:
+                surface.blit(sprite.image, sprite.rect)
+        surface.set_clip(None)
+        return dirty
+
+    def draw_snapshot(self, snapshot, full: bool = True) -> list:
+        """Draws the animals of a snapshot, either from scratch or only the cells whose animals changed since the last frame.
+        The snapshot has to show the same part of the map as the last call of view().
+
+        Args:
+            snapshot (Snapshot): the snapshot
+            full (bool, optional): Redraws everything if true. Defaults to True.
+
+        Returns:
+            list: the changed rectangles
+        """
+        surface = self.display_surface
+        if full or self.moved:
+            # a smaller view than before doesn't cover all of the old one
+            surface.fill("black", self.area)
+            surface.blit(self.background, (0, 0))
+        if snapshot.density is not None:
+            surface.blit(self.__density__(snapshot.density, snapshot.view[5]), (0, 0))
+            self.moved = False
+            self.rebaked = []
+            return [self.area]
+
+        cells = {}
+        ox, oy = self.origin
+        for x, y, kind in zip(
+            snapshot.x.tolist(), snapshot.y.tolist(), snapshot.types.tolist()
+        ):
+            cells.setdefault(((x - ox) // self.step, (y - oy) // self.step), []).append(kind)
+
+        if full or self.moved:
+            changed = cells
+        else:
+            changed = {
+                cell
+                for cell in cells.keys() | self.cells.keys()
+                if cells.get(cell) != self.cells.get(cell)
+            }
+            changed.update(
+                (rect.x // self.scale, rect.y // self.scale) for rect in self.rebaked
+            )
+        self.cells = cells
+        self.rebaked = []
+
+        dirty = []
+        scale = self.scale
+        for x, y in changed:
+            rect = pg.Rect(x * scale, y * scale, scale, scale)
+            if not (full or self.moved):
+                surface.blit(self.background, rect, rect)
+                dirty.append(rect)
+            for kind in cells.get((x, y), ()):
+                surface.blit(self.animals[kind], rect)
+
+        if full or self.moved:
+            self.moved = False
+            return [self.area]
+        return dirty
+
+    def __density__(self, density: np.ndarray, block: int) -> pg.Surface:
+        """Blends the density of the animals over the background. Every block is tinted in the average color of the animals
+        in it, the more animals the stronger.
+
+        Args:
+            density (numpy.ndarray): number of animals of every type (axis 0) in every block of the view (axes 1 and 2)
+            block (int): length/height of a block in tiles
+
+        Returns:
+            pygame.Surface: the background with the density map
+        """
+        density = density.astype(np.float32)
+        total = density.sum(axis=0)
+        color = np.tensordot(density, self.colors, axes=(0, 0)) / np.maximum(total, 1)[..., None]
+        alpha = np.minimum(np.log1p(total) / np.float32(np.log1p(DENSITY_SATURATION)), 1)[..., None]
+
+        # blocks -> pixels, surfarrays are indexed [x][y]
+        width, height = self.background_pixels.shape[:2]
+        block = block // self.step * self.scale
+        color = color.transpose(1, 0, 2).repeat(block, 0).repeat(block, 1)[:width, :height]
+        alpha = alpha.transpose(1, 0, 2).repeat(block, 0).repeat(block, 1)[:width, :height]
+        pixels = self.background_pixels + (color - self.background_pixels) * alpha
+        return pg.surfarray.make_surface(pixels.astype(np.uint8))
+
+    def counters(self, font: pg.font.Font, herbis: int, carnis: int, omnis: int) -> list:
+        """Draws the animal counters below the map.
+
+        Args:
+            font (pygame.font.Font): the font
+            herbis (int): number of alive herbivores
+            carnis (int): number of alive carnivores
+            omnis (int): number of alive omnivores
+
+        Returns:
+            list: the changed rectangles
+        """
+        dirty = self.text(font, f"Alive herbivores: {herbis}", (10, 1015))
+        dirty += self.text(font, f"Alive carnivores:  {carnis}", (10, 1040))
+        dirty += self.text(font, f"Alive omnivores:  {omnis}", (10, 1065))
+        return dirty
+
+    def text(self, font: pg.font.Font, text: str, pos: tuple) -> list:
+        """Draws a line of white text on black, it is only rendered again if it changed since the last frame.
+
+        Args:
+            font (pygame.font.Font): the font
+            text (str): the text
+            pos (tuple): position of the top left corner
+
+        Returns:
+            list: the changed rectangles
+        """
+        cached = self.texts.get(pos)
+        if cached is not None and cached[0] == text:
+            return []
+
+        dirty = []
+        if cached is not None:
+            self.display_surface.fill("black", cached[1])
+            dirty.append(cached[1])
+        image = font.render(text, True, (255, 255, 255))
+        rect = self.display_surface.blit(image, pos)
+        self.texts[pos] = (text, rect)
+        dirty.append(rect)
+        return dirty
@@ -0,0 +1,226 @@
+import glob
+import os
+import bisect
+import struct
+import random as rnd
+from settings import *
+from World.world import World
+from World import checkpoint
+from World.events import (
+    EventLog,
+    MAGIC,
+    VERSION,
+    RECORD,
+    SPAWN,
+    DEATH,
+    PATH,
+    SPAWN_DATA,
+    DEATH_DATA,
+    decode_path,
+)
+from Animals.store import TYPES, GENOMES, CAUSES
+
+
+def record(directory: str, seed: int = None, **kwargs) -> World:
+    """Creates a world which records everything that happens in it into a directory, so it can be replayed later.
+
+    Args:
+        directory (str): directory of the run, one per run
+        seed (int, optional): seed of the world, a random one if none is given. Defaults to none.
+        **kwargs: further arguments of the world
+
+    Returns:
+        World: the world, it has to be shut down at the end so the last events are written
+    """
+    if seed is None:
+        seed = rnd.randint(0, 999999999)
+    log = EventLog(directory, keyframe=checkpoint.save)
+    return World(seed=seed, events=log, **kwargs)
+
+
+class Animal:
+    """What a replay knows about an animal at a tick, taken from the keyframe and the events after it."""
+
+    def __init__(self, type: str, key: int, tile: tuple, genomes: dict) -> None:
+        """Initializes the record of an animal.
+
+        Args:
+            type (str): the animal type
+            key (int): the key of the animal
+            tile (tuple): the tile it was last known to stand on, where it spawned or started its last path
+            genomes (dict): the genomes of the animal
+        """
+        self.type = type
+        self.key = key
+        self.tile = tile
+        self.genomes = genomes
+        self.born = None  # tick of its birth, None if it was alive before the keyframe
+        self.parents = None  # keys of its parents, None if it was placed on the map or alive before the keyframe
+        self.path = []  # the last path it got assigned
+
+
+class Event:
+    """A single record of an event log."""
+
+    def __init__(self, tick: int, kind: int, type: str, key: int, payload: bytes) -> None:
+        """Decodes a record.
+
+        Args:
+            tick (int): the tick
+            kind (int): SPAWN, DEATH or PATH, see events
+            type (str): the animal type
+            key (int): the key of the animal
+            payload (bytes): the payload of the record
+        """
+        self.tick = tick
+        self.kind = kind
+        self.type = type
+        self.key = key
+        if kind == SPAWN:
+            x, y, mother, father, *genomes = SPAWN_DATA.unpack(payload)
+            self.tile = (x, y)
+            self.parents = (mother, father) if mother else None
+            self.genomes = dict(zip(GENOMES, genomes), animal_type=type)
+        elif kind == DEATH:
+            self.cause = CAUSES[DEATH_DATA.unpack(payload)[0]]
+        elif kind == PATH:
+            self.tile, self.path = decode_path(payload)
+
+
+class Replay:
+    """Reconstructs a recorded run at any tick. The nearest keyframe before the tick tells which animals were alive, the
+    events after it are applied on top, no behaviour of the animals gets simulated for that. The full state including every
+    step of the random movement is only stored in the keyframes, world() gets it for any tick by simulating onwards from the
+    nearest one, which reproduces the original run exactly since a recorded world is seeded.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """Opens a recorded run and indexes its log.
+
+        Args:
+            directory (str): directory of the run, see record
+        """
+        self.directory = directory
+        with open(os.path.join(directory, "events.log"), "rb") as file:
+            self.data = file.read()
+        if self.data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{directory} holds no event log")
+        (version,) = struct.unpack_from("<I", self.data, len(MAGIC))
+        if version != VERSION:
+            raise ValueError(f"Event log version {version} isn't supported, expected {VERSION}")
+
+        self.keyframes = sorted(
+            int(os.path.basename(path)[9:-5])
+            for path in glob.glob(os.path.join(directory, "keyframe-*.ckpt"))
+        )
+        if not self.keyframes:
+            raise ValueError(f"{directory} holds no keyframes")
+
+        # offset of the first event after every keyframe, found by skipping from record to record
+        self.offsets = []
+        offset = len(MAGIC) + 4
+        keyframe = 0
+        self.last_tick = 0
+        while offset < len(self.data):
+            tick, _, _, _, size = RECORD.unpack_from(self.data, offset)
+            while keyframe < len(self.keyframes) and tick > self.keyframes[keyframe]:
+                self.offsets.append(offset)
+                keyframe += 1
+            self.last_tick = tick
+            offset += RECORD.size + size
+        self.offsets += [offset] * (len(self.keyframes) - len(self.offsets))
+
+    def events(self, start: int = 0, stop: int = None):
+        """Iterates over the events of a range of ticks.
+
+        Args:
+            start (int, optional): first tick. Defaults to 0.
+            stop (int, optional): last tick, the last one recorded if none is given. Defaults to none.
+
+        Yields:
+            Event: the events in the order they happened
+        """
+        stop = self.last_tick if stop is None else stop
+        keyframe = bisect.bisect_left(self.keyframes, start) - 1
+        offset = self.offsets[keyframe] if keyframe >= 0 else len(MAGIC) + 4
+        while offset < len(self.data):
+            tick, kind, type, key, size = RECORD.unpack_from(self.data, offset)
+            if tick > stop:
+                return
+            offset += RECORD.size
+            if tick >= start:
+                yield Event(tick, kind, TYPES[type], key, self.data[offset : offset + size])
+            offset += size
+
+    def __keyframe__(self, tick: int) -> int:
+        """Returns the last keyframe at or before a tick.
+
+        Args:
+            tick (int): the tick
+
+        Returns:
+            int: the tick of the keyframe
+        """
+        index = bisect.bisect_right(self.keyframes, tick) - 1
+        if index < 0:
+            raise ValueError(f"Tick {tick} lies before the first keyframe")
+        return self.keyframes[index]
+
+    def __path__(self, keyframe: int) -> str:
+        """Returns the path of a keyframe."""
+        return os.path.join(self.directory, f"keyframe-{keyframe:010d}.ckpt")
+
+    def state(self, tick: int) -> dict:
+        """Reconstructs which animals were alive at the end of a tick.
+
+        Args:
+            tick (int): the tick
+
+        Returns:
+            dict: (type, key) -> Animal
+        """
+        keyframe = self.__keyframe__(tick)
+        _, arrays = checkpoint.__read__(self.__path__(keyframe))
+        slots = arrays["slot"]
+        types = arrays["store.type"][slots].tolist()
+        xs = arrays["store.x"][slots].tolist()
+        ys = arrays["store.y"][slots].tolist()
+        offsets = arrays["moves_offset"].tolist()
+        moves = list(map(tuple, arrays["moves"].tolist()))
+
+        animals = {}
+        for i, (key, genomes) in enumerate(zip(arrays["key"].tolist(), arrays["genomes"].tolist())):
+            type = TYPES[types[i]]
+            animal = Animal(type, key, (xs[i], ys[i]), dict(zip(GENOMES, genomes), animal_type=type))
+            animal.path = moves[offsets[i] : offsets[i + 1]]
+            animals[type, key] = animal
+
+        for event in self.events(keyframe + 1, tick):
+            if event.kind == SPAWN:
+                animal = Animal(event.type, event.key, event.tile, event.genomes)
+                animal.born = event.tick
+                animal.parents = event.parents
+                animals[event.type, event.key] = animal
+            elif event.kind == DEATH:
+                animals.pop((event.type, event.key), None)
+            elif event.kind == PATH:
+                animal = animals.get((event.type, event.key))
+                if animal is not None:
+                    animal.tile = event.tile
+                    animal.path = event.path
+        return animals
+
+    def world(self, tick: int, headless: bool = True) -> World:
+        """Restores the complete world at the end of a tick, from the nearest keyframe on.
+
+        Args:
+            tick (int): the tick
+            headless (bool, optional): restores a headless world, see World. Defaults to True.
+
+        Returns:
+            World: the world
+        """
+        keyframe = self.__keyframe__(tick)
+        world = checkpoint.load(self.__path__(keyframe), headless, telemetry=None)
+        world.step(tick - keyframe)
+        return world
@@ -0,0 +1,244 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+import astar as ast
+
+MIN_POOL_BATCH = 8  # batches with fewer groups are solved on the main thread
+
+__worker_map__ = None  # read-only copy of the map inside a worker process
+
+
+def solve_group(grid: list, goal: tuple, starts: list) -> tuple:
+    """Finds the paths from several start points to the same goal. A single start is solved with A*, several ones share a
+    backward breadth-first search from the goal, which stops as soon as all of them have been reached. The shared search needs
+    the flat grid, on chunked maps and in hierarchical mode every start is solved with A* as well.
+
+    Args:
+        grid (list): the map
+        goal (tuple): the common end point
+        starts (list): the start points
+
+    Returns:
+        tuple: the paths in the order of the start points (empty ones for unreachable start points) and the number of searched nodes
+    """
+    path_grid = ast.get_path_grid(grid)
+    if (
+        len(starts) == 1
+        or not isinstance(path_grid, ast.PathGrid)
+        or path_grid.hierarchy is not None
+    ):
+        searched = path_grid.nodes_searched
+        paths = [ast.find_path(grid, start, goal) for start in starts]
+        return paths, path_grid.nodes_searched - searched
+
+    width, height = path_grid.width, path_grid.height
+    walkable = path_grid.walkable
+    goal_index = goal[1] * width + goal[0]
+    pending = {
+        start[1] * width + start[0]
+        for start in starts
+        if start != goal and path_grid.reachable(start, goal)
+    }
+    targets = set(pending)
+
+    came_from = {goal_index: goal_index}
+    queue = [goal_index]
+    last_row = (height - 1) * width
+    for current in queue:
+        if not pending:
+            break
+        if current != goal_index and not walkable[current]:
+            continue  # start points on water can be reached, but not walked through
+        cx = current % width
+        for neighbor, valid in (
+            (current - width, current >= width),
+            (current + 1, cx != width - 1),
+            (current + width, current < last_row),
+            (current - 1, cx != 0),
+        ):
+            if not valid or neighbor in came_from:
+                continue
+            if walkable[neighbor] or neighbor in targets:
+                came_from[neighbor] = current
+                queue.append(neighbor)
+                pending.discard(neighbor)
+
+    paths = []
+    for start in starts:
+        if start == goal:
+            paths.append([goal])
+            continue
+        current = start[1] * width + start[0]
+        if current not in came_from:
+            paths.append([])
+            continue
+        retlist = []
+        while current != goal_index:
+            current = came_from[current]
+            retlist.append((current % width, current // width))
+        paths.append(retlist)
+    return paths, len(queue)
+
+
+def __init_worker__(grid: list, mode: str, cluster_size: int) -> None:
+    """Stores the map inside a worker process, so it only gets transferred once, and sets up its path finding like the one
+    of the main process, so a path doesn't depend on where it was solved.
+
+    Args:
+        grid (list): the map
+        mode (str): the path finding mode, see astar.set_mode
+        cluster_size (int): the cluster size in hierarchical mode
+    """
+    global __worker_map__
+    __worker_map__ = grid
+    ast.set_mode(grid, mode, cluster_size)
+
+
+def __solve_in_worker__(group: tuple) -> tuple:
+    """Solves a group of requests inside a worker process.
+
+    Args:
+        group (tuple): the goal and the start points
+
+    Returns:
+        tuple: the paths in the order of the start points and the number of searched nodes
+    """
+    return solve_group(__worker_map__, group[0], group[1])
+
+
+def __urgency__(animal) -> float:
+    """Returns how urgently an animal needs its path, animals closer to dying of hunger or thirst come first.
+
+    Args:
+        animal: the requesting animal
+
+    Returns:
+        float: the urgency
+    """
+    return max(animal.hunger, animal.thirst)
+
+
+class PathScheduler:
+    """Collects the path requests of all animals during a tick and solves them together at the end of it.
+
+    Requests with the same start and goal are solved once, requests with the same goal share one search. Large batches can be
+    distributed over a process pool, whose workers each hold a read-only copy of the map. The work per tick can be limited by a
+    time and/or node budget. Requests beyond it wait for the next tick, the most urgent ones get solved first.
+    """
+
+    def __init__(
+        self, map: list, workers: int = 0, budget: float = 0, node_budget: int = 0
+    ) -> None:
+        """Initializes an empty scheduler.
+
+        Args:
+            map (list): the map
+            workers (int, optional): number of worker processes, 0 solves everything on the main thread. Defaults to 0.
+            budget (float, optional): milliseconds of path finding per tick, 0 disables the limit. Defaults to 0.
+            node_budget (int, optional): searched nodes per tick, 0 disables the limit. Defaults to 0.
+        """
+        self.map = map
+        self.workers = workers
+        self.budget = budget
+        self.node_budget = node_budget
+        self.pool = None
+        self.requests = {}  # animal -> goal
+
+    def submit(self, animal, goal: tuple) -> None:
+        """Queues a path request from the current position of an animal. The path gets delivered before the next tick of the
+        animal, unless the budget ran out. An earlier pending request of the same animal gets replaced, i.e. if its target moved.
+
+        Args:
+            animal: the requesting animal
+            goal (tuple): end point
+        """
+        self.requests[animal] = goal
+
+    def cancel(self, animal) -> None:
+        """Drops the pending request of an animal, i.e. because its target or the animal itself died.
+
+        Args:
+            animal: the requesting animal
+        """
+        self.requests.pop(animal, None)
+
+    def pending(self, animal) -> bool:
+        """Checks if an animal is still waiting for a path.
+
+        Args:
+            animal: the requesting animal
+
+        Returns:
+            bool: true if a request of the animal is pending
+        """
+        return animal in self.requests
+
+    def map_changed(self) -> None:
+        """Has to be called after the map changed, so the workers don't keep using an outdated copy."""
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def shutdown(self) -> None:
+        """Stops the worker processes."""
+        self.map_changed()
+
+    def __solve__(self, groups: list) -> list:
+        """Solves the grouped requests, on the process pool if the batch is large enough.
+
+        Args:
+            groups (list): contains (goal, starts) tuples
+
+        Returns:
+            list: the paths and the number of searched nodes of every group
+        """
+        if self.workers and len(groups) >= MIN_POOL_BATCH:
+            if self.pool is None:
+                self.pool = ProcessPoolExecutor(
+                    self.workers,
+                    initializer=__init_worker__,
+                    initargs=(self.map, *ast.get_mode(self.map)),
+                )
+            return list(
+                self.pool.map(
+                    __solve_in_worker__,
+                    groups,
+                    chunksize=max(1, len(groups) // (4 * self.workers)),
+                )
+            )
+        return [solve_group(self.map, goal, starts) for goal, starts in groups]
+
+    def flush(self) -> None:
+        """Solves the pending requests, most urgent first, until the budget of this tick is used up and delivers the paths to
+        the requesting animals. The remaining requests stay queued for the next tick."""
+        if not self.requests:
+            return
+
+        deadline = time.perf_counter() + self.budget / 1000
+        searched = 0
+
+        # merging requests with the same goal, identical start points are only solved once
+        groups = {}
+        for animal in sorted(self.requests, key=__urgency__, reverse=True):
+            start = animal.__convert_pos__(animal.pos)
+            groups.setdefault(self.requests[animal], {}).setdefault(start, []).append(
+                animal
+            )
+        groups = list(groups.items())
+
+        # groups get solved in batches, so the budget can be checked in between
+        batch_size = MIN_POOL_BATCH * self.workers if self.workers else 1
+        for i in range(0, len(groups), batch_size):
+            if i and (
+                (self.budget and time.perf_counter() > deadline)
+                or (self.node_budget and searched > self.node_budget)
+            ):
+                break
+
+            batch = groups[i : i + batch_size]
+            results = self.__solve__([(goal, list(starts)) for goal, starts in batch])
+            for (goal, starts), (paths, nodes) in zip(batch, results):
+                searched += nodes
+                for animals, path in zip(starts.values(), paths):
+                    for animal in animals:
+                        del self.requests[animal]
+                        animal.__receive_path__(list(path))
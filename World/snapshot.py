@@ -0,0 +1,242 @@
+from multiprocessing import shared_memory
+import numpy as np
+from settings import *
+from Animals.store import TYPES
+
+# int64 fields of a slot, the view is the area of the map in tiles (x0, y0, x1, y1), the tiles per cell and per density block
+# and the pixels per cell it gets drawn with
+HEADER = (
+    "number",
+    "tick",
+    "count",
+    "herbis",
+    "carnis",
+    "omnis",
+    "dropped",
+    "map_size",
+    "x0",
+    "y0",
+    "x1",
+    "y1",
+    "step",
+    "block",
+    "scale",
+)
+STATS = ("factor", "rate", "target", "lag")  # float64 fields of a slot
+
+
+class Snapshot:
+    """Compact copy of everything the window needs from a world to draw one frame: the visible terrain, the positions and types
+    of the animals in view (or their density if the camera is zoomed out too far) and the counters."""
+
+    def __init__(self, header: dict, stats: dict, x, y, types, terrain, density) -> None:
+        """Initializes a snapshot.
+
+        Args:
+            header (dict): tick, number of animals, counters and view
+            stats (dict): speed, rate and lag of the simulation, see timestep.describe
+            x: tile x-coordinates of the animals in view
+            y: tile y-coordinates of the animals in view
+            types: type indices (see Animals.store.TYPES) of the animals in view
+            terrain: terrain codes of every step-th tile in view
+            density: number of animals of every type in every block of the view, None if the animals are drawn one by one
+        """
+        self.number = header["number"]
+        self.tick = header["tick"]
+        self.herbis = header["herbis"]
+        self.carnis = header["carnis"]
+        self.omnis = header["omnis"]
+        self.map_size = header["map_size"]
+        self.view = tuple(header[field] for field in HEADER[8:])
+        self.stats = dict(stats, dropped=header["dropped"])
+        self.x = x
+        self.y = y
+        self.types = types
+        self.terrain = terrain
+        self.density = density
+
+
+def view_shape(view: tuple) -> tuple:
+    """Returns the number of rows and columns of cells and of density blocks covering a view.
+
+    Args:
+        view (tuple): the view, see camera.Camera.request
+
+    Returns:
+        tuple: rows and columns of cells, rows and columns of blocks (0 if the animals are drawn one by one)
+    """
+    x0, y0, x1, y1, step, block = view[:6]
+    cells = (-(-(y1 - y0) // step), -(-(x1 - x0) // step))
+    if not block:
+        return cells + (0, 0)
+    return cells + (-(-(y1 - y0) // block), -(-(x1 - x0) // block))
+
+
+class SnapshotBuffer:
+    """Double buffer of snapshots in shared memory, written by the simulation and read by the window.
+
+    The simulation always writes into the slot which wasn't published last and then publishes it, so a complete snapshot is
+    available at any time and neither side ever waits for the other. Every slot carries the number of its snapshot, which is
+    cleared while the slot is written. A reader which got overtaken while copying a slot notices the changed number and tries
+    again with the newer snapshot.
+    """
+
+    def __init__(
+        self,
+        name: str = None,
+        capacity: int = SNAPSHOT_CAPACITY,
+        size: int = VIEWSIZE,
+    ) -> None:
+        """Creates a new buffer or attaches to an existing one.
+
+        Args:
+            name (str, optional): name of the shared memory of an existing buffer, a new one is created if none is given. Defaults to none.
+            capacity (int, optional): number of animals a snapshot can hold, the rest isn't drawn. Defaults to SNAPSHOT_CAPACITY.
+            size (int, optional): length/height of the largest view a snapshot can hold in cells. Defaults to VIEWSIZE.
+        """
+        self.capacity = capacity
+        self.size = size
+        self.blocks = size // DENSITY_BLOCK + 1
+        self.owner = name is None
+
+        fields = [
+            ("header", np.int64, len(HEADER)),
+            ("stats", np.float64, len(STATS)),
+            ("density", np.uint32, len(TYPES) * self.blocks * self.blocks),
+            ("x", np.int32, capacity),
+            ("y", np.int32, capacity),
+            ("types", np.uint8, capacity),
+            ("terrain", np.uint8, size * size),
+        ]
+        slot_size = sum(np.dtype(dtype).itemsize * length for _, dtype, length in fields)
+        slot_size += -slot_size % 8  # keeps the header of the second slot aligned
+        self.memory = shared_memory.SharedMemory(
+            name=name, create=self.owner, size=8 + 2 * slot_size
+        )
+        self.name = self.memory.name
+
+        buffer = self.memory.buf
+        self.latest = np.ndarray(1, np.int64, buffer)  # index of the last published slot, -1 before the first snapshot
+        self.slots = []
+        for i in range(2):
+            offset = 8 + i * slot_size
+            slot = {}
+            for field, dtype, length in fields:
+                slot[field] = np.ndarray(length, dtype, buffer, offset)
+                offset += np.dtype(dtype).itemsize * length
+            self.slots.append(slot)
+        if self.owner:
+            self.latest[0] = -1
+
+        self.published = 0  # number of snapshots written by this side
+        self.last_read = 0  # number of the last snapshot read by this side
+
+    def publish(self, world, stats: dict, view: tuple) -> None:
+        """Writes a snapshot of the part of a world in view into the free slot and publishes it.
+
+        Args:
+            world (World): the world
+            stats (dict): speed, rate and lag of the simulation, see timestep.FixedTimestep.stats
+            view (tuple): the view, see camera.Camera.request
+        """
+        size = len(world.map)
+        x0, y0, x1, y1, step, block, scale = view
+        view = (x0, y0, min(x1, size), min(y1, size), step, block, scale)
+        rows, columns, block_rows, block_columns = view_shape(view)
+        if max(rows, columns) > self.size or max(block_rows, block_columns) > self.blocks:
+            raise ValueError(f"View {view} doesn't fit into a snapshot")
+
+        index = 1 - self.latest[0] if self.latest[0] >= 0 else 0
+        slot = self.slots[index]
+        header = slot["header"]
+        header[0] = 0  # the slot is being written
+
+        terrain = world.terrain_view(*view[:5])
+        slot["terrain"][: rows * columns] = terrain.reshape(-1)
+
+        # only the animals in view
+        store = world.store
+        n = store.size
+        x, y = store.x[:n], store.y[:n]
+        inside = store.active[:n] & (x >= view[0]) & (x < view[2]) & (y >= view[1]) & (y < view[3])
+        if block:
+            cells = (
+                store.type[:n][inside].astype(np.int64) * block_rows
+                + (y[inside] - view[1]) // block
+            ) * block_columns + (x[inside] - view[0]) // block
+            blocks = len(TYPES) * block_rows * block_columns
+            slot["density"][:blocks] = np.bincount(cells, minlength=blocks)
+            count = 0
+        else:
+            indices = np.flatnonzero(inside)[: self.capacity]
+            count = len(indices)
+            slot["x"][:count] = x[indices]
+            slot["y"][:count] = y[indices]
+            slot["types"][:count] = store.type[indices]
+
+        slot["stats"][:] = [stats[field] for field in STATS]
+        header[1:] = [
+            world.ticks,
+            count,
+            len(world.herbis),
+            len(world.carnis),
+            len(world.omnis),
+            stats["dropped"],
+            size,
+            *view,
+        ]
+        self.published += 1
+        header[0] = self.published
+        self.latest[0] = index
+
+    def read(self, retries: int = 3) -> Snapshot:
+        """Copies the latest complete snapshot, without waiting for the simulation.
+
+        Args:
+            retries (int, optional): attempts if the simulation overwrites the slot while it gets copied. Defaults to 3.
+
+        Returns:
+            Snapshot: the snapshot, None if there is no snapshot newer than the last one read
+        """
+        for _ in range(retries):
+            latest = self.latest[0]
+            if latest < 0:
+                return None
+            slot = self.slots[latest]
+            number = int(slot["header"][0])
+            if number == 0:  # overtaken before even starting
+                continue
+            if number == self.last_read:
+                return None
+
+            header = dict(zip(HEADER, slot["header"].tolist()))
+            stats = dict(zip(STATS, slot["stats"].tolist()))
+            count = header["count"]
+            view = tuple(header[field] for field in HEADER[8:])
+            rows, columns, block_rows, block_columns = view_shape(view)
+            x = slot["x"][:count].copy()
+            y = slot["y"][:count].copy()
+            types = slot["types"][:count].copy()
+            terrain = slot["terrain"][: rows * columns].reshape(rows, columns).copy()
+            density = None
+            if block_rows:
+                density = (
+                    slot["density"][: len(TYPES) * block_rows * block_columns]
+                    .reshape(len(TYPES), block_rows, block_columns)
+                    .copy()
+                )
+            if slot["header"][0] != number:  # overwritten while copying
+                continue
+
+            self.last_read = number
+            return Snapshot(header, stats, x, y, types, terrain, density)
+        return None
+
+    def close(self) -> None:
+        """Detaches from the shared memory, the side which created the buffer also frees it."""
+        # the views have to be gone before the memory can be closed
+        self.latest = None
+        self.slots = []
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
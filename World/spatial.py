@@ -0,0 +1,138 @@
+class SpatialHash:
+    """Uniform grid of buckets holding the animals of one species, keyed by the tile they stand on.
+
+    Every bucket covers a square of bucket_size x bucket_size tiles. Queries only visit the buckets around the searching animal,
+    so their cost depends on the number of nearby animals instead of the whole population.
+    """
+
+    def __init__(self, width: int, height: int, bucket_size: int = 5) -> None:
+        """Initializes an empty spatial hash.
+
+        Args:
+            width (int): width of the map in tiles
+            height (int): height of the map in tiles
+            bucket_size (int, optional): length/height of a bucket in tiles. Defaults to 5.
+        """
+        self.bucket_size = bucket_size
+        self.columns = -(-width // bucket_size)
+        self.rows = -(-height // bucket_size)
+        self.buckets = {}  # index of the bucket -> animals in it, only non-empty buckets are stored
+        self.tiles = {}  # animal -> tile it is currently stored at
+
+    def __bucket__(self, tile: tuple) -> int:
+        """Returns the index of the bucket a tile falls into.
+
+        Args:
+            tile (tuple): coordinates of the tile
+
+        Returns:
+            int: the index of the bucket
+        """
+        return (tile[1] // self.bucket_size) * self.columns + tile[0] // self.bucket_size
+
+    def __discard__(self, bucket: int, animal) -> None:
+        """Removes an animal from a bucket and drops the bucket once it is empty.
+
+        Args:
+            bucket (int): index of the bucket
+            animal: the animal to remove
+        """
+        animals = self.buckets[bucket]
+        animals.remove(animal)
+        if not animals:
+            del self.buckets[bucket]
+
+    def __len__(self) -> int:
+        """Returns the number of stored animals."""
+        return len(self.tiles)
+
+    def insert(self, animal, tile: tuple) -> None:
+        """Adds an animal to the hash.
+
+        Args:
+            animal: the animal to add
+            tile (tuple): coordinates of the tile the animal stands on
+        """
+        self.tiles[animal] = tile
+        self.buckets.setdefault(self.__bucket__(tile), []).append(animal)
+
+    def remove(self, animal) -> None:
+        """Removes an animal from the hash, if it is stored in it.
+
+        Args:
+            animal: the animal to remove
+        """
+        tile = self.tiles.pop(animal, None)
+        if tile is not None:
+            self.__discard__(self.__bucket__(tile), animal)
+
+    def remove_all(self, animals: list) -> None:
+        """Removes several animals from the hash at once, emptied buckets are only dropped once.
+
+        Args:
+            animals (list): the animals to remove
+        """
+        emptied = set()
+        for animal in animals:
+            tile = self.tiles.pop(animal, None)
+            if tile is not None:
+                bucket = self.__bucket__(tile)
+                self.buckets[bucket].remove(animal)
+                if not self.buckets[bucket]:
+                    emptied.add(bucket)
+        for bucket in emptied:
+            del self.buckets[bucket]
+
+    def move(self, animal, tile: tuple) -> None:
+        """Updates the stored tile of an animal after it moved.
+
+        Args:
+            animal: the animal which moved
+            tile (tuple): coordinates of the new tile
+        """
+        old_tile = self.tiles[animal]
+        if old_tile == tile:
+            return
+        self.tiles[animal] = tile
+        old_bucket = self.__bucket__(old_tile)
+        new_bucket = self.__bucket__(tile)
+        if old_bucket != new_bucket:
+            self.__discard__(old_bucket, animal)
+            self.buckets.setdefault(new_bucket, []).append(animal)
+
+    def nearest(self, tile: tuple, radius: int, predicate) -> object:
+        """Finds the nearest animal (chebyshev distance, i.e. the smallest square around the tile) which matches the predicate.
+
+        Args:
+            tile (tuple): coordinates of the tile the search starts from
+            radius (int): maximum distance of the found animal
+            predicate: function (animal) -> bool which decides if an animal is a valid result
+
+        Returns:
+            object: the nearest matching animal, None if there is none within the radius
+        """
+        size = self.bucket_size
+        bx, by = tile[0] // size, tile[1] // size
+        best = None
+        best_d = radius + 1
+
+        for ring in range(radius // size + 2):
+            # animals in this ring are at least (ring - 1) * size + 1 tiles away
+            if best_d <= (ring - 1) * size + 1:
+                break
+            for y in range(by - ring, by + ring + 1):
+                if not 0 <= y < self.rows:
+                    continue
+                # only the border of the square, the inside was visited in earlier rings
+                step = 1 if y in (by - ring, by + ring) else 2 * ring
+                for x in range(bx - ring, bx + ring + 1, step):
+                    if not 0 <= x < self.columns:
+                        continue
+                    for animal in self.buckets.get(y * self.columns + x, ()):
+                        pos = self.tiles[animal]
+                        d = max(abs(pos[0] - tile[0]), abs(pos[1] - tile[1]))
+                        if d < best_d and predicate(animal):
+                            best = animal
+                            best_d = d
+
+        return best
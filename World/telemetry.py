@@ -0,0 +1,228 @@
+import glob
+import os
+import threading
+import numpy as np
+from settings import *
+from Animals.store import TYPES, CAUSES
+
+# genomes whose distribution is recorded, the dominant ones are the store columns the animals live by
+GENOMES = {
+    "max_age_d": "max_age",
+    "max_age_r": "max_age_r",
+    "hunger_rate_d": "hunger_rate",
+    "hunger_rate_r": "hunger_rate_r",
+    "thirst_rate_d": "thirst_rate",
+    "thirst_rate_r": "thirst_rate_r",
+}
+STATISTICS = ("mean", "std", "min", "max")  # recorded for every genome of every type
+
+
+class Table:
+    """Preallocated columns of one kind of record, filled one row at a time and handed out in blocks."""
+
+    def __init__(self, name: str, columns: dict, rows: int) -> None:
+        """Initializes an empty table.
+
+        Args:
+            name (str): name of the table, the files of its blocks start with it
+            columns (dict): name -> data type of every column
+            rows (int): rows of a block
+        """
+        self.name = name
+        self.dtypes = columns
+        self.rows = rows
+        self.__allocate__()
+
+    def __allocate__(self) -> None:
+        """Starts a new block."""
+        self.columns = {name: np.zeros(self.rows, dtype) for name, dtype in self.dtypes.items()}
+        self.length = 0
+
+    def append(self, values: dict) -> bool:
+        """Adds a row.
+
+        Args:
+            values (dict): the value of every column
+
+        Returns:
+            bool: true if the block is full now
+        """
+        for name, value in values.items():
+            self.columns[name][self.length] = value
+        self.length += 1
+        return self.length == self.rows
+
+    def take(self) -> dict:
+        """Hands out the rows of the current block and starts a new one.
+
+        Returns:
+            dict: the filled part of every column
+        """
+        block = {name: column[: self.length] for name, column in self.columns.items()}
+        self.__allocate__()
+        return block
+
+
+def write(path: str, block: dict) -> None:
+    """Writes a block of a table into a compressed file with one array per column.
+
+    Args:
+        path (str): path of the file
+        block (dict): the columns
+    """
+    temporary = path + ".tmp.npz"  # numpy would append the extension otherwise
+    np.savez_compressed(temporary, **block)
+    os.replace(temporary, path)
+
+
+def read(directory: str, table: str = "populations") -> dict:
+    """Reads all blocks of a table a run wrote to a directory.
+
+    Args:
+        directory (str): the directory of the run
+        table (str, optional): "populations" or "genomes". Defaults to "populations".
+
+    Returns:
+        dict: the columns, in tick order
+    """
+    blocks = []
+    for path in sorted(glob.glob(os.path.join(directory, table + "-*.npz"))):
+        with np.load(path) as file:
+            blocks.append({name: file[name] for name in file.files})
+    if not blocks:
+        return {}
+    return {name: np.concatenate([block[name] for block in blocks]) for name in blocks[0]}
+
+
+def genome_statistics(store, ticks: int) -> dict:
+    """Computes the distributions of the genomes of all alive animals.
+
+    Args:
+        store (AnimalStore): the animal store of the world
+        ticks (int): the current tick
+
+    Returns:
+        dict: the row of the genomes table, NaN for extinct types
+    """
+    n = store.size
+    active = store.active[:n]
+    types = store.type[:n]
+    row = {"tick": ticks}
+    for i, type in enumerate(TYPES):
+        members = active & (types == i)
+        for genome, name in GENOMES.items():
+            values = getattr(store, name)[:n][members]
+            if len(values):
+                statistics = (values.mean(), values.std(), values.min(), values.max())
+            else:  # extinct
+                statistics = (np.nan,) * len(STATISTICS)
+            for statistic, value in zip(STATISTICS, statistics):
+                row[f"{type}_{genome}_{statistic}"] = value
+    return row
+
+
+class Telemetry:
+    """Statistics of a running world, recorded without slowing it down.
+
+    Every TELEMETRY_INTERVAL ticks a row with the populations, births and deaths by cause of every type is appended to the
+    "populations" table, births and deaths are summed up in between so none get lost. Every TELEMETRY_GENOME_INTERVAL ticks a
+    row with the mean, standard deviation, minimum and maximum of every genome of every type is appended to the "genomes"
+    table, computed from the columns of the animal store. Tables are buffered in preallocated columns, a full block gets
+    written to a compressed file in the background while the next one fills up.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        interval: int = TELEMETRY_INTERVAL,
+        genome_interval: int = TELEMETRY_GENOME_INTERVAL,
+        rows: int = TELEMETRY_ROWS,
+    ) -> None:
+        """Initializes the telemetry of a run.
+
+        Args:
+            directory (str): directory the files get written to, one per run
+            interval (int, optional): ticks between two rows of the populations table. Defaults to TELEMETRY_INTERVAL.
+            genome_interval (int, optional): ticks between two rows of the genomes table, 0 disables it. Defaults to TELEMETRY_GENOME_INTERVAL.
+            rows (int, optional): rows buffered per table before they get written. Defaults to TELEMETRY_ROWS.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.interval = interval
+        self.genome_interval = genome_interval
+        self.writing = None  # thread writing the last block
+
+        columns = {"tick": np.int64}
+        for type in TYPES:
+            columns[type + "s"] = np.int32
+            columns[type + "_births"] = np.int32
+            for cause in CAUSES:
+                columns[f"{type}_deaths_{cause}"] = np.int32
+        self.populations = Table("populations", columns, rows)
+
+        columns = {"tick": np.int64}
+        for type in TYPES:
+            for genome in GENOMES:
+                for statistic in STATISTICS:
+                    columns[f"{type}_{genome}_{statistic}"] = np.float32
+        self.genomes = Table("genomes", columns, rows)
+
+        # births and deaths since the last row
+        self.births = np.zeros(len(TYPES), np.int64)
+        self.deaths = np.zeros((len(TYPES), len(CAUSES)), np.int64)
+        self.type_index = {type: i for i, type in enumerate(TYPES)}
+
+    def record(self, world, spawns: list, despawns: dict) -> None:
+        """Records a tick, called once its births and deaths were applied.
+
+        Args:
+            world (World): the world
+            spawns (list): the births of the tick, see commands.CommandBuffer
+            despawns (dict): the dead animals of the tick and their causes of death, see commands.CommandBuffer
+        """
+        for type, *_ in spawns:
+            self.births[self.type_index[type]] += 1
+        for animal, cause in despawns.items():
+            self.deaths[self.type_index[animal.type], cause] += 1
+
+        ticks = world.ticks
+        if ticks % self.interval == 0:
+            row = {"tick": ticks}
+            for i, (type, population) in enumerate(
+                zip(TYPES, (world.herbis, world.carnis, world.omnis))
+            ):
+                row[type + "s"] = len(population)
+                row[type + "_births"] = self.births[i]
+                for j, cause in enumerate(CAUSES):
+                    row[f"{type}_deaths_{cause}"] = self.deaths[i, j]
+            self.births[:] = 0
+            self.deaths[:] = 0
+            if self.populations.append(row):
+                self.__flush__(self.populations)
+
+        if self.genome_interval and ticks % self.genome_interval == 0:
+            if self.genomes.append(genome_statistics(world.store, ticks)):
+                self.__flush__(self.genomes)
+
+    def __flush__(self, table: Table) -> None:
+        """Writes the filled rows of a table in the background, waits for the previous block first so at most one block
+        is on its way to the disk.
+
+        Args:
+            table (Table): the table
+        """
+        if table.length == 0:
+            return
+        path = os.path.join(self.directory, f"{table.name}-{table.columns['tick'][0]:010d}.npz")
+        block = table.take()
+        if self.writing is not None:
+            self.writing.join()
+        self.writing = threading.Thread(target=write, args=(path, block))
+        self.writing.start()
+
+    def close(self) -> None:
+        """Writes all remaining rows and waits until they are on disk."""
+        self.__flush__(self.populations)
+        self.__flush__(self.genomes)
+        if self.writing is not None:
+            self.writing.join()
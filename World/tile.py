@@ -2,6 +2,24 @@ import pygame as pg
 from settings import *
 
 
+__images__ = {}  # path -> loaded image, shared by all tiles and animals
+
+
+def load_image(path: str) -> pg.Surface:
+    """Loads an image from disk the first time it is requested, later requests get the same surface.
+
+    Args:
+        path (str): The path to the image file.
+
+    Returns:
+        pygame.Surface: The image.
+    """
+    image = __images__.get(path)
+    if image is None:
+        image = __images__[path] = pg.image.load(path).convert_alpha()
+    return image
+
+
 class Tile(pg.sprite.Sprite):
 
     def __init__(self, pos: tuple, path: str, groups) -> None:
@@ -9,9 +27,13 @@ class Tile(pg.sprite.Sprite):
 
         Args:
             pos (tuple): The position of the Tile.
-            path (str): The path to the image file.
+            path (str): The path to the image file, None for a Tile without an image in a headless world.
             groups: The sprite groups the Tile belongs to.
         """
         super().__init__(groups)
-        self.image = pg.image.load(path).convert_alpha()
-        self.rect = self.image.get_rect(topleft=pos)
+        if path is None:
+            self.image = None
+            self.rect = pg.Rect(pos, (TILESIZE, TILESIZE))
+        else:
+            self.image = load_image(path)
+            self.rect = self.image.get_rect(topleft=pos)
@@ -0,0 +1,147 @@
+import multiprocessing as mp
+import queue
+import threading
+import time
+from settings import *
+from World.snapshot import SnapshotBuffer
+from World.world import World
+from World.camera import Camera
+from World import checkpoint
+from timestep import FixedTimestep
+
+
+def simulate(name: str, commands, resume: str = None) -> None:
+    """Simulation loop of a worker: creates a headless world, advances it at the rate of its own fixed timestep and publishes a
+    snapshot after every batch of ticks. Commands of the window are received through a queue. Every CHECKPOINT_INTERVAL ticks
+    the world is saved to CHECKPOINT_PATH, while the file is written the simulation goes on.
+
+    Args:
+        name (str): name of the shared memory of the snapshot buffer
+        commands: queue of (command, value) tuples, the commands are "pause", "speed", "view", "save" and "stop"
+        resume (str, optional): path of a checkpoint the world is restored from instead of creating a new one. Defaults to none.
+    """
+    world = World(headless=True) if resume is None else checkpoint.load(resume)
+    buffer = SnapshotBuffer(name)
+    timestep = FixedTimestep()
+    running = True
+    saving = None  # thread writing the last checkpoint
+    saved = world.ticks  # tick of the last checkpoint
+    view = Camera(len(world.map)).request()
+    buffer.publish(world, timestep.stats(), view)
+
+    while True:
+        changed = False
+        while True:
+            try:
+                command, value = commands.get_nowait()
+            except queue.Empty:
+                break
+            if command == "stop":
+                if saving is not None:
+                    saving.join()  # a checkpoint must not be cut off halfway
+                world.shutdown()
+                buffer.close()
+                return
+            elif command == "pause":
+                running = value
+            elif command == "speed":
+                timestep.set_factor(value)
+            elif command == "view":
+                view = value
+            elif command == "save" and (saving is None or not saving.is_alive()):
+                # ignored while the last checkpoint is still being written
+                saving = checkpoint.save(world, value)
+                saved = world.ticks
+            changed = True
+
+        if timestep.advance(world.step, running) or changed:
+            buffer.publish(world, timestep.stats(), view)
+        else:
+            time.sleep(0.001)  # no tick is due yet
+
+        if (
+            CHECKPOINT_INTERVAL
+            and world.ticks - saved >= CHECKPOINT_INTERVAL
+            and (saving is None or not saving.is_alive())
+        ):
+            saving = checkpoint.save(world, CHECKPOINT_PATH)
+            saved = world.ticks
+
+
+class SimulationWorker:
+    """Runs the simulation of a world next to the window, in a separate process (so it gets its own core) or thread. The window
+    only ever sees the snapshots the worker publishes."""
+
+    def __init__(self, mode: str = SIMULATION_WORKER, resume: str = None) -> None:
+        """Starts the worker.
+
+        Args:
+            mode (str, optional): "process" or "thread". Defaults to SIMULATION_WORKER.
+            resume (str, optional): path of a checkpoint the simulation is resumed from. Defaults to none.
+        """
+        self.buffer = SnapshotBuffer()
+        if mode == "process":
+            # the window's pygame state must not be forked into the worker
+            context = mp.get_context("spawn")
+            self.commands = context.Queue()
+            self.worker = context.Process(
+                target=simulate, args=(self.buffer.name, self.commands, resume)
+            )
+        elif mode == "thread":
+            self.commands = queue.Queue()
+            self.worker = threading.Thread(
+                target=simulate,
+                args=(self.buffer.name, self.commands, resume),
+                daemon=True,
+            )
+        else:
+            raise ValueError(f"Unknown simulation worker {mode!r}")
+        self.worker.start()
+
+    def send(self, command: str, value=None) -> None:
+        """Sends a command to the simulation.
+
+        Args:
+            command (str): "pause" (value: the new run state), "speed" (value: the fast-forward factor), "view" (value: the
+                view of the camera, see camera.Camera.request) or "save" (value: the path of the checkpoint)
+            value (optional): the value of the command. Defaults to none.
+        """
+        self.commands.put((command, value))
+
+    def alive(self) -> bool:
+        """Checks if the worker is still running.
+
+        Returns:
+            bool: false if the simulation stopped, i.e. because it crashed
+        """
+        return self.worker.is_alive()
+
+    def latest(self):
+        """Returns the latest snapshot, without waiting for the simulation.
+
+        Returns:
+            Snapshot: the snapshot, None if there is nothing new since the last call
+        """
+        return self.buffer.read()
+
+    def first(self):
+        """Waits until the world is created and returns its first snapshot.
+
+        Returns:
+            Snapshot: the snapshot, None if the worker stopped before
+        """
+        while self.alive():
+            snapshot = self.buffer.read()
+            if snapshot is not None:
+                return snapshot
+            time.sleep(0.01)
+        return None
+
+    def stop(self) -> None:
+        """Stops the simulation and frees the snapshot buffer."""
+        if self.alive():
+            self.send("stop")
+            self.worker.join(5)
+        if isinstance(self.worker, mp.process.BaseProcess) and self.worker.is_alive():
+            self.worker.terminate()
+        self.buffer.close()
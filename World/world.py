@@ -1,86 +1,188 @@
 import pygame as pg
+import numpy as np
+import astar as ast
 import random as rnd
 from settings import *
-from World.tile import Tile
+from World.renderer import Renderer
+from World.tile import load_image
+from World.fields import DistanceField, SearchField, is_berry, is_drinkable
+from World.chunks import ChunkedMap
+from World.spatial import SpatialHash
+from World.scheduler import PathScheduler
+from World.commands import CommandBuffer
+from World.telemetry import Telemetry
+from Animals.store import AnimalStore, CAUSES
 from Animals.herbi import Herbivore
 from Animals.carni import Carnivore
 from Animals.omni import Omnivore
 from generator import generate_map
+from mapcache import MapCache
 
+# paths to all the sprites
+IMAGES = {
+    "grass": "World/tileset/grass.png",
+    "berry": "World/tileset/berry.png",
+    "water": "World/tileset/water.png",
+    "herbi": "World/tileset/herbi.png",
+    "carni": "World/tileset/carni.png",
+    "omni": "World/tileset/omni.png",
+}
+# independent random number streams of a world, so drawing more numbers for one purpose doesn't shift the others
+RANDOM_STREAMS = ("map", "genomes", "movement", "mating")
 
-class World:
-    """Handles the actual simulated world"""
 
-    def __init__(self, map: list = None) -> None:
+class World:
+    """Handles the actual simulated world. A headless world never touches the display, it can be advanced with step() as fast
+    as the CPU allows, i.e. for batch experiments. All randomness of a world comes from its own streams derived from its seed,
+    so a world created with a seed always runs the same way."""
+
+    def __init__(
+        self,
+        map: np.ndarray = None,
+        chunked: bool = CHUNKED_WORLD,
+        headless: bool = False,
+        populate: bool = True,
+        telemetry: str = TELEMETRY_DIRECTORY,
+        seed: int = None,
+        events=None,
+        map_cache: str = MAP_CACHE_DIRECTORY,
+    ) -> None:
         """Initializes the World object with necessary setup.
 
         Args:
-            map (list): Optional parameter for the map configuration.
+            map (numpy.ndarray): Optional parameter for the map configuration.
+            chunked (bool): Generates the map in chunks on demand instead of all at once. Defaults to CHUNKED_WORLD.
+            headless (bool): Runs without surfaces, fonts and images, pygame doesn't need to be initialized. Defaults to False.
+            populate (bool): Spawns the animals placed on the map, a world restored from a checkpoint brings its own. Defaults to True.
+            telemetry (str): Directory the statistics of the run get recorded to, None records nothing. Defaults to TELEMETRY_DIRECTORY.
+            seed (int): Seed of the random streams. A seeded world is reproducible, so its path finding is only limited by the
+                node budget, the time budget depends on the machine. Defaults to None, a random seed.
+            events (EventLog): Log the spawns, deaths and path assignments get recorded to, see events.EventLog. Defaults to None.
+            map_cache (str): Directory of the map cache a generated map is taken from, see mapcache.MapCache. None generates
+                it every time. Defaults to MAP_CACHE_DIRECTORY.
         """
-        self.display_surface = pg.display.get_surface()
-        self.font = pg.font.SysFont("arial", 20, True)
+        self.headless = headless
+        self.populate = populate
+        self.display_surface = None if headless else pg.display.get_surface()
+        self.font = None if headless else pg.font.SysFont("arial", 20, True)
+        self.ticks = 0  # number of simulated ticks
+
+        self.seeded = seed is not None
+        self.seed = rnd.randint(0, 999999999) if seed is None else seed
+        self.random = {name: rnd.Random(f"{self.seed}:{name}") for name in RANDOM_STREAMS}
+        self.events = events
 
-        self.world_sprites = pg.sprite.Group()
         self.alive_sprites = pg.sprite.Group()
         self.dead_sprites = pg.sprite.Group()
 
-        self.map = generate_map() if map is None else map
+        self.chunked = chunked
+        if chunked:
+            # chunks get generated once animals come close to them, idle ones are moved to disk
+            self.map = ChunkedMap(random=self.random["map"])
+
+            # the map is too large for precomputed fields, resources are searched from the animal instead
+            self.water_field = SearchField(self.map, is_drinkable)
+            self.berry_field = SearchField(self.map, is_berry)
+        else:
+            if map is None and map_cache is not None:
+                self.map = MapCache(map_cache).get(random=self.random["map"])
+            elif map is None:
+                self.map = generate_map(random=self.random["map"])
+            else:
+                self.map = np.asarray(map, dtype=np.uint8)
+            # walkability grid and land/water region labels used by the path finding
+            ast.get_path_grid(self.map)
+            if len(self.map) >= HIERARCHICAL_MAPSIZE:
+                ast.set_mode(self.map, ast.HIERARCHICAL)
+
+            # distance fields leading to the nearest resource of their kind
+            self.water_field = DistanceField(self.map, is_drinkable)
+            self.berry_field = DistanceField(self.map, is_berry)
+        height, width = self.map.shape
+
+        # spatial hashes for every animal type, used for prey and mate searches
+        self.spatial = {
+            "herbi": SpatialHash(width, height),
+            "carni": SpatialHash(width, height),
+            "omni": SpatialHash(width, height),
+        }
+
+        # collects the path requests of the animals and solves them at the end of every tick,
+        # chunked maps can't be copied to worker processes
+        self.scheduler = PathScheduler(
+            self.map,
+            0 if chunked else PATH_WORKERS,
+            0 if self.seeded else PATH_BUDGET,
+            PATH_NODE_BUDGET,
+        )
+
+        # per-tick state of all animals, updated for the whole population at once
+        self.store = AnimalStore(width)
 
         # dictionaries containing all alive instances of their respective animal type
         self.herbis = {}
         self.carnis = {}
         self.omnis = {}
 
+        # births and deaths of the current tick, applied at once after all animals acted
+        self.commands = CommandBuffer()
+
+        # statistics of every tick, written to disk in the background
+        self.telemetry = None if telemetry is None else Telemetry(telemetry)
+
+        # dead animals of every type, births reuse them instead of creating new objects
+        self.pool = {"herbi": [], "carni": [], "omni": []}
+
         # key values corresponding to the dictionaries
         self.herb_key = 1
         self.carn_key = 1
         self.omnis_key = 1
 
-        # paths to all the sprites
-        self.images = {
-            "grass": "World/tileset/grass.png",
-            "berry": "World/tileset/berry.png",
-            "water": "World/tileset/water.png",
-            "herbi": "World/tileset/herbi.png",
-            "carni": "World/tileset/carni.png",
-            "omni": "World/tileset/omni.png",
-        }
+        # animals in a headless world get no image and the terrain isn't drawn at all
+        self.images = dict.fromkeys(IMAGES) if headless else dict(IMAGES)
+        if not headless:
+            # one image per type shared by all of its animals, loaded before the first tick so births never touch the disk
+            for kind in self.spatial:
+                load_image(self.images[kind])
+        self.renderer = None
 
         # map setup
         self.__create_map__()
+        if self.events is not None:
+            self.events.end_tick(self)  # the initial population and the first keyframe
 
     # MAKE ANIMAL SECTION
 
-    def __make_carnivore__(self, pos: tuple, passed_genomes: dict = None) -> None:
-        """Creates a new carnivore with either a random or a passed set of genomes.
+    def __make_carnivore__(
+        self, pos: tuple, passed_genomes: dict = None, parents: tuple = None
+    ):
+        """Creates a new carnivore with either a random or a passed set of genomes. A dead carnivore from the pool is reused if
+        there is one.
 
         Args:
             pos (tuple): The position at which the animal will be spawned in.
             passed_genomes (dict, optional): Passed on genomes in case of mating. Defaults to None so that if no genomes are passed, a random set gets generated.
+            parents (tuple, optional): Keys of the parents in case of mating. Defaults to None.
+
+        Returns:
+            Animal: the new animal
         """
-        if passed_genomes:
-            self.carnis[self.carn_key] = Carnivore(
-                pos,
-                self.herbis,
-                passed_genomes,
-                self.carnis,
-                self.map,
-                self.carn_key,
-                self.images["carni"],
-                [self.alive_sprites],
-            )
-        else:
+        genomes = passed_genomes
+        if not genomes:
+            random = self.random["genomes"]
             genomes = {
                 "animal_type": "carni",
-                "max_age_d": rnd.randint(700, 800),
-                "max_age_r": rnd.randint(700, 800),
-                "hunger_rate_d": round(rnd.uniform(8, 15), 2),
-                "hunger_rate_r": round(rnd.uniform(8, 15), 2),
-                "thirst_rate_d": round(rnd.uniform(8, 15), 2),
-                "thirst_rate_r": round(rnd.uniform(8, 15), 2),
+                "max_age_d": random.randint(700, 800),
+                "max_age_r": random.randint(700, 800),
+                "hunger_rate_d": round(random.uniform(8, 15), 2),
+                "hunger_rate_r": round(random.uniform(8, 15), 2),
+                "thirst_rate_d": round(random.uniform(8, 15), 2),
+                "thirst_rate_r": round(random.uniform(8, 15), 2),
             }
 
-            self.carnis[self.carn_key] = Carnivore(
+        animal = self.__recycle__("carni", pos, genomes, self.carn_key)
+        if animal is None:
+            animal = Carnivore(
                 pos,
                 self.herbis,
                 genomes,
@@ -89,39 +191,45 @@ class World:
                 self.carn_key,
                 self.images["carni"],
                 [self.alive_sprites],
+                self,
             )
-
+        self.carnis[self.carn_key] = animal
+        self.spatial[animal.type].insert(animal, animal.__convert_pos__(pos))
         self.carn_key += 1
+        if self.events is not None:
+            self.events.spawn(self.ticks, animal, parents)
+        return animal
 
-    def __make_herbivore__(self, pos: tuple, passed_genomes: dict = None) -> None:
-        """Creates a new herbivore with either a random or a passed set of genomes.
+    def __make_herbivore__(
+        self, pos: tuple, passed_genomes: dict = None, parents: tuple = None
+    ):
+        """Creates a new herbivore with either a random or a passed set of genomes. A dead herbivore from the pool is reused if
+        there is one.
 
         Args:
             pos (tuple): The position at which the animal will be spawned in.
             passed_genomes (dict, optional): Passed on genomes in case of mating. Defaults to None so that if no genomes are passed, a random set gets generated.
+            parents (tuple, optional): Keys of the parents in case of mating. Defaults to None.
+
+        Returns:
+            Animal: the new animal
         """
-        if passed_genomes:
-            self.herbis[self.herb_key] = Herbivore(
-                pos,
-                passed_genomes,
-                self.herbis,
-                self.map,
-                self.herb_key,
-                self.images["herbi"],
-                [self.alive_sprites],
-            )
-        else:
+        genomes = passed_genomes
+        if not genomes:
+            random = self.random["genomes"]
             genomes = {
                 "animal_type": "herbi",
-                "max_age_d": rnd.randint(500, 600),
-                "max_age_r": rnd.randint(500, 600),
-                "hunger_rate_d": round(rnd.uniform(5, 10), 2),
-                "hunger_rate_r": round(rnd.uniform(5, 10), 2),
-                "thirst_rate_d": round(rnd.uniform(5, 10), 2),
-                "thirst_rate_r": round(rnd.uniform(5, 10), 2),
+                "max_age_d": random.randint(500, 600),
+                "max_age_r": random.randint(500, 600),
+                "hunger_rate_d": round(random.uniform(5, 10), 2),
+                "hunger_rate_r": round(random.uniform(5, 10), 2),
+                "thirst_rate_d": round(random.uniform(5, 10), 2),
+                "thirst_rate_r": round(random.uniform(5, 10), 2),
             }
 
-            self.herbis[self.herb_key] = Herbivore(
+        animal = self.__recycle__("herbi", pos, genomes, self.herb_key)
+        if animal is None:
+            animal = Herbivore(
                 pos,
                 genomes,
                 self.herbis,
@@ -129,40 +237,45 @@ class World:
                 self.herb_key,
                 self.images["herbi"],
                 [self.alive_sprites],
+                self,
             )
-
+        self.herbis[self.herb_key] = animal
+        self.spatial[animal.type].insert(animal, animal.__convert_pos__(pos))
         self.herb_key += 1
+        if self.events is not None:
+            self.events.spawn(self.ticks, animal, parents)
+        return animal
 
-    def __make_omnivore__(self, pos: tuple, passed_genomes: dict = None) -> None:
-        """Creates a new omnivore with either a random or a passed set of genomes.
+    def __make_omnivore__(
+        self, pos: tuple, passed_genomes: dict = None, parents: tuple = None
+    ):
+        """Creates a new omnivore with either a random or a passed set of genomes. A dead omnivore from the pool is reused if
+        there is one.
 
         Args:
             pos (tuple): The position at which the animal will be spawned in.
             passed_genomes (dict, optional): Passed on genomes in case of mating. Defaults to None so that if no genomes are passed, a random set gets generated.
+            parents (tuple, optional): Keys of the parents in case of mating. Defaults to None.
+
+        Returns:
+            Animal: the new animal
         """
-        if passed_genomes:
-            self.omnis[self.omnis_key] = Omnivore(
-                pos,
-                self.herbis,
-                passed_genomes,
-                self.omnis,
-                self.map,
-                self.omnis_key,
-                self.images["omni"],
-                [self.alive_sprites],
-            )
-        else:
+        genomes = passed_genomes
+        if not genomes:
+            random = self.random["genomes"]
             genomes = {
                 "animal_type": "omni",
-                "max_age_d": rnd.randint(900, 1000),
-                "max_age_r": rnd.randint(900, 1000),
-                "hunger_rate_d": round(rnd.uniform(8, 15), 2),
-                "hunger_rate_r": round(rnd.uniform(8, 15), 2),
-                "thirst_rate_d": round(rnd.uniform(8, 15), 2),
-                "thirst_rate_r": round(rnd.uniform(8, 15), 2),
+                "max_age_d": random.randint(900, 1000),
+                "max_age_r": random.randint(900, 1000),
+                "hunger_rate_d": round(random.uniform(8, 15), 2),
+                "hunger_rate_r": round(random.uniform(8, 15), 2),
+                "thirst_rate_d": round(random.uniform(8, 15), 2),
+                "thirst_rate_r": round(random.uniform(8, 15), 2),
             }
 
-            self.omnis[self.omnis_key] = Omnivore(
+        animal = self.__recycle__("omni", pos, genomes, self.omnis_key)
+        if animal is None:
+            animal = Omnivore(
                 pos,
                 self.herbis,
                 genomes,
@@ -171,118 +284,287 @@ class World:
                 self.omnis_key,
                 self.images["omni"],
                 [self.alive_sprites],
+                self,
             )
-
+        self.omnis[self.omnis_key] = animal
+        self.spatial[animal.type].insert(animal, animal.__convert_pos__(pos))
         self.omnis_key += 1
+        if self.events is not None:
+            self.events.spawn(self.ticks, animal, parents)
+        return animal
+
+    def __recycle__(self, type: str, pos: tuple, genomes: dict, key: int):
+        """Takes a dead animal of the given type out of the pool and brings it back to life.
+
+        Args:
+            type (str): The animal type.
+            pos (tuple): The position at which the animal will be spawned in.
+            genomes (dict): The genomes of the new animal.
+            key (int): The key of the new animal.
+
+        Returns:
+            Animal: the recycled animal, None if the pool of the type is empty
+        """
+        pool = self.pool[type]
+        if not pool:
+            return None
+        animal = pool.pop()
+        animal.respawn(pos, genomes, key, [self.alive_sprites])
+        return animal
 
     # END OF MAKE ANIMAL SECTION
 
-    def __create_map__(self) -> None:
-        """Creates the map from the array the generator module created."""
-
-        # converts array to positions and draws the corresponding tile
-        for row_index, row in enumerate(self.map):
-            for col_index, col in enumerate(row):
-                x = col_index * TILESIZE
-                y = row_index * TILESIZE
-                if col == 2.0:  # grass tiles
-                    Tile((x, y), self.images["grass"], [self.world_sprites])
-                elif col == 0.0:  # berry tiles
-                    # there needs to be a grass tile placed under the berry bush
-                    Tile((x, y), self.images["grass"], [self.world_sprites])
-                    Tile((x, y), self.images["berry"], [self.world_sprites])
-                elif col == 5.0:  # water tiles
-                    Tile((x, y), self.images["water"], [self.world_sprites])
-                elif col == 1.0:  # carnivore
-                    # there needs to be a grass tile placed under the animal
-                    Tile((x, y), self.images["grass"], [self.world_sprites])
-                    self.__make_carnivore__((x, y))
-                elif col == 3.0:  # herbivore
-                    # see above
-                    Tile((x, y), self.images["grass"], [self.world_sprites])
-                    self.__make_herbivore__((x, y))
-                elif col == 4.0:  # omnivore
-                    Tile((x, y), self.images["grass"], [self.world_sprites])
-                    self.__make_omnivore__((x, y))
-                else:  # this shouldn't happen
-                    print(
-                        f"Error: Unknown value in array at: {(x, y)}. Exiting program."
-                    )
-                    exit(1)
+    def reachable(self, start: tuple, end: tuple) -> bool:
+        """Checks if a path between two tiles exists, using the land region labels of the map.
+
+        Args:
+            start (tuple): coordinates of the start tile
+            end (tuple): coordinates of the end tile
 
-    def __update_graphics__(self) -> None:
-        """Updates the sprites on screen and the animal counters."""
-        self.world_sprites.draw(self.display_surface)
-        self.alive_sprites.draw(self.display_surface)
+        Returns:
+            bool: true if a path exists, else false
+        """
+        return ast.reachable(self.map, start, end)
 
-        live_herbs = self.font.render(
-            f"Alive herbivores: {len(self.herbis)}", True, (255, 255, 255)
-        )
-        live_carns = self.font.render(
-            f"Alive carnivores:  {len(self.carnis)}", True, (255, 255, 255)
+    def terrain_view(self, x0: int, y0: int, x1: int, y1: int, step: int = 1) -> np.ndarray:
+        """Samples every step-th tile of every step-th row of an area of the map, i.e. for drawing it. Chunks of a chunked map
+        aren't generated for this, their tiles are UNKNOWN until an animal comes close.
+
+        Args:
+            x0 (int): x-coordinate of the top left tile
+            y0 (int): y-coordinate of the top left tile
+            x1 (int): x-coordinate after the right edge
+            y1 (int): y-coordinate after the bottom edge
+            step (int, optional): distance between two samples in tiles. Defaults to 1.
+
+        Returns:
+            numpy.ndarray: the sampled terrain codes
+        """
+        if self.chunked:
+            return self.map.peek(x0, y0, x1, y1, step)
+        return np.asarray(self.map[y0:y1:step, x0:x1:step])
+
+    def set_tile(self, x: int, y: int, value: int) -> None:
+        """Changes a single tile of the map and keeps all structures derived from the map in sync.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+            value (int): The new terrain code of the tile.
+        """
+        self.map[y, x] = value
+        ast.update_tile(self.map, x, y)
+        self.water_field.update_tile(x, y)
+        self.scheduler.map_changed()
+        self.berry_field.update_tile(x, y)
+        if self.renderer is not None:
+            self.renderer.rebake(x, y)
+
+    def __create_map__(self) -> None:
+        """Spawns the animals placed on the map by the generator module and bakes the terrain for the screen. Chunked maps are
+        unbounded, there only the area covered by the screen is populated, the animals spread out into the rest of it by
+        themselves."""
+        size = MAPSIZE if self.chunked else len(self.map)
+        codes = np.asarray(self.map[:size, :size])
+
+        unknown = np.argwhere(codes > WATER)
+        if len(unknown):  # this shouldn't happen
+            y, x = unknown[0] * TILESIZE
+            print(f"Error: Unknown value in array at: {(x, y)}. Exiting program.")
+            exit(1)
+
+        # spawns the animals row by row, a world restored from a checkpoint already has its animals
+        spawns = (codes == CARNI_SPAWN) | (codes == HERBI_SPAWN) | (codes == OMNI_SPAWN)
+        if not self.populate:
+            spawns[:] = False
+        for row_index, col_index in np.argwhere(spawns).tolist():
+            col = codes[row_index, col_index]
+            x = col_index * TILESIZE
+            y = row_index * TILESIZE
+            if col == CARNI_SPAWN:  # carnivore
+                self.__make_carnivore__((x, y))
+            elif col == HERBI_SPAWN:  # herbivore
+                self.__make_herbivore__((x, y))
+            elif col == OMNI_SPAWN:  # omnivore
+                self.__make_omnivore__((x, y))
+
+        # the terrain is drawn from one pre-baked surface covering the screen
+        self.renderer = (
+            None if self.headless else Renderer(self.map, self.images, min(size, MAPSIZE))
         )
-        live_ommnis = self.font.render(
-            f"Alive omnivores:  {len(self.omnis)}", True, (255, 255, 255)
+
+    def __update_graphics__(self, full: bool = True) -> list:
+        """Updates the sprites on screen and the animal counters.
+
+        Args:
+            full (bool, optional): Redraws everything if true, otherwise only what changed since the last frame. Defaults to True.
+
+        Returns:
+            list: the changed rectangles of the screen
+        """
+        if full:
+            dirty = self.renderer.draw(self.alive_sprites)
+        else:
+            dirty = self.renderer.draw_dirty(self.alive_sprites)
+
+        dirty += self.renderer.counters(
+            self.font, len(self.herbis), len(self.carnis), len(self.omnis)
         )
-        self.display_surface.blit(live_herbs, (10, 1015))
-        self.display_surface.blit(live_carns, (10, 1040))
-        self.display_surface.blit(live_ommnis, (10, 1065))
+        return dirty
 
-    def __remove_animal(self, animal) -> None:
-        """Removes the specified animal from the corresponding animal type dictionary and kills the animal.
+    def __despawn__(self, animal, cause: int) -> None:
+        """Emits the death of an animal. Its links to other animals are released right away, so no hunter or mate keeps
+        following it, but it stays in all structures of the world until the commands of the tick are applied. It doesn't take
+        part in the rest of the tick.
 
         Args:
-            animal: The animal to be removed.
+            animal: The dead animal.
+            cause (int): Index of the cause of death in CAUSES.
         """
-        if animal.type == "herbi":
-            self.herbis.pop(animal.key)
-        elif animal.type == "carni":
-            self.carnis.pop(animal.key)
-        elif animal.type == "omni":
-            self.omnis.pop(animal.key)
-        else:  # this shouldn't happen
-            print(
-                "Error: Animal of unknown type encountered during removal process. Exiting program."
+        if self.commands.despawn(animal, cause):
+            animal.__cleanup_on_death__()
+            self.store.acting[animal.slot] = False
+
+    def __apply_commands__(self) -> None:
+        """Applies the births and deaths emitted during the tick in one batch. The dead are removed from the animal type
+        dictionaries, the spatial hashes, the animal store and the sprite groups first, so the births can reuse their slots
+        and objects."""
+        spawns, despawns = self.commands.drain()
+
+        if despawns:
+            populations = {"herbi": self.herbis, "carni": self.carnis, "omni": self.omnis}
+            dead = {type: [] for type in populations}
+            for animal in despawns:
+                if animal.type not in populations:  # this shouldn't happen
+                    print(
+                        "Error: Animal of unknown type encountered during removal process. Exiting program."
+                    )
+                    exit(1)
+                populations[animal.type].pop(animal.key)
+                dead[animal.type].append(animal)
+                if self.events is not None:
+                    self.events.death(self.ticks, animal, despawns[animal])
+            for type, animals in dead.items():
+                self.spatial[type].remove_all(animals)
+                pool = self.pool[type]
+                pool += animals[: max(ANIMAL_POOL_SIZE - len(pool), 0)]  # reused by the next births of the type
+            self.store.remove([animal.slot for animal in despawns])
+            self.alive_sprites.remove(list(despawns))
+
+        for birth in spawns:
+            self.__handle_mating__(birth)
+
+        if self.telemetry is not None:
+            self.telemetry.record(self, spawns, despawns)
+
+    def __update_chunks__(self) -> None:
+        """Loads the chunks around all animals ahead of time and evicts idle chunks beyond the memory cap."""
+        store = self.store
+        active = store.active[: store.size]
+        size = self.map.chunk_size
+        occupied = set(
+            zip(
+                (store.x[: store.size][active] // size).tolist(),
+                (store.y[: store.size][active] // size).tolist(),
             )
-            exit(1)
-        animal.kill()  # removes sprite from all groups
+        )
+        self.map.evict(self.map.load_around(occupied))
 
     def __handle_mating__(self, genomes: list) -> None:
         """Handles the mating process based on the given genomes to create specific types of animals.
 
         Args:
-            genomes (list): List containing genetic information for mating.
+            genomes (list): List containing the type, position, genomes and parents of the new animal.
         """
         if genomes[0] == "herbi":
-            self.__make_herbivore__(genomes[1], genomes[2])
+            self.__make_herbivore__(genomes[1], genomes[2], genomes[3])
         elif genomes[0] == "carni":
-            self.__make_carnivore__(genomes[1], genomes[2])
+            self.__make_carnivore__(genomes[1], genomes[2], genomes[3])
         elif genomes[0] == "omni":
-            self.__make_omnivore__(genomes[1], genomes[2])
+            self.__make_omnivore__(genomes[1], genomes[2], genomes[3])
         else:  # this shouldn't happen
             print(
                 "Error: Animal of unknown type encountered during creation process. Exiting program."
             )
             exit(1)
 
-    def run(self, r_state: bool, t_state: bool) -> None:
-        """Runs the simulation, meaning this function updates the map, triggers the alive function of every animal and acts accordingly.
+    def run(self, r_state: bool, t_state: bool, full: bool = True) -> list:
+        """Runs the simulation, meaning this function updates the map and advances the world by one tick if it is triggered.
 
         Args:
             r_state (bool): The current run_state of the simulation. If the simulation is paused, this is False.
             t_state (bool): The current trigger of the simulation. If no event-trigger has happed in the current iteration, this is False.
+            full (bool, optional): Redraws everything if true, otherwise only what changed since the last frame. Defaults to True.
+
+        Returns:
+            list: the changed rectangles of the screen
         """
+        dirty = [] if self.headless else self.__update_graphics__(full)
+
+        if r_state and t_state:
+            self.step()
+        return dirty
 
-        self.__update_graphics__()
+    def step(self, n: int = 1) -> None:
+        """Advances the world by n ticks, triggering the alive function of every animal and acting accordingly.
 
-        if not (r_state and t_state):
-            return
+        Args:
+            n (int, optional): The number of ticks. Defaults to 1.
+        """
+        for _ in range(n):
+            self.__tick__()
+
+    def shutdown(self) -> None:
+        """Stops the path finding workers, writes the remaining telemetry and events and deletes the evicted chunks of a chunked
+        map, has to be called once the world isn't needed anymore."""
+        self.scheduler.shutdown()
+        if self.chunked:
+            self.map.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.events is not None:
+            self.events.close()
+
+    def __tick__(self) -> None:
+        """Simulates a single tick."""
+        self.ticks += 1
+
+        # aging and timers of all animals
+        self.store.begin_tick()
+
+        # the animals only emit births and deaths, the world doesn't change until all of them acted
         for animal in self.alive_sprites:
             value = animal.alive()
             # alive function returns either a boolean or a list if the animal mated
             if type(value) == bool:
-                # check if alive or dead
+                # herbivores return False if they got eaten
                 if not value:
-                    self.__remove_animal(animal)
+                    self.__despawn__(animal, CAUSES.index("predation"))
             else:
-                self.__handle_mating__(value)
+                self.store.mated[animal.slot] = True
+                self.commands.spawn(*value)
+
+        # eating, drinking, hunger and thirst of all animals
+        ate, drank = self.store.end_tick()
+        for animal in ate:
+            animal.food_found = False
+        for animal in drank:
+            animal.water_found = False
+
+        for animal, cause in zip(*self.store.deaths()):
+            self.__despawn__(animal, cause)
+
+        # all births and deaths at once, the decisions below already see the new population
+        self.__apply_commands__()
+
+        for animal in self.store.deciding():
+            if not animal.queued_movements and not self.scheduler.pending(animal):
+                animal.__resolve_needs__()
+
+        self.scheduler.flush()
+
+        if self.chunked:
+            self.__update_chunks__()
+
+        if self.events is not None:
+            self.events.end_tick(self)
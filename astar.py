@@ -1,74 +1,1033 @@
-import csv
-import sys
+import heapq
+from array import array
+import numpy as np
 from settings import *
-from queue import PriorityQueue
 
+MAX_CACHED_GRIDS = 8  # number of maps whose walkability grid is kept around
 
-def __manhatten_distance__(p1: tuple, p2: tuple) -> int:
-    """Calculates the manhatten distance between two points.
+# path finding modes
+FLAT = "flat"
+HIERARCHICAL = "hierarchical"
 
-    Args:
-        p1 (tuple): Point 1
-        p2 (tuple): Point 2
 
-    Returns:
-        int: calculated manhatten distance
+class PathGrid:
+    """Flat, integer indexed view of a map used by the A* engine.
+
+    The walkability mask is built once per map, every tile is addressed through its index y * width + x. The scratch arrays of
+    the search are reused between searches and invalidated through a search stamp, so no per-call allocation over the whole map occurs.
     """
-    x1, y1 = p1[0], p1[1]
-    x2, y2 = p2[0], p2[1]
 
-    return abs(x1 - x2) + abs(y1 - y2)
+    def __init__(self, grid: list) -> None:
+        """Builds the walkability mask and the scratch arrays for the given map.
 
-def __get_neighbors__(p: tuple, end: tuple, map: list) -> list:
-    """Returns all adjacent tiles from a point which can be moved on. For this the function checks the map array if the entry to the corresponding tile is a valid move destination. (i.e. not water)
+        Args:
+            grid (list): the map
+        """
+        self.grid = grid  # keeps the map alive so its id can't be reused while cached
+        self.height = len(grid)
+        self.width = len(grid[0]) if self.height else 0
+        size = self.width * self.height
 
-    Args:
-        p (tuple): point to check for neighboring tiles from
-        end (tuple): end point of the A* algorithm
-        map (list): the stored map
+        self.walkable = bytearray((np.asarray(grid) != WATER).tobytes())
 
-    Returns:
-        list: contains all valid neighboring tiles
+        # connected components of land (walkable) and water tiles
+        self.land_region = None
+        self.water_body = None
+        self.__label_components__()
+
+        # scratch arrays of the search
+        self.score_g = [0] * size
+        self.came_from = [-1] * size
+        self.seen = [0] * size  # score_g/came_from entry is valid if it equals the current search stamp
+        self.opened = [0] * size  # tile is in the open set if it equals the current search stamp
+        self.search = 0
+        self.nodes_searched = 0  # number of tiles added to the open set over all searches
+        self.version = 0  # increases whenever the walkability of a tile changes
+        self.hierarchy = None  # abstract graph, only used in hierarchical mode
+
+    def update_tile(self, x: int, y: int) -> None:
+        """Re-reads a single tile from the map after it has been changed. The component labels get recomputed on their next use.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+        """
+        walkable = 0 if self.grid[y][x] == WATER else 1
+        if self.walkable[y * self.width + x] != walkable:
+            self.walkable[y * self.width + x] = walkable
+            self.land_region = None
+            self.water_body = None
+            self.version += 1
+            if self.hierarchy is not None:
+                self.hierarchy.update_tile(x, y)
+
+    def __label_components__(self) -> None:
+        """Labels the 4-connected components of land and water tiles. Land regions and water bodies are numbered separately
+        starting from 1 in the order of their first tile, tiles of the other kind are labelled 0.
+
+        Every tile starts as its own component, neighboring tiles of the same kind are merged by hooking the larger component
+        onto the smaller one, followed by pointer jumping until every tile points to the first tile of its component. Only
+        neighbors which are still in different components take part in the next round, so the rounds quickly get cheap."""
+        width, height = self.width, self.height
+        size = width * height
+        walkable = np.frombuffer(self.walkable, dtype=np.uint8).reshape(height, width)
+        indices = np.arange(size, dtype=np.int64).reshape(height, width)
+
+        same_right = walkable[:, :-1] == walkable[:, 1:]
+        same_below = walkable[:-1] == walkable[1:]
+        a = np.concatenate((indices[:, :-1][same_right], indices[:-1][same_below]))
+        b = np.concatenate((indices[:, 1:][same_right], indices[1:][same_below]))
+
+        parent = np.arange(size, dtype=np.int64)
+        while len(a):
+            parent_a, parent_b = parent[a], parent[b]
+            apart = parent_a != parent_b
+            a, b = a[apart], b[apart]
+            if not len(a):
+                break
+            parent_a, parent_b = parent_a[apart], parent_b[apart]
+            np.minimum.at(
+                parent, np.maximum(parent_a, parent_b), np.minimum(parent_a, parent_b)
+            )
+            while True:
+                jumped = parent[parent]
+                if (jumped == parent).all():
+                    break
+                parent = jumped
+
+        # the first tile of every component is its root, numbering the roots in order numbers the components by first tile
+        land = walkable.reshape(-1).astype(bool)
+        self.land_region = array("i", bytes(4 * size))
+        self.water_body = array("i", bytes(4 * size))
+        for labels, members in ((self.land_region, land), (self.water_body, ~land)):
+            _, numbers = np.unique(parent[members], return_inverse=True)
+            np.frombuffer(labels, dtype=np.intc)[members] = numbers.reshape(-1) + 1
+
+    def __regions_around__(self, i: int) -> set:
+        """Returns the land regions a tile belongs to. Water tiles (which can be the start or end of a path) belong to all
+        land regions bordering them.
+
+        Args:
+            i (int): index of the tile
+
+        Returns:
+            set: labels of the land regions
+        """
+        if self.walkable[i]:
+            return {self.land_region[i]}
+
+        width = self.width
+        x = i % width
+        regions = set()
+        if i >= width:
+            regions.add(self.land_region[i - width])
+        if x != width - 1:
+            regions.add(self.land_region[i + 1])
+        if i < (self.height - 1) * width:
+            regions.add(self.land_region[i + width])
+        if x != 0:
+            regions.add(self.land_region[i - 1])
+        regions.discard(0)
+        return regions
+
+    def reachable(self, start: tuple, end: tuple) -> bool:
+        """Checks in constant time if a path between two points exists, using the land region labels.
+
+        Args:
+            start (tuple): start point
+            end (tuple): end point
+
+        Returns:
+            bool: true if a path exists, else false
+        """
+        if self.land_region is None:
+            self.__label_components__()
+
+        if abs(start[0] - end[0]) + abs(start[1] - end[1]) <= 1:
+            return True
+
+        width = self.width
+        return not self.__regions_around__(start[1] * width + start[0]).isdisjoint(
+            self.__regions_around__(end[1] * width + end[0])
+        )
+
+    def __next_stamp__(self) -> int:
+        """Returns a fresh search stamp, resetting the scratch arrays if the stamps ever wrap around.
+
+        Returns:
+            int: the stamp of the new search
+        """
+        self.search += 1
+        if self.search >= 2**62:
+            size = self.width * self.height
+            self.seen = [0] * size
+            self.opened = [0] * size
+            self.search = 1
+        return self.search
+
+    def find_path(self, start: tuple, end: tuple) -> list:
+        """A* algorithm on the flat grid. Tie breaking and neighbor order match the original dictionary based implementation,
+        so both return identical paths.
+
+        Args:
+            start (tuple): start point
+            end (tuple): end point
+
+        Returns:
+            list: list containing the path, if none was found an empty one is returned
+        """
+        if start == end:
+            return [end]
+
+        width, height = self.width, self.height
+        walkable = self.walkable
+        score_g = self.score_g
+        came_from = self.came_from
+        seen = self.seen
+        opened = self.opened
+        stamp = self.__next_stamp__()
+
+        ex, ey = end
+        start_index = start[1] * width + start[0]
+        end_index = ey * width + ex
+        last_row = (height - 1) * width
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        count = 0
+        open_set = [(0, count, start_index)]
+        score_g[start_index] = 0
+        seen[start_index] = stamp
+        opened[start_index] = stamp
+
+        while open_set:
+            current = heappop(open_set)[2]
+            opened[current] = 0
+
+            if current == end_index:
+                self.nodes_searched += count + 1
+                return self.__reconstruct_path__(start_index, end_index)
+
+            g = score_g[current] + 1
+            cx = current % width
+
+            # neighbors in the order up, right, down, left
+            if current >= width:
+                neighbors = (current - width,)
+            else:
+                neighbors = ()
+            if cx != width - 1:
+                neighbors += (current + 1,)
+            if current < last_row:
+                neighbors += (current + width,)
+            if cx != 0:
+                neighbors += (current - 1,)
+
+            for neighbor in neighbors:
+                if not walkable[neighbor] and neighbor != end_index:
+                    continue
+                if seen[neighbor] == stamp and g >= score_g[neighbor]:
+                    continue
+
+                came_from[neighbor] = current
+                score_g[neighbor] = g
+                seen[neighbor] = stamp
+
+                if opened[neighbor] != stamp:
+                    count += 1
+                    heappush(
+                        open_set,
+                        (
+                            g + abs(neighbor % width - ex) + abs(neighbor // width - ey),
+                            count,
+                            neighbor,
+                        ),
+                    )
+                    opened[neighbor] = stamp
+
+        self.nodes_searched += count + 1
+        return []
+
+    def __reconstruct_path__(self, start_index: int, current: int) -> list:
+        """Retraces the steps of the A* algorithm and constructs the path taken to the end point.
+
+        Args:
+            start_index (int): index of the start point
+            current (int): index of the end point
+
+        Returns:
+            list: the reconstructed path, excluding the start and including the end point
+        """
+        width = self.width
+        came_from = self.came_from
+        retlist = []
+        while current != start_index:
+            retlist.append((current % width, current // width))
+            current = came_from[current]
+
+        retlist.reverse()
+        return retlist
+
+
+class LazyPathGrid:
+    """A* engine for maps which are too large to be flattened, i.e. the maps of chunked worlds.
+
+    Tiles are read through grid[y, x] only once the search reaches them and the state of the search is kept in dictionaries.
+    Without region labels every goal is considered reachable, so a search gives up after max_nodes tiles instead of exhausting
+    the whole map.
+    """
+
+    hierarchy = None  # always searches flat
+
+    def __init__(self, grid, max_nodes: int = LAZY_SEARCH_NODES) -> None:
+        """Initializes the engine for the given map.
+
+        Args:
+            grid: the map, has to support len() and grid[y, x]
+            max_nodes (int, optional): number of tiles a search may add to its open set. Defaults to LAZY_SEARCH_NODES.
+        """
+        self.grid = grid
+        self.height = self.width = len(grid)
+        self.max_nodes = max_nodes
+        self.nodes_searched = 0
+        self.version = 0
+
+    def update_tile(self, x: int, y: int) -> None:
+        """Nothing is cached, so a changed tile only bumps the version.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+        """
+        self.version += 1
+
+    def reachable(self, start: tuple, end: tuple) -> bool:
+        """Without region labels every goal is assumed to be reachable.
+
+        Args:
+            start (tuple): start point
+            end (tuple): end point
+
+        Returns:
+            bool: always true
+        """
+        return True
+
+    def find_path(self, start: tuple, end: tuple) -> list:
+        """A* algorithm reading the map on demand, with the same neighbor order and tie breaking as the flat grid.
+
+        Args:
+            start (tuple): start point
+            end (tuple): end point
+
+        Returns:
+            list: list containing the path, if none was found within max_nodes tiles an empty one is returned
+        """
+        if start == end:
+            return [end]
+
+        grid = self.grid
+        width, height = self.width, self.height
+        ex, ey = end
+        start_index = start[1] * width + start[0]
+        end_index = ey * width + ex
+        last_row = (height - 1) * width
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        count = 0
+        open_set = [(0, count, start_index)]
+        score_g = {start_index: 0}
+        came_from = {}
+        opened = {start_index}
+
+        while open_set and count < self.max_nodes:
+            current = heappop(open_set)[2]
+            opened.discard(current)
+
+            if current == end_index:
+                self.nodes_searched += count + 1
+                retlist = []
+                while current != start_index:
+                    retlist.append((current % width, current // width))
+                    current = came_from[current]
+                retlist.reverse()
+                return retlist
+
+            g = score_g[current] + 1
+            cx = current % width
+
+            # neighbors in the order up, right, down, left
+            if current >= width:
+                neighbors = (current - width,)
+            else:
+                neighbors = ()
+            if cx != width - 1:
+                neighbors += (current + 1,)
+            if current < last_row:
+                neighbors += (current + width,)
+            if cx != 0:
+                neighbors += (current - 1,)
+
+            for neighbor in neighbors:
+                if g >= score_g.get(neighbor, g + 1):
+                    continue
+                if neighbor != end_index and grid[neighbor // width, neighbor % width] == WATER:
+                    continue
+
+                came_from[neighbor] = current
+                score_g[neighbor] = g
+
+                if neighbor not in opened:
+                    count += 1
+                    heappush(
+                        open_set,
+                        (
+                            g + abs(neighbor % width - ex) + abs(neighbor // width - ey),
+                            count,
+                            neighbor,
+                        ),
+                    )
+                    opened.add(neighbor)
+
+        self.nodes_searched += count + 1
+        return []
+
+
+class PursuitPlanner:
+    """Persistent planner for an animal pursuing a moving target (Fringe-Retrieving A*).
+
+    The planner keeps its A* search tree between calls. When the pursuer moved along the previous path, the tree is re-rooted at
+    its new position: the subtree below the new root keeps its (still optimal) scores, everything else gets dropped and the open
+    set is rebuilt from the fringe of the remaining tree. The search then continues towards the new target position, so most of
+    the work of earlier searches is reused instead of starting over.
+    """
+
+    def __init__(self, grid: list) -> None:
+        """Initializes an empty planner for the given map.
+
+        Args:
+            grid (list): the map
+        """
+        self.path_grid = get_path_grid(grid)
+        self.version = self.path_grid.version
+        self.root = None
+        self.goal = None
+        self.score_g = {}  # tile index -> distance from the root
+        self.came_from = {}
+        self.closed = set()
+
+    def __reset__(self, root: int) -> None:
+        """Drops the search tree and starts a new one at the given root.
+
+        Args:
+            root (int): index of the new root
+        """
+        self.root = root
+        self.score_g = {root: 0}
+        self.came_from = {}
+        self.closed = {root}
+        self.version = self.path_grid.version
+
+    def __reroot__(self, root: int) -> None:
+        """Keeps only the subtree below the given (closed) tile and makes it the new root.
+
+        Args:
+            root (int): index of the new root
+        """
+        came_from = self.came_from
+        in_subtree = {root: True, self.root: False}
+        for node in self.closed:
+            trail = []
+            while node not in in_subtree:
+                trail.append(node)
+                node = came_from[node]
+            result = in_subtree[node]
+            for entry in trail:
+                in_subtree[entry] = result
+
+        offset = self.score_g[root]
+        self.closed = {node for node in self.closed if in_subtree[node]}
+        self.score_g = {node: self.score_g[node] - offset for node in self.closed}
+        self.came_from = {
+            node: came_from[node] for node in self.closed if node != root
+        }
+        self.root = root
+
+    def plan(self, start: tuple, end: tuple) -> list:
+        """Finds a path from the current position of the pursuer to the current position of its target.
+
+        Args:
+            start (tuple): current position of the pursuer
+            end (tuple): current position of the target
+
+        Returns:
+            list: list containing the path, if none was found an empty one is returned
+        """
+        if start == end:
+            return [end]
+
+        path_grid = self.path_grid
+        if not path_grid.reachable(start, end):
+            return []
+
+        width, height = path_grid.width, path_grid.height
+        walkable = path_grid.walkable
+        start_index = start[1] * width + start[0]
+        end_index = end[1] * width + end[0]
+
+        if (
+            self.root is None
+            or self.version != path_grid.version
+            or start_index not in self.closed
+            or not walkable[start_index]
+        ):
+            self.__reset__(start_index)
+        elif start_index != self.root:
+            self.__reroot__(start_index)
+
+        closed = self.closed
+        score_g = self.score_g
+        came_from = self.came_from
+
+        if self.goal != end_index:
+            # water tiles are only part of the tree while they are the target
+            for node in [node for node in closed if not walkable[node]]:
+                if node != self.root and node != end_index:
+                    closed.discard(node)
+                    score_g.pop(node)
+                    came_from.pop(node)
+            self.goal = end_index
+
+        if end_index in closed:
+            return self.__reconstruct_path__(end_index)
+
+        ex, ey = end
+        last_row = (height - 1) * width
+
+        def neighbors(current: int) -> tuple:
+            cx = current % width
+            retlist = ()
+            if current >= width:
+                retlist += (current - width,)
+            if cx != width - 1:
+                retlist += (current + 1,)
+            if current < last_row:
+                retlist += (current + width,)
+            if cx != 0:
+                retlist += (current - 1,)
+            return retlist
+
+        # rebuild the open set from the fringe of the retained tree
+        open_g = {}
+        for node in closed:
+            if not walkable[node] and node != self.root:
+                continue
+            g = score_g[node] + 1
+            for neighbor in neighbors(node):
+                if neighbor in closed or not (walkable[neighbor] or neighbor == end_index):
+                    continue
+                if g < open_g.get(neighbor, g + 1):
+                    open_g[neighbor] = g
+                    came_from[neighbor] = node
+
+        count = 0
+        open_set = []
+        for node, g in open_g.items():
+            count += 1
+            open_set.append(
+                (g + abs(node % width - ex) + abs(node // width - ey), count, node)
+            )
+        heapq.heapify(open_set)
+
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        while open_set:
+            current = heappop(open_set)[2]
+            if current in closed:
+                continue  # outdated entry
+            closed.add(current)
+            score_g[current] = g = open_g.pop(current)
+
+            if current == end_index:
+                return self.__reconstruct_path__(end_index)
+
+            g += 1
+            for neighbor in neighbors(current):
+                if neighbor in closed or not (walkable[neighbor] or neighbor == end_index):
+                    continue
+                if g < open_g.get(neighbor, g + 1):
+                    open_g[neighbor] = g
+                    came_from[neighbor] = current
+                    count += 1
+                    heappush(
+                        open_set,
+                        (
+                            g + abs(neighbor % width - ex) + abs(neighbor // width - ey),
+                            count,
+                            neighbor,
+                        ),
+                    )
+
+        return []
+
+    def __reconstruct_path__(self, current: int) -> list:
+        """Retraces the search tree from a tile back to the root.
+
+        Args:
+            current (int): index of the end point
+
+        Returns:
+            list: the reconstructed path, excluding the root and including the end point
+        """
+        width = self.path_grid.width
+        retlist = []
+        while current != self.root:
+            retlist.append((current % width, current // width))
+            current = self.came_from[current]
+
+        retlist.reverse()
+        return retlist
+
+
+class HierarchicalGraph:
+    """Hierarchical path finding (HPA*) on top of a flat grid.
+
+    The map gets split into square clusters. Wherever two neighboring clusters share walkable border tiles, transition tiles
+    (entrances) are placed on both sides of the border. Together with the walking distances between the entrances of a cluster
+    these form an abstract graph. Long queries are answered with an A* search on this graph, whose result is then refined into
+    a tile path with short searches inside the single clusters.
     """
-    up = (p[0], p[1] - 1)
-    right = (p[0] + 1, p[1])
-    down = (p[0], p[1] + 1)
-    left = (p[0] - 1, p[1])
 
-    neighbors = []
+    def __init__(self, path_grid: PathGrid, cluster_size: int) -> None:
+        """Splits the map into clusters and places the entrances between them.
+
+        Args:
+            path_grid (PathGrid): the flat grid of the map
+            cluster_size (int): length/height of a cluster in tiles
+        """
+        self.path_grid = path_grid
+        self.cluster_size = cluster_size
+        self.columns = -(-path_grid.width // cluster_size)
+        self.rows = -(-path_grid.height // cluster_size)
+
+        self.borders = {}  # (cluster, cluster) -> list of (tile, tile) transitions
+        self.nodes = {}  # cluster -> set of its entrance tiles
+        self.transitions = {}  # entrance tile -> entrance tiles on the other side of the border
+        self.intra = {}  # cluster -> {entrance: [(entrance, cost)]}, None until needed
+        self.dirty = set(range(self.columns * self.rows))
+        self.__refresh__()
+
+    def __cluster__(self, i: int) -> int:
+        """Returns the cluster a tile belongs to.
+
+        Args:
+            i (int): index of the tile
+
+        Returns:
+            int: the cluster
+        """
+        width, size = self.path_grid.width, self.cluster_size
+        return ((i // width) // size) * self.columns + (i % width) // size
+
+    def __bounds__(self, cluster: int) -> tuple:
+        """Returns the tile bounds of a cluster.
+
+        Args:
+            cluster (int): the cluster
+
+        Returns:
+            tuple: (x0, y0, x1, y1), the upper bounds being exclusive
+        """
+        size = self.cluster_size
+        cx, cy = cluster % self.columns, cluster // self.columns
+        return (
+            cx * size,
+            cy * size,
+            min((cx + 1) * size, self.path_grid.width),
+            min((cy + 1) * size, self.path_grid.height),
+        )
+
+    def __neighbor_clusters__(self, cluster: int) -> list:
+        """Returns the clusters bordering a cluster.
+
+        Args:
+            cluster (int): the cluster
+
+        Returns:
+            list: the neighboring clusters
+        """
+        cx, cy = cluster % self.columns, cluster // self.columns
+        return [
+            (y * self.columns + x)
+            for x, y in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy))
+            if 0 <= x < self.columns and 0 <= y < self.rows
+        ]
+
+    def __build_border__(self, first: int, second: int) -> None:
+        """Places the transitions on the border between two neighboring clusters. Every run of tiles which are walkable on both
+        sides gets one transition in its middle, longer runs get one at each end.
+
+        Args:
+            first (int): the left or upper cluster
+            second (int): the right or lower cluster
+        """
+        width = self.path_grid.width
+        walkable = self.path_grid.walkable
+        x0, y0, x1, y1 = self.__bounds__(first)
+        if second == first + 1:  # vertical border, first is left of second
+            pairs = [(y * width + x1 - 1, y * width + x1) for y in range(y0, y1)]
+        else:  # horizontal border, first is above second
+            pairs = [((y1 - 1) * width + x, y1 * width + x) for x in range(x0, x1)]
 
-    if p[1] != 0 and (map[up[1]][up[0]] != 5.0 or up == end):
-        neighbors.append(up)
-    if p[0] != (MAPSIZE-1) and (map[right[1]][right[0]] != 5.0 or right == end):
-        neighbors.append(right)
-    if p[1] != (MAPSIZE-1) and (map[down[1]][down[0]] != 5.0 or down == end):
-        neighbors.append(down)
-    if p[0] != 0 and (map[left[1]][left[0]] != 5.0 or left == end):
-        neighbors.append(left)
+        transitions = []
+        run = []
+        for pair in pairs + [None]:
+            if pair is not None and walkable[pair[0]] and walkable[pair[1]]:
+                run.append(pair)
+                continue
+            if len(run) >= 6:
+                transitions += [run[0], run[-1]]
+            elif run:
+                transitions.append(run[len(run) // 2])
+            run = []
+        self.borders[(first, second)] = transitions
+
+    def update_tile(self, x: int, y: int) -> None:
+        """Marks the cluster of a tile whose walkability changed, it gets rebuilt before the next query.
+
+        Args:
+            x (int): The x-coordinate of the tile.
+            y (int): The y-coordinate of the tile.
+        """
+        self.dirty.add(self.__cluster__(y * self.path_grid.width + x))
+
+    def __refresh__(self) -> None:
+        """Rebuilds the borders of all dirty clusters and invalidates the intra-cluster costs of them and their neighbors."""
+        if not self.dirty:
+            return
+
+        affected = set(self.dirty)
+        for cluster in self.dirty:
+            for neighbor in self.__neighbor_clusters__(cluster):
+                affected.add(neighbor)
+                self.__build_border__(min(cluster, neighbor), max(cluster, neighbor))
+
+        for cluster in affected:
+            nodes = set()
+            for neighbor in self.__neighbor_clusters__(cluster):
+                border = self.borders.get((min(cluster, neighbor), max(cluster, neighbor)), [])
+                side = 0 if cluster < neighbor else 1
+                for pair in border:
+                    nodes.add(pair[side])
+            for node in self.nodes.get(cluster, ()):
+                self.transitions.pop(node, None)
+            self.nodes[cluster] = nodes
+            self.intra[cluster] = None
+
+        for cluster in affected:
+            for neighbor in self.__neighbor_clusters__(cluster):
+                first, second = min(cluster, neighbor), max(cluster, neighbor)
+                side = 0 if cluster < neighbor else 1
+                for pair in self.borders.get((first, second), []):
+                    self.transitions.setdefault(pair[side], set()).add(pair[1 - side])
+
+        self.dirty = set()
+
+    def __cluster_distances__(self, source: int, end: int = -1) -> dict:
+        """Breadth-first search restricted to the cluster of the source tile.
+
+        Args:
+            source (int): index of the tile the search starts from, may be a non-walkable end point
+            end (int, optional): index of a non-walkable tile which may be entered anyway. Defaults to -1.
+
+        Returns:
+            dict: tile index -> walking distance from the source
+        """
+        width = self.path_grid.width
+        walkable = self.path_grid.walkable
+        x0, y0, x1, y1 = self.__bounds__(self.__cluster__(source))
+
+        distances = {source: 0}
+        queue = [source]
+        for current in queue:
+            d = distances[current] + 1
+            cx, cy = current % width, current // width
+            for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * width + nx
+                if neighbor not in distances and (walkable[neighbor] or neighbor == end):
+                    distances[neighbor] = d
+                    if walkable[neighbor]:
+                        queue.append(neighbor)
+        return distances
+
+    def __intra_edges__(self, cluster: int) -> dict:
+        """Returns the walking distances between all entrances of a cluster, computing them on first use.
+
+        Args:
+            cluster (int): the cluster
+
+        Returns:
+            dict: entrance -> list of (entrance, cost) reachable inside the cluster
+        """
+        edges = self.intra[cluster]
+        if edges is not None:
+            return edges
+
+        width = self.path_grid.width
+        walkable = self.path_grid.walkable
+        x0, y0, x1, y1 = self.__bounds__(cluster)
+        local_width = x1 - x0
+        size = local_width * (y1 - y0)
+
+        # adjacency of the walkable tiles inside the cluster, using local indices
+        adjacency = [()] * size
+        for local in range(size):
+            lx, ly = local % local_width, local // local_width
+            if not walkable[(y0 + ly) * width + x0 + lx]:
+                continue
+            adjacency[local] = tuple(
+                n
+                for n, valid in (
+                    (local - local_width, ly > 0),
+                    (local + 1, lx < local_width - 1),
+                    (local + local_width, local + local_width < size),
+                    (local - 1, lx > 0),
+                )
+                if valid and walkable[(y0 + n // local_width) * width + x0 + n % local_width]
+            )
+
+        nodes = [
+            (node, (node // width - y0) * local_width + node % width - x0)
+            for node in self.nodes[cluster]
+        ]
+        edges = {}
+        for node, local in nodes:
+            distances = [-1] * size
+            distances[local] = 0
+            queue = [local]
+            for current in queue:
+                d = distances[current] + 1
+                for neighbor in adjacency[current]:
+                    if distances[neighbor] < 0:
+                        distances[neighbor] = d
+                        queue.append(neighbor)
+            edges[node] = [
+                (other, distances[other_local])
+                for other, other_local in nodes
+                if other != node and distances[other_local] > 0
+            ]
+
+        self.intra[cluster] = edges
+        return edges
+
+    def __local_path__(self, start: int, end: int) -> list:
+        """A* search restricted to the cluster of the start tile.
+
+        Args:
+            start (int): index of the start tile
+            end (int): index of the end tile, which has to be inside the same cluster
+
+        Returns:
+            list: the path as tile coordinates, excluding the start and including the end point
+        """
+        width = self.path_grid.width
+        walkable = self.path_grid.walkable
+        x0, y0, x1, y1 = self.__bounds__(self.__cluster__(start))
+        ex, ey = end % width, end // width
+
+        score_g = {start: 0}
+        came_from = {}
+        count = 0
+        open_set = [(0, count, start)]
+        while open_set:
+            current = heapq.heappop(open_set)[2]
+            if current == end:
+                break
+            g = score_g[current] + 1
+            cx, cy = current % width, current // width
+            for nx, ny in ((cx, cy - 1), (cx + 1, cy), (cx, cy + 1), (cx - 1, cy)):
+                if not (x0 <= nx < x1 and y0 <= ny < y1):
+                    continue
+                neighbor = ny * width + nx
+                if not (walkable[neighbor] or neighbor == end):
+                    continue
+                if g < score_g.get(neighbor, g + 1):
+                    score_g[neighbor] = g
+                    came_from[neighbor] = current
+                    count += 1
+                    heapq.heappush(
+                        open_set, (g + abs(nx - ex) + abs(ny - ey), count, neighbor)
+                    )
+        else:
+            return []
 
-    return neighbors
+        retlist = []
+        current = end
+        while current != start:
+            retlist.append((current % width, current // width))
+            current = came_from[current]
+        retlist.reverse()
+        return retlist
 
-def __reconstruct_path__(came_from: dict, current: tuple) -> list:
-    """Retraces the steps of the A* algorithm and constructs the path taken to the end point.
+    def __abstract_path__(self, start: int, end: int) -> list:
+        """A* search on the abstract graph, with the start and end point temporarily connected to the entrances of their clusters.
+
+        Args:
+            start (int): index of the start tile
+            end (int): index of the end tile
+
+        Returns:
+            list: the tile indices of the abstract path, including start and end. Empty if none was found
+        """
+        width = self.path_grid.width
+        ex, ey = end % width, end // width
+
+        start_distances = self.__cluster_distances__(start)
+        start_edges = [
+            (node, start_distances[node])
+            for node in self.nodes[self.__cluster__(start)]
+            if node in start_distances and node != start
+        ]
+        # distances are symmetric, so a search from the end point gives the costs of the edges leading to it
+        end_distances = self.__cluster_distances__(end, end)
+        end_edges = {
+            node: end_distances[node]
+            for node in self.nodes[self.__cluster__(end)]
+            if node in end_distances and node != end
+        }
+
+        score_g = {start: 0}
+        came_from = {}
+        closed = set()
+        count = 0
+        open_set = [(0, count, start)]
+        while open_set:
+            current = heapq.heappop(open_set)[2]
+            if current in closed:
+                continue
+            if current == end:
+                retlist = [end]
+                while current != start:
+                    current = came_from[current]
+                    retlist.append(current)
+                retlist.reverse()
+                return retlist
+            closed.add(current)
+
+            g = score_g[current]
+            if current == start:
+                edges = start_edges + [
+                    (other, 1) for other in self.transitions.get(current, ())
+                ]
+            else:
+                edges = list(self.__intra_edges__(self.__cluster__(current))[current])
+                edges += [(other, 1) for other in self.transitions.get(current, ())]
+            if current in end_edges:
+                edges.append((end, end_edges[current]))
+
+            for neighbor, cost in edges:
+                if neighbor in closed:
+                    continue
+                new_g = g + cost
+                if new_g < score_g.get(neighbor, new_g + 1):
+                    score_g[neighbor] = new_g
+                    came_from[neighbor] = current
+                    count += 1
+                    heapq.heappush(
+                        open_set,
+                        (
+                            new_g + abs(neighbor % width - ex) + abs(neighbor // width - ey),
+                            count,
+                            neighbor,
+                        ),
+                    )
+        return []
+
+    def find_path(self, start: tuple, end: tuple) -> list:
+        """Finds a path using the abstract graph. Short queries, and the rare ones the abstract graph can't answer (i.e. a water
+        end point whose shore lies in another cluster), are handled by the flat search.
+
+        Args:
+            start (tuple): start point
+            end (tuple): end point
+
+        Returns:
+            list: list containing the path, if none was found an empty one is returned
+        """
+        if abs(start[0] - end[0]) + abs(start[1] - end[1]) <= 2 * self.cluster_size:
+            return self.path_grid.find_path(start, end)
+
+        self.__refresh__()
+        width = self.path_grid.width
+        start_index = start[1] * width + start[0]
+        end_index = end[1] * width + end[0]
+
+        abstract = self.__abstract_path__(start_index, end_index)
+        if not abstract:
+            return self.path_grid.find_path(start, end)
+
+        retlist = []
+        for current, following in zip(abstract, abstract[1:]):
+            if self.__cluster__(current) == self.__cluster__(following):
+                retlist += self.__local_path__(current, following)
+            else:
+                retlist.append((following % width, following // width))
+        return retlist
+
+
+__grids__ = {}
+
+
+def get_path_grid(grid: list) -> PathGrid:
+    """Returns the cached walkability grid of a map, building it on first use. Chunked maps return their LazyPathGrid instead.
 
     Args:
-        came_from (dict): dictionary containing tiles and the position from which they got accessed/moved on
-        current (tuple): the current position
+        grid (list): the map
 
     Returns:
-        list: the reconstructed path
+        PathGrid: the flat grid belonging to the map
+    """
+    if hasattr(grid, "path_grid"):
+        # chunked maps bring their own engine
+        return grid.path_grid
+
+    path_grid = __grids__.get(id(grid))
+    if path_grid is None or path_grid.grid is not grid:
+        if len(__grids__) >= MAX_CACHED_GRIDS:
+            __grids__.pop(next(iter(__grids__)))
+        path_grid = PathGrid(grid)
+        __grids__[id(grid)] = path_grid
+    return path_grid
+
+
+def update_tile(grid: list, x: int, y: int) -> None:
+    """Has to be called after a tile of a map changed, so a cached walkability grid stays in sync.
+
+    Args:
+        grid (list): the map
+        x (int): The x-coordinate of the changed tile.
+        y (int): The y-coordinate of the changed tile.
     """
-    retlist = []
-    endpoint = current
-    while current in came_from:
-        current = came_from[current]
-        retlist.append(current)
+    path_grid = __grids__.get(id(grid))
+    if path_grid is not None and path_grid.grid is grid:
+        path_grid.update_tile(x, y)
+
+
+def release_grid(grid: list) -> None:
+    """Drops the cached walkability grid of a map which is no longer in use.
 
-    retlist.reverse()
-    retlist.pop(0)
-    retlist.append(endpoint)
+    Args:
+        grid (list): the map
+    """
+    path_grid = __grids__.get(id(grid))
+    if path_grid is not None and path_grid.grid is grid:
+        __grids__.pop(id(grid))
 
-    return retlist
 
 def find_path(grid: list, start: tuple, end: tuple) -> list:
     """A* algorithm to find a path in a 2D grid
@@ -83,56 +1042,67 @@ def find_path(grid: list, start: tuple, end: tuple) -> list:
     """
     if start == end:
         return [end]
+    path_grid = get_path_grid(grid)
+    if not path_grid.reachable(start, end):
+        # different land regions, there is no need to exhaust the region of the start point
+        return []
+    if path_grid.hierarchy is not None:
+        return path_grid.hierarchy.find_path(start, end)
+    return path_grid.find_path(start, end)
 
-    count = 0
-    open_set = PriorityQueue()
-    open_set.put((0, count, start))
 
-    came_from = {}
+def set_mode(grid: list, mode: str, cluster_size: int = CLUSTERSIZE) -> None:
+    """Chooses how paths on a map are found. The flat search is the default, the hierarchical one pays off on large maps, at
+    the cost of slightly longer paths.
 
-    score_g = {
-        (col_index, row_index): float("inf")
-        for row_index, row in enumerate(grid)
-        for col_index, x in enumerate(row)
-    }
-    score_g[start] = 0
+    Args:
+        grid (list): the map
+        mode (str): either FLAT or HIERARCHICAL
+        cluster_size (int, optional): length/height of a cluster in hierarchical mode. Defaults to CLUSTERSIZE.
+    """
+    path_grid = get_path_grid(grid)
+    if mode == HIERARCHICAL:
+        path_grid.hierarchy = HierarchicalGraph(path_grid, cluster_size)
+    elif mode == FLAT:
+        path_grid.hierarchy = None
+    else:
+        raise ValueError(f"Unknown path finding mode: {mode}")
 
-    score_f = {
-        (col_index, row_index): float("inf")
-        for row_index, row in enumerate(grid)
-        for col_index, _ in enumerate(row)
-    }
-    score_f[start] = __manhatten_distance__(start, end)
 
-    open_set_hash = {start}
+def get_mode(grid: list) -> tuple:
+    """Returns how paths on a map are found, so another process can set up its copy of the map the same way.
+
+    Args:
+        grid (list): the map
 
-    while not open_set.empty():
-        current = open_set.get()[2]
-        open_set_hash.remove(current)
+    Returns:
+        tuple: the mode (FLAT or HIERARCHICAL) and the cluster size
+    """
+    hierarchy = getattr(get_path_grid(grid), "hierarchy", None)
+    if hierarchy is None:
+        return FLAT, CLUSTERSIZE
+    return HIERARCHICAL, hierarchy.cluster_size
 
-        if current == end:
-            return __reconstruct_path__(came_from, end)
 
-        for neighbor in __get_neighbors__(current, end, grid):
-            score_g_temp = score_g[current] + 1
+def reachable(grid: list, start: tuple, end: tuple) -> bool:
+    """Checks in constant time if a path between two points of a map exists.
 
-            if score_g_temp < score_g[neighbor]:
-                came_from[neighbor] = current
-                score_g[neighbor] = score_g_temp
-                score_f[neighbor] = score_g_temp + __manhatten_distance__(
-                    neighbor, end
-                )
+    Args:
+        grid (list): the map
+        start (tuple): start point
+        end (tuple): end point
 
-                if neighbor not in open_set_hash:
-                    count += 1
-                    open_set.put((score_f[neighbor], count, neighbor))
-                    open_set_hash.add(neighbor)
+    Returns:
+        bool: true if a path exists, else false
+    """
+    return get_path_grid(grid).reachable(start, end)
 
-    return []
 
 def __test__():
     """Test function to test the algorithm directly from the file."""
-    print("Test function currently unavailable.")
+    import benchmark
+
+    benchmark.bench_astar()
 
 
 if __name__ == "__main__":
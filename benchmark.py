@@ -0,0 +1,245 @@
+import random as rnd
+import time
+from queue import PriorityQueue
+import astar as ast
+import generator as gen
+
+
+def __legacy_find_path__(grid: list, start: tuple, end: tuple) -> list:
+    """The original dictionary based A* implementation, kept as reference for comparisons.
+
+    Args:
+        grid (list): the map
+        start (tuple): start point
+        end (tuple): end point
+
+    Returns:
+        list: list containing the path, if none was found an empty one is returned
+    """
+    if start == end:
+        return [end]
+
+    size = len(grid)
+
+    def neighbors(p: tuple) -> list:
+        up = (p[0], p[1] - 1)
+        right = (p[0] + 1, p[1])
+        down = (p[0], p[1] + 1)
+        left = (p[0] - 1, p[1])
+        retlist = []
+        if p[1] != 0 and (grid[up[1]][up[0]] != 5.0 or up == end):
+            retlist.append(up)
+        if p[0] != (size - 1) and (grid[right[1]][right[0]] != 5.0 or right == end):
+            retlist.append(right)
+        if p[1] != (size - 1) and (grid[down[1]][down[0]] != 5.0 or down == end):
+            retlist.append(down)
+        if p[0] != 0 and (grid[left[1]][left[0]] != 5.0 or left == end):
+            retlist.append(left)
+        return retlist
+
+    def distance(p1: tuple, p2: tuple) -> int:
+        return abs(p1[0] - p2[0]) + abs(p1[1] - p2[1])
+
+    count = 0
+    open_set = PriorityQueue()
+    open_set.put((0, count, start))
+    came_from = {}
+    score_g = {
+        (col_index, row_index): float("inf")
+        for row_index, row in enumerate(grid)
+        for col_index, _ in enumerate(row)
+    }
+    score_g[start] = 0
+    score_f = {
+        (col_index, row_index): float("inf")
+        for row_index, row in enumerate(grid)
+        for col_index, _ in enumerate(row)
+    }
+    score_f[start] = distance(start, end)
+    open_set_hash = {start}
+
+    while not open_set.empty():
+        current = open_set.get()[2]
+        open_set_hash.remove(current)
+
+        if current == end:
+            retlist = []
+            while current in came_from:
+                current = came_from[current]
+                retlist.append(current)
+            retlist.reverse()
+            retlist.pop(0)
+            retlist.append(end)
+            return retlist
+
+        for neighbor in neighbors(current):
+            score_g_temp = score_g[current] + 1
+            if score_g_temp < score_g[neighbor]:
+                came_from[neighbor] = current
+                score_g[neighbor] = score_g_temp
+                score_f[neighbor] = score_g_temp + distance(neighbor, end)
+                if neighbor not in open_set_hash:
+                    count += 1
+                    open_set.put((score_f[neighbor], count, neighbor))
+                    open_set_hash.add(neighbor)
+
+    return []
+
+
+def __random_map__(size: int, water: float, seed: int) -> list:
+    """Creates a map of the given size with randomly scattered water tiles.
+
+    Args:
+        size (int): length/height of the map
+        water (float): percentage of tiles which become water
+        seed (int): the random seed
+
+    Returns:
+        list: the map
+    """
+    r = rnd.Random(seed)
+    return [[5.0 if r.random() < water else 2.0 for _ in range(size)] for _ in range(size)]
+
+
+def __random_queries__(grid: list, n: int, seed: int) -> list:
+    """Picks random pairs of land tiles as start and end points.
+
+    Args:
+        grid (list): the map
+        n (int): number of queries
+        seed (int): the random seed
+
+    Returns:
+        list: contains (start, end) tuples
+    """
+    r = rnd.Random(seed)
+    land = [
+        (x, y) for y, row in enumerate(grid) for x, col in enumerate(row) if col != 5.0
+    ]
+    return [(r.choice(land), r.choice(land)) for _ in range(n)]
+
+
+def __time__(function, grid: list, queries: list) -> tuple:
+    """Runs all queries through a path finding function.
+
+    Returns:
+        tuple: the elapsed time in seconds and the found paths
+    """
+    t = time.perf_counter()
+    paths = [function(grid, start, end) for start, end in queries]
+    return time.perf_counter() - t, paths
+
+
+def bench_astar() -> None:
+    """Compares the flat A* engine against the original implementation on 50x50 and 500x500 maps."""
+    for size, n in ((50, 500), (500, 20)):
+        grid = __random_map__(size, 0.25, seed=size)
+        queries = __random_queries__(grid, n, seed=size)
+
+        ast.find_path(grid, *queries[0])  # builds the walkability grid once
+        legacy_time, legacy_paths = __time__(__legacy_find_path__, grid, queries)
+        new_time, new_paths = __time__(ast.find_path, grid, queries)
+
+        assert legacy_paths == new_paths, "flat A* returned a different path"
+        print(
+            f"A* {size}x{size}, {n} queries: legacy {legacy_time:.3f}s, "
+            f"flat {new_time:.3f}s, speedup {legacy_time / new_time:.1f}x"
+        )
+
+
+def __pursuit__(grid: list, seed: int, ticks: int, plan) -> float:
+    """Simulates a pursuit in which the target walks randomly and the pursuer replans every tick.
+
+    Args:
+        grid (list): the map
+        seed (int): the random seed for the start points and the movement of the target
+        ticks (int): number of ticks the pursuit lasts
+        plan: function (start, end) -> list used for the replanning
+
+    Returns:
+        float: the elapsed time in seconds
+    """
+    r = rnd.Random(seed)
+    size = len(grid)
+    start, end = __random_queries__(grid, 1, seed)[0]
+    elapsed = 0
+    for _ in range(ticks):
+        t = time.perf_counter()
+        path = plan(start, end)
+        elapsed += time.perf_counter() - t
+        if len(path) > 1:
+            start = path[0]
+        x, y = end
+        moves = [
+            (nx, ny)
+            for nx, ny in ((x, y - 1), (x + 1, y), (x, y + 1), (x - 1, y))
+            if 0 <= nx < size and 0 <= ny < size and grid[ny][nx] != 5.0
+        ]
+        if moves:
+            end = r.choice(moves)
+    return elapsed
+
+
+def bench_pursuit() -> None:
+    """Compares replanning a pursuit from scratch every tick against the persistent pursuit planner."""
+    for size, n in ((50, 50), (200, 10)):
+        grid = __random_map__(size, 0.25, seed=size)
+        fresh_time = planner_time = 0
+        for seed in range(n):
+            fresh_time += __pursuit__(
+                grid, seed, 40, lambda start, end: ast.find_path(grid, start, end)
+            )
+            planner_time += __pursuit__(grid, seed, 40, ast.PursuitPlanner(grid).plan)
+        print(
+            f"Pursuit {size}x{size}, {n} pursuits: fresh A* {fresh_time:.3f}s, "
+            f"planner {planner_time:.3f}s, speedup {fresh_time / planner_time:.1f}x"
+        )
+
+
+def bench_hierarchical() -> None:
+    """Compares the flat and the hierarchical search on long queries on a 1000x1000 map."""
+    size, n = 1000, 20
+    grid = __random_map__(size, 0.25, seed=size)
+    r = rnd.Random(size)
+    land = [(x, y) for y, row in enumerate(grid) for x, col in enumerate(row) if col != 5.0]
+    queries = []
+    while len(queries) < n:
+        start, end = r.choice(land), r.choice(land)
+        if abs(start[0] - end[0]) + abs(start[1] - end[1]) > size // 2:
+            queries.append((start, end))
+
+    ast.get_path_grid(grid)
+    flat_time, flat_paths = __time__(ast.find_path, grid, queries)
+
+    t = time.perf_counter()
+    ast.set_mode(grid, ast.HIERARCHICAL)
+    setup_time = time.perf_counter() - t
+    first_time, _ = __time__(ast.find_path, grid, queries)  # builds the intra-cluster costs
+    hierarchical_time, hierarchical_paths = __time__(ast.find_path, grid, queries)
+    ast.release_grid(grid)
+
+    overhead = sum(map(len, hierarchical_paths)) / sum(map(len, flat_paths)) - 1
+    print(
+        f"HPA* {size}x{size}, {n} long queries: flat {flat_time:.3f}s, "
+        f"hierarchical {hierarchical_time:.3f}s (setup {setup_time:.3f}s, first run {first_time:.3f}s), "
+        f"speedup {flat_time / hierarchical_time:.1f}x, paths {overhead:.1%} longer"
+    )
+
+
+def bench_generator() -> None:
+    """Measures the generation time and the memory of maps up to 4096x4096."""
+    for size in (50, 1024, 4096):
+        t = time.perf_counter()
+        grid = gen.generate_map(gseed=size, size=size)
+        elapsed = time.perf_counter() - t
+        print(
+            f"Map {size}x{size}: generated in {elapsed:.3f}s, {grid.nbytes / 2**20:.1f} MiB "
+            f"(float64 map: {grid.size * 8 / 2**20:.1f} MiB)"
+        )
+
+
+if __name__ == "__main__":
+    bench_astar()
+    bench_pursuit()
+    bench_hierarchical()
+    bench_generator()
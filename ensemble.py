@@ -0,0 +1,328 @@
+import argparse
+from ast import literal_eval
+import collections
+import itertools
+import json
+import multiprocessing as mp
+import os
+import sys
+import time
+import traceback
+import warnings
+import numpy as np
+import settings
+from settings import *
+from Animals.store import TYPES, GENOMES
+
+# the simulation modules copy the settings when they are imported, so they are only imported inside the worker processes once
+# the parameters of the run were applied
+
+
+def grid(seeds, parameters: dict = None) -> list:
+    """Builds the runs of an ensemble: every seed with every combination of parameter values.
+
+    Args:
+        seeds: the seeds of the worlds
+        parameters (dict, optional): name of a setting -> the values it takes. Defaults to none, the settings as they are.
+
+    Returns:
+        list: (seed, dict of the settings changed for the run) of every run
+    """
+    parameters = parameters or {}
+    for name in parameters:
+        if not hasattr(settings, name):
+            raise ValueError(f"Unknown setting {name!r}")
+    names = list(parameters)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*parameters.values())]
+    return [(seed, combination) for combination in combinations for seed in seeds]
+
+
+def __steady__(window: collections.deque, length: int, tolerance: float) -> bool:
+    """Checks whether the populations stopped changing: the average population of every species over the last window differs
+    from the one over the window before by less than the tolerance. Extinct species don't change anymore either.
+
+    Args:
+        window (collections.deque): the populations of the last two windows, one row per tick
+        length (int): ticks of a window
+        tolerance (float): relative change of the average population still counted as steady
+
+    Returns:
+        bool: true if every species is steady or extinct
+    """
+    populations = np.array(window, dtype=np.float64)
+    before = populations[:length].mean(axis=0)
+    after = populations[length:].mean(axis=0)
+    return bool((np.abs(after - before) <= tolerance * np.maximum(before, 1)).all())
+
+
+def run(
+    seed: int,
+    parameters: dict = None,
+    ticks: int = 10000,
+    sample_interval: int = ENSEMBLE_SAMPLE_INTERVAL,
+    window: int = STEADY_WINDOW,
+    tolerance: float = STEADY_TOLERANCE,
+    map_cache: str = MAP_CACHE_DIRECTORY,
+) -> dict:
+    """Runs a single world of an ensemble headless until every species is extinct or steady, or the tick limit is reached.
+    Has to run in a process of its own, the parameters change the settings of the whole process.
+
+    Args:
+        seed (int): the seed of the world
+        parameters (dict, optional): settings changed for this run. Defaults to none.
+        ticks (int, optional): ticks simulated at most. Defaults to 10000.
+        sample_interval (int, optional): ticks between two samples of the populations and genomes. Defaults to ENSEMBLE_SAMPLE_INTERVAL.
+        window (int, optional): ticks the populations are averaged over to detect a steady state, 0 never stops a run
+            early unless everything died. Defaults to STEADY_WINDOW.
+        tolerance (float, optional): relative change between two windows still counted as steady. Defaults to STEADY_TOLERANCE.
+        map_cache (str, optional): directory of the map cache, see mapcache.MapCache. Defaults to MAP_CACHE_DIRECTORY.
+
+    Returns:
+        dict: the summary of the run
+    """
+    parameters = parameters or {}
+    if parameters and "World.world" in sys.modules:
+        raise RuntimeError("The parameters of a run have to be applied before the simulation is imported")
+    for name, value in parameters.items():
+        setattr(settings, name, value)
+    from World.world import World
+    from World.telemetry import genome_statistics
+
+    summary = {"seed": seed, "parameters": parameters}
+    start = time.perf_counter()
+    try:
+        world = World(headless=True, telemetry=None, seed=seed, map_cache=map_cache)
+        populations = (world.herbis, world.carnis, world.omnis)
+        extinction = dict.fromkeys(TYPES)
+        samples = collections.defaultdict(list)
+        recent = collections.deque(maxlen=2 * window)
+        stopped = "limit"
+
+        while True:
+            counts = [len(population) for population in populations]
+            for type, count in zip(TYPES, counts):
+                if count == 0 and extinction[type] is None:
+                    extinction[type] = world.ticks
+            if world.ticks % sample_interval == 0:
+                samples["tick"].append(world.ticks)
+                statistics = genome_statistics(world.store, world.ticks)
+                for type, count in zip(TYPES, counts):
+                    samples[type + "s"].append(count)
+                    for genome in GENOMES:
+                        samples[f"{type}_{genome}"].append(float(statistics[f"{type}_{genome}_mean"]))
+
+            if not any(counts):
+                stopped = "extinct"
+                break
+            if window:
+                recent.append(counts)
+                if world.ticks % window == 0 and len(recent) == recent.maxlen:
+                    if __steady__(recent, window, tolerance):
+                        stopped = "steady"
+                        break
+            if world.ticks >= ticks:
+                break
+            world.step()
+
+        world.shutdown()
+        summary.update(
+            ticks=world.ticks,
+            stopped=stopped,
+            extinction=extinction,
+            final=dict(zip(TYPES, counts)),
+            samples=dict(samples),
+        )
+    except Exception:
+        # one broken run shouldn't take the whole ensemble down
+        summary.update(stopped="error", error=traceback.format_exc())
+    summary["seconds"] = time.perf_counter() - start
+    return summary
+
+
+def __run__(job: tuple) -> dict:
+    """Unpacks a job of the pool, see run_ensemble.
+
+    Args:
+        job (tuple): index of the run, seed, parameters and the keyword arguments of run
+
+    Returns:
+        dict: the summary of the run, with its index
+    """
+    index, seed, parameters, options = job
+    summary = run(seed, parameters, **options)
+    summary["run"] = index
+    return summary
+
+
+def run_ensemble(runs: list, workers: int = ENSEMBLE_WORKERS, **options):
+    """Runs the worlds of an ensemble in parallel, every run in a fresh process so the parameters of one run never leak into
+    the next.
+
+    Args:
+        runs (list): (seed, parameters) of every run, see grid
+        workers (int, optional): processes running worlds at the same time, 0 uses one per core. Defaults to ENSEMBLE_WORKERS.
+        **options: further arguments of run, the same for all runs
+
+    Yields:
+        dict: the summary of every run as soon as it finished, see run
+    """
+    workers = workers or os.cpu_count()
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # once per process is enough
+    jobs = [(i, seed, parameters, options) for i, (seed, parameters) in enumerate(runs)]
+    # spawned processes import the settings anew, forked ones would share the parent's
+    context = mp.get_context("spawn")
+    with context.Pool(min(workers, len(jobs)) or 1, maxtasksperchild=1) as pool:
+        yield from pool.imap_unordered(__run__, jobs)
+
+
+def aggregate(summaries: list) -> list:
+    """Combines the runs of an ensemble with the same parameters.
+
+    Args:
+        summaries (list): the summaries of the runs, see run
+
+    Returns:
+        list: one dict per set of parameters: the parameters, the number of runs and failed runs, per species the share of
+            runs it died out in and the mean and median tick it did, and the sampled populations and genome means averaged
+            over the runs which were still going at every sample tick
+    """
+    groups = collections.defaultdict(list)
+    for summary in summaries:
+        groups[json.dumps(summary["parameters"], sort_keys=True)].append(summary)
+
+    results = []
+    for key, group in groups.items():
+        finished = [summary for summary in group if summary["stopped"] != "error"]
+        result = {
+            "parameters": json.loads(key),
+            "runs": len(group),
+            "errors": len(group) - len(finished),
+        }
+        for type in TYPES:
+            ticks = [summary["extinction"][type] for summary in finished if summary["extinction"][type] is not None]
+            result[type + "_extinct"] = len(ticks) / len(finished) if finished else np.nan
+            result[type + "_extinction_mean"] = float(np.mean(ticks)) if ticks else np.nan
+            result[type + "_extinction_median"] = float(np.median(ticks)) if ticks else np.nan
+
+        # runs stopped at different ticks, the missing samples of the shorter ones are left out
+        longest = max(finished, key=lambda summary: len(summary["samples"]["tick"]), default=None)
+        if longest is not None:
+            result["tick"] = np.array(longest["samples"]["tick"])
+            for name in longest["samples"]:
+                if name == "tick":
+                    continue
+                values = np.full((len(finished), len(result["tick"])), np.nan)
+                for i, summary in enumerate(finished):
+                    sampled = summary["samples"][name]
+                    values[i, : len(sampled)] = sampled
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", RuntimeWarning)  # samples no run reached
+                    result[name] = np.nanmean(values, axis=0)
+        results.append(result)
+    return results
+
+
+def __seeds__(text: str) -> list:
+    """Parses the seeds given on the command line, either a range (start:stop) or a comma-separated list.
+
+    Args:
+        text (str): the argument
+
+    Returns:
+        list: the seeds
+    """
+    if ":" in text:
+        start, stop = text.split(":")
+        return list(range(int(start), int(stop)))
+    return [int(seed) for seed in text.split(",")]
+
+
+def __parameter__(text: str) -> tuple:
+    """Parses a parameter given on the command line, NAME=VALUE,VALUE,...
+
+    Args:
+        text (str): the argument
+
+    Returns:
+        tuple: the name of the setting and its values
+    """
+    name, values = text.split("=", 1)
+    return name, [literal_eval(value) for value in values.split(",")]
+
+
+def __describe__(summary: dict) -> str:
+    """Describes a finished run in one line.
+
+    Args:
+        summary (dict): the summary of the run
+
+    Returns:
+        str: the description
+    """
+    head = f"run {summary['run']} (seed {summary['seed']}, {summary['parameters'] or 'default settings'})"
+    if summary["stopped"] == "error":
+        return f"{head} failed:\n{summary['error']}"
+    extinct = ", ".join(f"{type} at {tick}" for type, tick in summary["extinction"].items() if tick is not None)
+    return (
+        f"{head}: {summary['stopped']} after {summary['ticks']} ticks in {summary['seconds']:.1f}s, "
+        f"died out: {extinct or 'none'}"
+    )
+
+
+def main() -> None:
+    """Runs an ensemble from the command line, prints every run as it finishes and the aggregated results at the end."""
+    parser = argparse.ArgumentParser(description="Runs many headless worlds in parallel")
+    parser.add_argument("--seeds", type=__seeds__, default=list(range(10)), help="seeds as start:stop or a,b,c")
+    parser.add_argument(
+        "--set",
+        type=__parameter__,
+        action="append",
+        default=[],
+        metavar="NAME=VALUES",
+        help="a setting and the comma-separated values it takes, every combination is run with every seed",
+    )
+    parser.add_argument("--ticks", type=int, default=10000, help="ticks a run lasts at most")
+    parser.add_argument("--workers", type=int, default=ENSEMBLE_WORKERS, help="parallel processes, 0 uses one per core")
+    parser.add_argument("--window", type=int, default=STEADY_WINDOW, help="ticks of the steady state window, 0 disables it")
+    parser.add_argument("--map-cache", default=MAP_CACHE_DIRECTORY, metavar="DIR", help="directory of the map cache")
+    parser.add_argument("--out", metavar="PATH", help="appends the summary of every run to this file as a line of JSON")
+    args = parser.parse_args()
+
+    runs = grid(args.seeds, dict(args.set))
+    out = open(args.out, "a") if args.out else None
+    summaries = []
+    t = time.perf_counter()
+    for summary in run_ensemble(
+        runs, args.workers, ticks=args.ticks, window=args.window, map_cache=args.map_cache
+    ):
+        summaries.append(summary)
+        print(__describe__(summary), flush=True)
+        if out is not None:
+            out.write(json.dumps(summary) + "\n")
+            out.flush()
+    if out is not None:
+        out.close()
+    print(f"{len(runs)} runs in {time.perf_counter() - t:.1f}s")
+
+    for result in aggregate(summaries):
+        print(f"\n{result['parameters'] or 'default settings'}: {result['runs']} runs, {result['errors']} failed")
+        for type in TYPES:
+            line = f"  {type}: died out in {result[type + '_extinct']:.0%} of the runs"
+            if result[type + "_extinct"]:
+                line += (
+                    f", after {result[type + '_extinction_mean']:.0f} ticks on average "
+                    f"(median {result[type + '_extinction_median']:.0f})"
+                )
+            print(line)
+        if "tick" in result:
+            for type in TYPES:
+                trajectory = ", ".join(
+                    f"{genome} {result[f'{type}_{genome}'][0]:.2f} -> {result[f'{type}_{genome}'][-1]:.2f}"
+                    for genome in GENOMES
+                    if genome.endswith("_d")
+                )
+                print(f"  {type} genomes: {trajectory}")
+
+
+if __name__ == "__main__":
+    main()
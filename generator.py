@@ -1,57 +1,54 @@
-import itertools
 import numpy as np
 import random as rnd
 import matplotlib.pyplot as plt
 from settings import *
 
 
-def __perlin__(x: np.ndarray, y: np.ndarray, seed: int = 0) -> list:
-    """Generates Perlin noise for given x and y coordinates.
+def __perlin__(x: np.ndarray, y: np.ndarray, seed: int = 0) -> tuple:
+    """Generates one octave of Perlin noise on the grid spanned by the given coordinates.
+
+    The noise lattice is much coarser than the map, so inside every lattice cell the noise is a sum of products of a function of
+    x and a function of y. The whole octave is returned as two factor matrices instead of the noise itself, their product is the
+    noise. This way a map only costs one matrix multiplication instead of a dozen full sized array operations per octave.
 
     Args:
-        x (numpy.ndarray): The x coordinates.
-        y (numpy.ndarray): The y coordinates.
+        x (numpy.ndarray): The x coordinates of the columns.
+        y (numpy.ndarray): The y coordinates of the rows.
         seed (int, optional): The random seed. Defaults to 0.
 
     Returns:
-        list: The generated Perlin noise values.
+        tuple: The left (rows x k) and right (k x columns) factor matrices of the generated Perlin noise values.
     """
-    np.random.seed(seed)
     p = np.arange(256, dtype=int)  # permutation array
-    np.random.shuffle(p)  # shuffle shuffle permutations
+    np.random.RandomState(seed).shuffle(p)  # shuffle shuffle permutations, without touching the global generator
     p = np.stack(
         [p, p]
     ).flatten()  # 2d array turned 1d for easy dot product interpolations
 
-    xg, yg = x.astype(int), y.astype(int)  # grid coords
+    xg, yg = np.floor(x).astype(int), np.floor(y).astype(int)  # grid coords
     xv, yv = x - xg, y - yg  # distance vector coords
-
-    # gradient vector coordinates top left, top right, bottom left, bottom right
-    tl = __gradient__(p[p[xg] + yg], xv, yv)
-    tr = __gradient__(p[p[xg] + yg + 1], xv, yv - 1)
-    bl = __gradient__(p[p[xg + 1] + yg + 1], xv - 1, yv - 1)
-    br = __gradient__(p[p[xg + 1] + yg], xv - 1, yv)
-
     f1, f2 = __fade__(xv), __fade__(yv)  # fade function
+    cells_x = np.arange(xg.min(), xg.max() + 1)
+    cells_y = np.arange(yg.min(), yg.max() + 1)
+    onehot_x = xg[:, None] == cells_x  # coordinate -> lattice cell
+    onehot_y = yg[:, None] == cells_y
 
-    # linear interpolation
-    x1 = __lerp__(tl, br, f1)
-    x2 = __lerp__(tr, bl, f1)
-    return __lerp__(x1, x2, f2)
+    left, right = [], []
+    # the corners top left, top right, bottom left, bottom right with their offsets and interpolation weights
+    for dx, dy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+        # hashes of the lattice cells, indexed [y][x], the lattice repeats after 256 cells
+        h = p[p[(cells_x[None, :] + dx) % 256] + (cells_y[:, None] + dy) % 256]
+        gx, gy = __gradient__(h)
+        wx = f1 if dx else 1 - f1  # linear interpolation weights
+        wy = f2 if dy else 1 - f2
 
+        # gradient x * (x - dx) * weight x * weight y + gradient y * (y - dy) * weight x * weight y
+        left.append((onehot_y * wy[:, None]) @ gx)
+        right.append((onehot_x * (wx * (xv - dx))[:, None]).T)
+        left.append((onehot_y * (wy * (yv - dy))[:, None]) @ gy)
+        right.append((onehot_x * wx[:, None]).T)
 
-def __lerp__(a: float, b: float, x: float) -> float:
-    """Linear interpolation.
-
-    Args:
-        a (float): The start value.
-        b (float): The end value.
-        x (float): The interpolation factor.
-
-    Returns:
-        float: The interpolated value.
-    """
-    return a + x * (b - a)
+    return np.hstack(left), np.vstack(right)
 
 
 def __fade__(t: float) -> float:
@@ -66,84 +63,222 @@ def __fade__(t: float) -> float:
     return 6 * t**5 - 15 * t**4 + 10 * t**3
 
 
-def __gradient__(h: int, x: float, y: float):
-    """Calculates the gradient vectors and the dot product.
+def __gradient__(h: np.ndarray) -> tuple:
+    """Picks the gradient vectors for the given hash values.
 
     Args:
-        h (int): The hash value.
-        x (float): The x coordinate.
-        y (float): The y coordinate.
+        h (numpy.ndarray): The hash values.
+
+    Returns:
+        tuple: The x and y components of the gradient vectors.
     """
     vectors = np.array([[0, 1], [0, -1], [1, 0], [-1, 0]])
     g = vectors[h % 4]
-    return g[:, :, 0] * x + g[:, :, 1] * y
+    return g[..., 0], g[..., 1]
 
 
-def generate_plot(gseed: int = None) -> list:
-    """Generates a plot of Perlin noise.
+def map_seeds(gseed: int = None, random=None) -> list:
+    """Picks the seeds a map is generated from, one per noise octave and one for placing the berries and animals. Together
+    with the size and the settings of the generator they decide the whole map.
 
     Args:
-        gseed (int, optional): The random seed in case a map needs to be recreated. Defaults to none.
+        gseed (int, optional): The random seed in case a map needs to be recreated, used for everything. Defaults to none.
+        random (random.Random, optional): Draws the seeds if no gseed is given, i.e. the map stream of a world. Defaults to the global generator.
 
     Returns:
-        list: The generated plot.
+        list: The seeds of the four octaves and of the placement.
     """
-    p = np.zeros((50, 50))
+    if gseed is not None:
+        return [gseed] * 5
+    return [(random or rnd).randint(0, 999999999) for _ in range(5)]
+
+
+def __factors__(seeds: list, size: int, dtype) -> tuple:
+    """Creates the factor matrices of all four octaves, scaled by their frequency and stacked, so their product is the noise-map.
+
+    Args:
+        seeds (list): The random seeds of the octaves, see map_seeds.
+        size (int): The length/height of the plot.
+        dtype: The float type of the matrices.
+
+    Returns:
+        tuple: The left and right factor matrices.
+    """
+    left, right = [], []
     for i in range(4):
         freq = 2**i
-        lin = np.linspace(0, freq, 50, endpoint=False)
-        x, y = np.meshgrid(lin, lin)
-        seed = rnd.randint(0, 999999999) if gseed is None else gseed
-        p = __perlin__(x, y, seed=seed) / freq + p
+        lin = np.linspace(0, freq, size, endpoint=False)
+        l, r = __perlin__(lin, lin, seed=seeds[i])
+        left.append(l / freq)
+        right.append(r)
+    return np.hstack(left).astype(dtype), np.vstack(right).astype(dtype)
+
+
+def __plot_tiles__(left: np.ndarray, right: np.ndarray, tile: int):
+    """Computes the noise-map tile by tile. Every tile is cut out of the same factor matrices, so neighboring tiles match up
+    seamlessly and the result doesn't depend on the tile size.
 
+    Args:
+        left (numpy.ndarray): The left factor matrix.
+        right (numpy.ndarray): The right factor matrix.
+        tile (int): The length/height of a tile.
+
+    Yields:
+        tuple: The y and x coordinates of the top left corner of the tile and the noise values of the tile.
+    """
+    size = len(left)
+    for y in range(0, size, tile):
+        for x in range(0, size, tile):
+            yield y, x, left[y : y + tile] @ right[:, x : x + tile]
+
+
+def __output__(out, size: int, dtype) -> np.ndarray:
+    """Creates the array results get written to.
+
+    Args:
+        out: None for an array in memory, a file name for a memory-mapped .npy file or an existing array.
+        size (int): The length/height of the array.
+        dtype: The data type of the array.
+
+    Returns:
+        numpy.ndarray: The array.
+    """
+    if out is None:
+        return np.empty((size, size), dtype=dtype)
+    if isinstance(out, str):
+        return np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=(size, size))
+    if out.shape != (size, size):
+        raise ValueError(f"Output array has shape {out.shape}, expected {(size, size)}")
+    return out
+
+
+def generate_plot(
+    gseed: int = None,
+    size: int = MAPSIZE,
+    dtype=np.float64,
+    out=None,
+    tile: int = NOISE_TILESIZE,
+) -> np.ndarray:
+    """Generates a plot of Perlin noise.
+
+    Args:
+        gseed (int, optional): The random seed in case a map needs to be recreated. Defaults to none.
+        size (int, optional): The length/height of the plot. Defaults to MAPSIZE.
+        dtype (optional): The float type of the plot, np.float32 halves the memory. Defaults to np.float64.
+        out (optional): File name of a memory-mapped .npy file or an array the plot gets written to. Defaults to none.
+        tile (int, optional): The length/height of the tiles the plot gets generated in. Defaults to NOISE_TILESIZE.
+
+    Returns:
+        numpy.ndarray: The generated plot.
+    """
+    left, right = __factors__(map_seeds(gseed), size, dtype)
+    p = __output__(out, size, dtype)
+    for y, x, noise in __plot_tiles__(left, right, tile):
+        p[y : y + tile, x : x + tile] = noise
     return p
 
 
-def generate_map(gseed: int = None) -> list:
-    """Generates a map using Perlin noise.
+def generate_map(
+    gseed: int = None,
+    size: int = MAPSIZE,
+    dtype=np.float64,
+    out=None,
+    tile: int = NOISE_TILESIZE,
+    random=None,
+    seeds: list = None,
+) -> np.ndarray:
+    """Generates a map using Perlin noise. Every tile holds one of the terrain codes from the settings. The noise is only ever
+    held one tile at a time, so together with a memory-mapped output huge maps can be generated.
 
     Args:
         gseed (int, optional): The random seed in case a map needs to be recreated. Defaults to none.
+        size (int, optional): The length/height of the map. Defaults to MAPSIZE.
+        dtype (optional): The float type used for the noise. Defaults to np.float64.
+        out (optional): File name of a memory-mapped .npy file or an array the map gets written to. Defaults to none.
+        tile (int, optional): The length/height of the tiles the noise gets generated in. Defaults to NOISE_TILESIZE.
+        random (random.Random, optional): Draws the seeds if no gseed is given, i.e. the map stream of a world. Defaults to the global generator.
+        seeds (list, optional): The seeds picked by map_seeds, replaces gseed and random. Defaults to none.
 
     Returns:
-        list: The generated map.
+        numpy.ndarray: The generated map.
     """
-    p = generate_plot(gseed)
-    randmap = np.zeros((50, 50))
-    land_tiles = []
-    for y, x in itertools.product(range(50), range(50)):
-        if -0.05 < p[y][x] < 0.4:
-            randmap[y][x] = 2.0
-            land_tiles.append((y, x))
-        else:
-            randmap[y][x] = 5.0
-    b_needed = int(len(land_tiles) * B_PERCENT)
-    h_needed = int(len(land_tiles) * H_PERCENT)
-    c_needed = int(len(land_tiles) * C_PERCENT)
-    o_needed = int(len(land_tiles) * O_PERCENT)
-    for _ in range(b_needed):
-        coord = rnd.choice(land_tiles)
-        land_tiles.remove(coord)
-        randmap[coord[0]][coord[1]] = 0.0
-
-    for _ in range(h_needed):
-        coord = rnd.choice(land_tiles)
-        land_tiles.remove(coord)
-        randmap[coord[0]][coord[1]] = 3.0
-
-    for _ in range(c_needed):
-        coord = rnd.choice(land_tiles)
-        land_tiles.remove(coord)
-        randmap[coord[0]][coord[1]] = 1.0
-
-    for _ in range(o_needed):
-        coord = rnd.choice(land_tiles)
-        land_tiles.remove(coord)
-        randmap[coord[0]][coord[1]] = 4.0
+    if seeds is None:
+        seeds = map_seeds(gseed, random)
+    left, right = __factors__(seeds, size, dtype)
+    randmap = __output__(out, size, np.uint8)
+    land_per_row = np.zeros(size, dtype=np.int64)
+    for y, x, noise in __plot_tiles__(left, right, tile):
+        land = (noise > LAND_MIN) & (noise < LAND_MAX)
+        block = randmap[y : y + tile, x : x + tile]
+        block[...] = WATER
+        block[land] = GRASS
+        land_per_row[y : y + tile] += land.sum(axis=1)
+
+    # berries and animals are placed on distinct land tiles, which are drawn uniformly from the whole map: first the number of
+    # tiles of every row, then the number of every category within the row and at last the tiles themselves
+    land_tiles = int(land_per_row.sum())
+    codes = np.array([BERRY, HERBI_SPAWN, CARNI_SPAWN, OMNI_SPAWN], dtype=np.uint8)
+    remaining = np.array(
+        [int(land_tiles * percent) for percent in (B_PERCENT, H_PERCENT, C_PERCENT, O_PERCENT)],
+        dtype=np.int64,
+    )
+    rng = np.random.default_rng(seeds[4])
+    needed_per_row = rng.multivariate_hypergeometric(land_per_row, remaining.sum())
+
+    for y in np.flatnonzero(needed_per_row):
+        needed = needed_per_row[y]
+        counts = rng.multivariate_hypergeometric(remaining, needed)
+        remaining -= counts
+        row = randmap[y]
+        chosen = rng.choice(np.flatnonzero(row == GRASS), needed, replace=False)
+        row[chosen] = np.repeat(codes, counts)
 
     return randmap
 
 
+def generate_chunk(seeds: list, x: int, y: int, size: int, scale: float) -> np.ndarray:
+    """Generates one chunk of an unbounded map. The noise is evaluated at world coordinates, so neighboring chunks fit together
+    seamlessly, and berries and animals are placed with a random generator seeded by the chunk coordinates. The same chunk is
+    therefore identical no matter when or how often it gets generated.
+
+    Args:
+        seeds (list): The random seeds of the four octaves.
+        x (int): The x-coordinate of the top left tile of the chunk.
+        y (int): The y-coordinate of the top left tile of the chunk.
+        size (int): The length/height of the chunk.
+        scale (float): The number of tiles spanned by one lattice cell of the first octave.
+
+    Returns:
+        numpy.ndarray: The generated chunk.
+    """
+    left, right = [], []
+    for i in range(4):
+        freq = 2**i
+        l, r = __perlin__(
+            np.arange(x, x + size) * freq / scale,
+            np.arange(y, y + size) * freq / scale,
+            seed=seeds[i],
+        )
+        left.append(l / freq)
+        right.append(r)
+    noise = np.hstack(left) @ np.vstack(right)
+
+    land = (noise > LAND_MIN) & (noise < LAND_MAX)
+    chunk = np.full((size, size), WATER, dtype=np.uint8)
+    chunk[land] = GRASS
+
+    land_tiles = np.flatnonzero(land)
+    codes = np.array([BERRY, HERBI_SPAWN, CARNI_SPAWN, OMNI_SPAWN], dtype=np.uint8)
+    counts = [
+        int(len(land_tiles) * percent)
+        for percent in (B_PERCENT, H_PERCENT, C_PERCENT, O_PERCENT)
+    ]
+    rng = np.random.default_rng([seeds[0], x, y])
+    chosen = rng.choice(land_tiles, sum(counts), replace=False)
+    chunk.reshape(-1)[chosen] = np.repeat(codes, counts)
+    return chunk
+
+
 def main() -> None:
     """Main function to generate and display a plot of Perlin noise."""
     p = generate_plot()
@@ -0,0 +1,190 @@
+import glob
+import hashlib
+import json
+import os
+import tempfile
+import time
+import numpy as np
+import generator
+from settings import *
+
+VERSION = 1  # part of every key, raised whenever the generator changes its output for the same parameters
+STALE = 3600  # seconds after which a half written map is considered left behind by a crashed process
+
+
+class MapCache:
+    """Directory of generated maps, so a seed used before doesn't need its noise and placements computed again.
+
+    Every map is stored in its own .npy file, named after a hash of everything it was generated from: the seeds, the size, the
+    land thresholds, the percentages of berries and animals and the terrain codes. Changing any of them gives a different file,
+    an existing file never has to be invalidated. Maps are loaded memory-mapped and copy-on-write, so loading doesn't read them
+    and the berries eaten by the world never reach the file.
+
+    Several processes can share a cache. New maps are written to a temporary file first and renamed once complete, so a map is
+    either missing or whole. Two processes missing the same map both generate it, the second rename replaces the first with an
+    identical file. Once the cache is larger than its limit the least recently used maps are deleted, a process still using a
+    deleted map keeps its mapping.
+    """
+
+    def __init__(self, directory: str = MAP_CACHE_DIRECTORY, limit: int = MAP_CACHE_SIZE) -> None:
+        """Opens a cache, the directory is created if it doesn't exist.
+
+        Args:
+            directory (str, optional): the directory of the cache. Defaults to MAP_CACHE_DIRECTORY.
+            limit (int, optional): bytes the maps may take up together. Defaults to MAP_CACHE_SIZE.
+        """
+        if directory is None:
+            raise ValueError("The map cache needs a directory")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.limit = limit
+
+    def key(self, seeds: list, size: int) -> str:
+        """Computes the name of the file a map is stored in. The settings are read from the generator, so changes of them at
+        runtime are taken into account.
+
+        Args:
+            seeds (list): the seeds of the map, see generator.map_seeds
+            size (int): the length/height of the map
+
+        Returns:
+            str: the key
+        """
+        parameters = {
+            "version": VERSION,
+            "seeds": [int(seed) for seed in seeds],
+            "size": size,
+            "land": [generator.LAND_MIN, generator.LAND_MAX],
+            "percent": [
+                generator.B_PERCENT,
+                generator.H_PERCENT,
+                generator.C_PERCENT,
+                generator.O_PERCENT,
+            ],
+            "codes": [
+                generator.BERRY,
+                generator.CARNI_SPAWN,
+                generator.GRASS,
+                generator.HERBI_SPAWN,
+                generator.OMNI_SPAWN,
+                generator.WATER,
+            ],
+        }
+        encoded = json.dumps(parameters, sort_keys=True).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, gseed: int = None, size: int = MAPSIZE, random=None) -> np.ndarray:
+        """Returns a map, generated and stored first if the cache doesn't hold it yet. The map is the same generate_map would
+        return for these arguments.
+
+        Args:
+            gseed (int, optional): the random seed in case a map needs to be recreated. Defaults to none.
+            size (int, optional): the length/height of the map. Defaults to MAPSIZE.
+            random (random.Random, optional): draws the seeds if no gseed is given, i.e. the map stream of a world. Defaults to the global generator.
+
+        Returns:
+            numpy.ndarray: the map, memory-mapped copy-on-write
+        """
+        seeds = generator.map_seeds(gseed, random)
+        path = os.path.join(self.directory, self.key(seeds, size) + ".npy")
+        terrain = self.__load__(path)
+        if terrain is not None:
+            self.__touch__(path)
+            return terrain
+
+        self.__store__(path, seeds, size)
+        terrain = self.__load__(path)
+        if terrain is None:  # evicted by another process right away, the cache is too small for everyone using it
+            return generator.generate_map(size=size, seeds=seeds)
+        self.evict(keep=path)  # only once it is mapped, so this process keeps it either way
+        return terrain
+
+    def __load__(self, path: str) -> np.ndarray:
+        """Maps a stored map into memory.
+
+        Args:
+            path (str): the path of the map
+
+        Returns:
+            numpy.ndarray: the map, None if the cache doesn't hold it
+        """
+        try:
+            return np.load(path, mmap_mode="c")
+        except FileNotFoundError:
+            return None
+
+    def __store__(self, path: str, seeds: list, size: int) -> None:
+        """Generates a map straight into a temporary file and moves it to its place once complete.
+
+        Args:
+            path (str): the path of the map
+            seeds (list): the seeds of the map
+            size (int): the length/height of the map
+        """
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(handle)
+        try:
+            terrain = generator.generate_map(size=size, out=temporary, seeds=seeds)
+            terrain.flush()
+            del terrain
+            os.replace(temporary, path)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+    def __touch__(self, path: str) -> None:
+        """Marks a map as used right now, eviction goes by the modification times.
+
+        Args:
+            path (str): the path of the map
+        """
+        try:
+            os.utime(path)
+        except OSError:  # evicted by another process in the meantime, the mapping stays valid
+            pass
+
+    def evict(self, keep: str = None) -> None:
+        """Deletes the least recently used maps until the cache fits its limit again, as well as temporary files of writers
+        which crashed.
+
+        Args:
+            keep (str, optional): path of a map which is never deleted, i.e. the one just stored. Defaults to none.
+        """
+        now = time.time()
+        files = []
+        for path in glob.glob(os.path.join(self.directory, "*.npy")) + glob.glob(
+            os.path.join(self.directory, "*.tmp")
+        ):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # deleted by another process
+                continue
+            if path.endswith(".tmp"):
+                if now - stat.st_mtime > STALE:
+                    self.__remove__(path)
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.limit:
+                break
+            if path != keep and self.__remove__(path):
+                total -= size
+
+    def __remove__(self, path: str) -> bool:
+        """Deletes a file of the cache.
+
+        Args:
+            path (str): the path
+
+        Returns:
+            bool: true if this process deleted it
+        """
+        try:
+            os.remove(path)
+        except FileNotFoundError:  # another process was faster
+            return False
+        except PermissionError:  # still mapped by a process, on systems which don't allow deleting that
+            return False
+        return True
@@ -1,12 +1,27 @@
+import argparse
+import time
 import pygame as pg
+import numpy as np
 from settings import *
-from World.world import World
+from World.world import World, IMAGES
+from World.renderer import Renderer
+from World.camera import Camera
+from World.worker import SimulationWorker
+from World import checkpoint, replay
+from timestep import describe
 
 
 class Simulation:
+    """Pygame front end. The world is simulated by a worker next to the window, SPEED ticks per second or faster when
+    fast-forwarding, and the window draws the latest snapshot the worker published at its own frame rate. The arrow keys or
+    dragging with the right mouse button scroll the camera, the mouse wheel zooms. The S key saves a checkpoint."""
 
-    def __init__(self) -> None:
-        """Initializes the Simulation object with necessary setup."""
+    def __init__(self, resume: str = None) -> None:
+        """Initializes the Simulation object with necessary setup.
+
+        Args:
+            resume (str, optional): path of a checkpoint the simulation is resumed from. Defaults to none.
+        """
         pg.init()
         pg.font.init()
 
@@ -14,7 +29,19 @@ class Simulation:
         pg.display.set_caption("Pycosystem")
         self.clock = pg.time.Clock()
 
-        self.world = World()
+        # the world is created and simulated by the worker, the terrain is baked from its first snapshot
+        self.worker = SimulationWorker(resume=resume)
+        self.snapshot = self.worker.first()
+        if self.snapshot is None:  # this shouldn't happen
+            print("Error: The simulation stopped before creating the world. Exiting program.")
+            exit(1)
+        self.terrain = self.snapshot.terrain.copy()  # terrain the background was baked from
+        self.renderer = Renderer(self.terrain, IMAGES, len(self.terrain))
+        self.view = self.snapshot.view  # view the background was baked for
+
+        # the worker only publishes what the camera sees
+        self.camera = Camera(self.snapshot.map_size)
+        self.requested = self.camera.request()
         self.r_state = True  # run state for pause button
 
         self.font = pg.font.SysFont("arial", 20, True)
@@ -24,47 +51,148 @@ class Simulation:
         self.dark_color = (127, 133, 109)
 
         self.b1_texts = ["Pause", "Unpause"]
-        self.animal_event = pg.USEREVENT + 1
+        # the texts only get rendered once
+        self.b1_images = [
+            self.font.render(text, True, (0, 0, 0)) for text in self.b1_texts
+        ]
+        self.b1_state = None  # hover and run state the button was last drawn with
+
+        # the keys 1-4 select the fast-forward factor of the simulation
+        self.speed_keys = {
+            pg.K_1 + i: factor for i, factor in enumerate(SPEED_FACTORS)
+        }
 
     def run(self) -> None:
         """Runs the simulation process."""
-        pg.time.set_timer(
-            self.animal_event, int(1000 / SPEED)
-        )  # timer for animal events
         run = True
+        redraw = True  # the whole screen has to be drawn, i.e. in the first frame
         while run:
             mouse = pg.mouse.get_pos()
 
             for event in pg.event.get():
                 if event.type == pg.QUIT:
                     run = False
+                elif event.type == pg.WINDOWEXPOSED:
+                    redraw = True
                 elif event.type == pg.MOUSEBUTTONDOWN:
                     if (
                         WIDTH / 2 - 100 <= mouse[0] <= WIDTH / 2 + 100
                         and HEIGHT - 75 <= mouse[1] <= HEIGHT - 25
                     ):  # button 1
                         self.r_state = not self.r_state
-                elif event.type == self.animal_event:
-                    self.world.run(self.r_state, True)
+                        self.worker.send("pause", self.r_state)
+                elif event.type == pg.KEYDOWN and event.key in self.speed_keys:
+                    self.worker.send("speed", self.speed_keys[event.key])
+                elif event.type == pg.KEYDOWN and event.key == pg.K_s:
+                    self.worker.send("save", CHECKPOINT_PATH)
+                elif event.type == pg.MOUSEWHEEL and self.renderer.area.collidepoint(mouse):
+                    self.camera.zoom_at(event.y, mouse)
+                elif event.type == pg.MOUSEMOTION and event.buttons[2]:
+                    self.camera.scroll(-event.rel[0], -event.rel[1])
+
+            keys = pg.key.get_pressed()
+            distance = SCROLL_SPEED * self.clock.get_time() / 1000
+            self.camera.scroll(
+                (keys[pg.K_RIGHT] - keys[pg.K_LEFT]) * distance,
+                (keys[pg.K_DOWN] - keys[pg.K_UP]) * distance,
+            )
+            request = self.camera.request()
+            if request != self.requested:
+                self.worker.send("view", request)
+                self.requested = request
+
+            if not self.worker.alive():  # this shouldn't happen
+                print("Error: The simulation stopped unexpectedly. Exiting program.")
+                break
 
-            self.screen.fill("black")
-            self.world.run(self.r_state, False)
-            self.__buttons__()
+            # the latest snapshot, the window never waits for the simulation
+            snapshot = self.worker.latest()
+            if snapshot is not None:
+                self.__receive_snapshot__(snapshot)
 
-            pg.display.update()
+            if redraw or not DIRTY_RENDERING:
+                self.renderer.clear()
+                self.renderer.draw_snapshot(self.snapshot)
+                self.__counters__()
+                self.__buttons__(True)
+                self.__hud__()
+                pg.display.update()
+                redraw = False
+            else:
+                # only the changed parts of the screen are drawn and pushed to the display
+                dirty = []
+                if snapshot is not None:
+                    dirty += self.renderer.draw_snapshot(snapshot, False)
+                dirty += self.__counters__()
+                dirty += self.__buttons__(False)
+                dirty += self.__hud__()
+                if dirty:
+                    pg.display.update(dirty)
             self.clock.tick(FPS)
 
+        self.worker.stop()
         pg.quit()
 
-    def __buttons__(self) -> None:
-        """Draws all buttons."""
-        mouse = pg.mouse.get_pos()
+    def __receive_snapshot__(self, snapshot) -> None:
+        """Makes a new snapshot the current one. If it shows another part of the map than the last one, the whole background
+        is baked again, otherwise only the cells whose terrain changed.
 
-        # color for pause/unpause button
-        if (
+        Args:
+            snapshot (Snapshot): the snapshot
+        """
+        if snapshot.view != self.view:
+            x0, y0, _, _, step, _, scale = snapshot.view
+            self.terrain = snapshot.terrain.copy()
+            self.renderer.view(self.terrain, (x0, y0), step, scale)
+            self.view = snapshot.view
+        else:
+            for y, x in np.argwhere(snapshot.terrain != self.terrain).tolist():
+                self.terrain[y, x] = snapshot.terrain[y, x]
+                self.renderer.rebake(x, y)
+        self.snapshot = snapshot
+
+    def __counters__(self) -> list:
+        """Draws the animal counters of the current snapshot.
+
+        Returns:
+            list: the changed rectangles of the screen
+        """
+        snapshot = self.snapshot
+        return self.renderer.counters(
+            self.font, snapshot.herbis, snapshot.carnis, snapshot.omnis
+        )
+
+    def __hud__(self) -> list:
+        """Draws the speed of the simulation next to the buttons.
+
+        Returns:
+            list: the changed rectangles of the screen
+        """
+        dirty = []
+        for i, line in enumerate(describe(self.snapshot.stats)):
+            dirty += self.renderer.text(self.font, line, (640, 1015 + 25 * i))
+        return dirty
+
+    def __buttons__(self, full: bool) -> list:
+        """Draws all buttons.
+
+        Args:
+            full (bool): Draws the buttons even if their state didn't change since the last frame.
+
+        Returns:
+            list: the changed rectangles of the screen
+        """
+        mouse = pg.mouse.get_pos()
+        hovered = (
             WIDTH / 2 - 100 <= mouse[0] <= WIDTH / 2 + 100
             and HEIGHT - 75 <= mouse[1] <= HEIGHT - 25
-        ):
+        )
+        if not full and self.b1_state == (hovered, self.r_state):
+            return []
+        self.b1_state = (hovered, self.r_state)
+
+        # color for pause/unpause button
+        if hovered:
             button1 = pg.draw.rect(
                 self.screen, self.light_color, [WIDTH / 2 - 100, HEIGHT - 75, 200, 50]
             )
@@ -75,15 +203,95 @@ class Simulation:
 
         # text for pause/unpause button (button1)
         if self.r_state:
-            b1_text = self.font.render(self.b1_texts[0], True, (0, 0, 0))
+            b1_text = self.b1_images[0]
         else:
-            b1_text = self.font.render(self.b1_texts[1], True, (0, 0, 0))
+            b1_text = self.b1_images[1]
 
         b1_rect = b1_text.get_rect(center=(button1.centerx, button1.centery))
         self.screen.blit(b1_text, b1_rect)
+        return [button1]
+
+
+def run_headless(
+    ticks: int,
+    resume: str = None,
+    save: str = None,
+    telemetry: str = TELEMETRY_DIRECTORY,
+    seed: int = None,
+    record: str = None,
+) -> World:
+    """Runs a world without any window for the given number of ticks, as fast as possible.
+
+    Args:
+        ticks (int): The number of ticks.
+        resume (str, optional): Path of a checkpoint the world is restored from. Defaults to None.
+        save (str, optional): Path of a checkpoint the world is saved to after the last tick. Defaults to None.
+        telemetry (str, optional): Directory the statistics of the run get recorded to. Defaults to TELEMETRY_DIRECTORY.
+        seed (int, optional): Seed of a new world, the same seed always gives the same run. Defaults to None.
+        record (str, optional): Directory the events and keyframes of a new world get recorded to, see replay. Defaults to None.
+
+    Returns:
+        World: The world after the last tick.
+    """
+    if record is not None:
+        world = replay.record(record, seed, headless=True, telemetry=telemetry)
+    elif resume is None:
+        world = World(headless=True, telemetry=telemetry, seed=seed)
+    else:
+        world = checkpoint.load(resume, telemetry=telemetry)
+    t = time.perf_counter()
+    world.step(ticks)
+    elapsed = time.perf_counter() - t
+    world.shutdown()
+    if save is not None:
+        checkpoint.save(world, save, background=False)
+    print(
+        f"{ticks} ticks in {elapsed:.2f}s ({ticks / elapsed:.0f} ticks/s), alive herbivores: {len(world.herbis)}, "
+        f"carnivores: {len(world.carnis)}, omnivores: {len(world.omnis)}"
+    )
+    return world
 
 
 if __name__ == "__main__":
-    """test"""
-    simulation = Simulation()
-    simulation.run()
+    parser = argparse.ArgumentParser(description="Pycosystem")
+    parser.add_argument(
+        "--headless",
+        type=int,
+        metavar="TICKS",
+        help="runs the given number of ticks without a window and prints the populations",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="PATH",
+        help="resumes the simulation from a checkpoint instead of creating a new world",
+    )
+    parser.add_argument(
+        "--save",
+        metavar="PATH",
+        help="saves a checkpoint after the last tick of a headless run",
+    )
+    parser.add_argument(
+        "--telemetry",
+        metavar="DIR",
+        default=TELEMETRY_DIRECTORY,
+        help="records the populations, births, deaths and genomes of a headless run into the given directory",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        help="seeds a new headless world, runs with the same seed are identical",
+    )
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="records the events and keyframes of a new headless world into the given directory so it can be replayed",
+    )
+    args = parser.parse_args()
+
+    if args.headless is None:
+        simulation = Simulation(args.resume)
+        simulation.run()
+    else:
+        run_headless(
+            args.headless, args.resume, args.save, args.telemetry, args.seed, args.record
+        )
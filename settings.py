@@ -1,10 +1,58 @@
 WIDTH = 1000 # WINDOW WIDTH
 HEIGHT = 1100 # WINDOW HEIGHT
 FPS = 60 # 
-SPEED = 10 # ANIMAL EVENTS PER SECOND
+SPEED = 10 # ANIMAL EVENTS PER SECOND AT 1X SPEED
+SPEED_FACTORS = (1, 10, 100, 0) # FAST-FORWARD FACTORS SELECTED WITH THE KEYS 1-4, 0 RUNS AS FAST AS POSSIBLE
+MAX_TICK_WORK = 40 # MILLISECONDS OF TICKS PER FRAME AT MOST, SO THE WINDOW STAYS RESPONSIVE
+MAX_BACKLOG = 1 # SECONDS THE SIMULATION MAY FALL BEHIND, THE REST OF THE BACKLOG GETS DROPPED
+SIMULATION_WORKER = "process" # RUNS THE SIMULATION NEXT TO THE WINDOW IN A "process" (ITS OWN CORE) OR A "thread"
+SNAPSHOT_CAPACITY = 65536 # ANIMALS A SNAPSHOT OF THE SIMULATION CAN HOLD, THE REST ISN'T DRAWN
+CHECKPOINT_PATH = "pycosystem.ckpt" # FILE A RUNNING SIMULATION GETS SAVED TO WITH THE S KEY OR AUTOMATICALLY
+CHECKPOINT_INTERVAL = 0 # TICKS BETWEEN AUTOMATIC CHECKPOINTS OF A RUNNING SIMULATION, 0 DISABLES THEM
+TELEMETRY_DIRECTORY = None # DIRECTORY THE STATISTICS OF A RUN GET WRITTEN TO, ONE PER RUN. NONE DISABLES THEM
+TELEMETRY_INTERVAL = 1 # TICKS BETWEEN TWO RECORDS OF THE POPULATIONS, BIRTHS AND DEATHS ARE SUMMED UP IN BETWEEN
+TELEMETRY_GENOME_INTERVAL = 10 # TICKS BETWEEN TWO RECORDS OF THE GENOME DISTRIBUTIONS, 0 DISABLES THEM
+TELEMETRY_ROWS = 4096 # RECORDS KEPT IN MEMORY BEFORE THEY GET WRITTEN TO DISK IN THE BACKGROUND
+KEYFRAME_INTERVAL = 1000 # TICKS BETWEEN TWO KEYFRAMES OF A RECORDED RUN, A REPLAY STARTS FROM THE NEAREST ONE
+EVENT_BUFFER = 1048576 # BYTES OF EVENTS BUFFERED BEFORE THEY GET APPENDED TO THE LOG OF A RECORDED RUN
+ENSEMBLE_WORKERS = 0 # PROCESSES RUNNING THE WORLDS OF AN ENSEMBLE, ONE WORLD AT A TIME EACH. 0 USES ONE PER CORE
+ENSEMBLE_SAMPLE_INTERVAL = 100 # TICKS BETWEEN TWO SAMPLES OF THE POPULATIONS AND GENOMES OF AN ENSEMBLE RUN
+STEADY_WINDOW = 1000 # TICKS THE POPULATIONS OF AN ENSEMBLE RUN ARE AVERAGED OVER TO DETECT A STEADY STATE
+STEADY_TOLERANCE = 0.05 # RELATIVE CHANGE OF THE AVERAGE POPULATION BETWEEN TWO WINDOWS BELOW WHICH A SPECIES COUNTS AS STEADY
+DIRTY_RENDERING = True # ONLY REDRAWS THE PARTS OF THE SCREEN WHICH CHANGED
+VIEWSIZE = 1000 # LENGTH/HEIGHT OF THE PART OF THE WINDOW SHOWING THE MAP, IN PIXELS
+ZOOM_LEVELS = (40, 20, 10, 5, 2, 1, 1/2, 1/4, 1/8, 1/16) # PIXELS PER TILE THE CAMERA CAN ZOOM TO WITH THE MOUSE WHEEL
+DENSITY_ZOOM = 5 # BELOW THIS ZOOM THE DENSITY OF THE ANIMALS IS SHOWN INSTEAD OF THE ANIMALS THEMSELVES
+DENSITY_BLOCK = 8 # LENGTH/HEIGHT OF A BLOCK OF THE DENSITY MAP IN PIXELS
+DENSITY_SATURATION = 20 # ANIMALS IN A BLOCK OF THE DENSITY MAP AT WHICH IT IS FULLY COLORED
+SCROLL_SPEED = 800 # PIXELS PER SECOND THE CAMERA MOVES WHILE AN ARROW KEY IS HELD
 TILESIZE = 20 # SIZE OF ONE TILE
 MAPSIZE = 50 # LENGTH/HEIGHT OF THE ENTIRE MAP
+NOISE_TILESIZE = 1024 # LENGTH/HEIGHT OF THE TILES THE NOISE-MAP GETS GENERATED IN
+LAND_MIN = -0.05 # NOISE VALUES ABOVE THIS AND BELOW LAND_MAX BECOME LAND, THE REST WATER
+LAND_MAX = 0.4 # SEE ABOVE
 B_PERCENT = 0.03 # PERCENT OF LANDTILES COVERED IN BERRIES
 H_PERCENT = 0.04 # PERCENT OF LANDTILES COVERED BY HERBIS
 C_PERCENT = 0.02 # PERCENT OF LANDTILES COVERED BY CARNIS
-O_PERCENT = 0.01 # PERCENT OF LANDTILES COVERED BY OMNIS
\ No newline at end of file
+O_PERCENT = 0.01 # PERCENT OF LANDTILES COVERED BY OMNIS
+MAP_CACHE_DIRECTORY = None # DIRECTORY GENERATED MAPS ARE CACHED IN AND REUSED FROM, NONE DISABLES THE CACHE
+MAP_CACHE_SIZE = 2**30 # BYTES THE MAP CACHE MAY TAKE UP, THE LEAST RECENTLY USED MAPS GET DELETED BEYOND THAT
+ANIMAL_POOL_SIZE = 1024 # DEAD ANIMALS KEPT PER TYPE, SO BIRTHS CAN REUSE THEM INSTEAD OF CREATING NEW ONES
+BERRY = 0 # TERRAIN CODE OF BERRY BUSHES
+CARNI_SPAWN = 1 # TERRAIN CODE OF GRASS WITH A CARNIVORE SPAWNING ON IT
+GRASS = 2 # TERRAIN CODE OF GRASS
+HERBI_SPAWN = 3 # TERRAIN CODE OF GRASS WITH A HERBIVORE SPAWNING ON IT
+OMNI_SPAWN = 4 # TERRAIN CODE OF GRASS WITH A OMNIVORE SPAWNING ON IT
+WATER = 5 # TERRAIN CODE OF WATER
+UNKNOWN = 255 # TERRAIN CODE OF TILES WHICH HAVEN'T BEEN GENERATED YET, ONLY USED FOR DRAWING
+CLUSTERSIZE = 16 # LENGTH/HEIGHT OF A CLUSTER FOR HIERARCHICAL PATH FINDING
+HIERARCHICAL_MAPSIZE = 200 # MAPS OF AT LEAST THIS SIZE USE HIERARCHICAL PATH FINDING
+PATH_WORKERS = 0 # WORKER PROCESSES FOR PATH FINDING, 0 SOLVES ALL PATHS ON THE MAIN THREAD
+PATH_BUDGET = 20 # MILLISECONDS OF PATH FINDING PER TICK, REMAINING REQUESTS WAIT FOR THE NEXT TICK. 0 DISABLES THE LIMIT
+PATH_NODE_BUDGET = 0 # SEARCHED NODES PER TICK, SEE ABOVE. 0 DISABLES THE LIMIT
+CHUNKED_WORLD = False # GENERATES THE MAP IN CHUNKS ON DEMAND INSTEAD OF ALL AT ONCE
+CHUNKED_MAPSIZE = 2**20 # LENGTH/HEIGHT OF A CHUNKED MAP
+CHUNKSIZE = 32 # LENGTH/HEIGHT OF A CHUNK
+CHUNK_SCALE = 50 # TILES SPANNED BY THE COARSEST NOISE OCTAVE OF A CHUNKED MAP
+MAX_LOADED_CHUNKS = 256 # CHUNKS KEPT IN MEMORY, IDLE ONES BEYOND THAT GET WRITTEN TO DISK
+LAZY_SEARCH_NODES = 20000 # TILES A SEARCH ON A CHUNKED MAP MAY VISIT BEFORE GIVING UP
\ No newline at end of file
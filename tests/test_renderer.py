@@ -0,0 +1,39 @@
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+from types import SimpleNamespace
+import numpy as np
+import pygame as pg
+import pytest
+from settings import *
+from generator import generate_map
+from World.renderer import Renderer
+from World.world import IMAGES
+
+
+@pytest.fixture
+def renderer(monkeypatch):
+    monkeypatch.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # the tileset is loaded relative to the repo
+    pg.init()
+    pg.display.set_mode((WIDTH, HEIGHT))
+    yield Renderer(generate_map(gseed=1, size=50), IMAGES, 50)
+    pg.quit()
+
+
+def test_full_redraw_draws_the_counters_again(renderer):
+    font = pg.font.SysFont("arial", 20, True)
+    snapshot = SimpleNamespace(
+        density=None, x=np.array([1], np.int32), y=np.array([2], np.int32), types=np.array([0], np.int8)
+    )
+    renderer.draw_snapshot(snapshot)
+    renderer.counters(font, 1, 2, 3)
+
+    # what the front end does after the window was exposed, the counters didn't change
+    renderer.clear()
+    renderer.draw_snapshot(snapshot)
+    renderer.counters(font, 1, 2, 3)
+
+    pixels = pg.surfarray.array3d(renderer.display_surface)
+    assert pixels[10:200, 1015:1090].any()
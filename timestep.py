@@ -0,0 +1,143 @@
+import time
+from settings import *
+
+
+def describe(stats: dict) -> list:
+    """Describes the speed, the measured rate and the lag of a simulation.
+
+    Args:
+        stats (dict): the values returned by FixedTimestep.stats()
+
+    Returns:
+        list: two lines of text, the speed and rate and the lag
+    """
+    if not stats["factor"]:
+        return [f"Speed: max, {stats['rate']:.0f} ticks/s", ""]
+    return [
+        f"Speed: {stats['factor']:.0f}x, {stats['rate']:.0f}/{stats['target']:.0f} ticks/s",
+        f"Lag: {stats['lag']:.2f}s, {stats['dropped']} ticks dropped",
+    ]
+
+
+class FixedTimestep:
+    """Runs simulation ticks at a fixed rate, independent of the frame rate.
+
+    The time passed since the last frame is added to an accumulator and one tick is run for every full timestep in it. The
+    rate can be multiplied by a fast-forward factor, a factor of 0 runs as many ticks as fit into a frame. The ticks of a single
+    frame are limited to max_work milliseconds, so a slow simulation can't freeze the window. Work which couldn't be done is
+    kept as a backlog and caught up on in later frames, up to max_backlog seconds, anything beyond that is dropped.
+    """
+
+    def __init__(
+        self,
+        rate: float = SPEED,
+        factor: int = 1,
+        max_work: float = MAX_TICK_WORK,
+        max_backlog: float = MAX_BACKLOG,
+    ) -> None:
+        """Initializes the timestep.
+
+        Args:
+            rate (float, optional): ticks per second at a factor of 1. Defaults to SPEED.
+            factor (int, optional): fast-forward factor, 0 runs as fast as possible. Defaults to 1.
+            max_work (float, optional): milliseconds of ticks per frame at most. Defaults to MAX_TICK_WORK.
+            max_backlog (float, optional): seconds the simulation may fall behind at most. Defaults to MAX_BACKLOG.
+        """
+        self.rate = rate
+        self.factor = factor
+        self.max_work = max_work
+        self.max_backlog = max_backlog
+
+        self.accumulator = 0.0  # seconds of simulation time which are due
+        self.last = None  # time of the last frame
+        self.dropped = 0  # ticks dropped because the backlog grew too large
+
+        # measured rate, counted over windows of one second
+        self.window_start = time.perf_counter()
+        self.window_ticks = 0
+        self.measured_rate = 0.0
+
+    def set_factor(self, factor: int) -> None:
+        """Changes the fast-forward factor, the backlog of the old speed is dropped.
+
+        Args:
+            factor (int): the new factor, 0 runs as fast as possible
+        """
+        self.factor = factor
+        self.accumulator = 0.0
+
+    def target_rate(self) -> float:
+        """Returns the ticks per second the simulation should reach, 0 if it runs as fast as possible.
+
+        Returns:
+            float: the target rate
+        """
+        return self.rate * self.factor
+
+    def lag(self) -> float:
+        """Returns how far the simulation lags behind its target rate.
+
+        Returns:
+            float: the backlog in seconds, 0 if the simulation keeps up
+        """
+        if not self.factor:
+            return 0.0
+        return max(self.accumulator - 1 / self.target_rate(), 0.0)
+
+    def advance(self, tick, running: bool = True) -> int:
+        """Runs the ticks which are due since the last frame.
+
+        Args:
+            tick: function running a single tick
+            running (bool, optional): false while the simulation is paused, no time accumulates then. Defaults to True.
+
+        Returns:
+            int: the number of ticks run
+        """
+        now = time.perf_counter()
+        elapsed = 0.0 if self.last is None else now - self.last
+        self.last = now
+        if not running:
+            self.accumulator = 0.0
+            return 0
+
+        deadline = now + self.max_work / 1000
+        n = 0
+        if not self.factor:
+            # as fast as possible, the whole budget of the frame goes into ticks
+            while not n or time.perf_counter() < deadline:
+                tick()
+                n += 1
+        else:
+            step = 1 / self.target_rate()
+            self.accumulator += elapsed
+            while self.accumulator >= step and (not n or time.perf_counter() < deadline):
+                tick()
+                self.accumulator -= step
+                n += 1
+
+            # the rest of the backlog is caught up on in the next frames, as long as it doesn't grow too large
+            if self.accumulator > self.max_backlog:
+                self.dropped += int((self.accumulator - self.max_backlog) / step)
+                self.accumulator = self.max_backlog
+
+        self.window_ticks += n
+        if now - self.window_start >= 1:
+            self.measured_rate = self.window_ticks / (now - self.window_start)
+            self.window_start = now
+            self.window_ticks = 0
+        return n
+
+    def stats(self) -> dict:
+        """Returns the speed, the measured rate and the lag of the simulation.
+
+        Returns:
+            dict: the factor, measured and target rate, lag in seconds and number of dropped ticks
+        """
+        return {
+            "factor": self.factor,
+            "rate": self.measured_rate,
+            "target": self.target_rate(),
+            "lag": self.lag(),
+            "dropped": self.dropped,
+        }